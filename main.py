@@ -10,7 +10,8 @@ from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent))
 
 from src.backend.processors import ExcelGenerator
-from src.backend.db import db
+from src.backend.db import db, replica
+from src.backend.monitoring.metrics import track_run
 from src.utils.config import config
 from src.utils.logger import get_logger
 
@@ -38,7 +39,13 @@ def generate_reports(grados=None, year_start=None, year_end=None):
 
     try:
         # Test de conexión
-        if not db.test_connection():
+        if config.replica.backend == 'replica':
+            print(f"🦆 Leyendo de la réplica local: {replica.path}")
+            if not replica.test_connection():
+                print("❌ Error: La réplica local no está disponible (python main.py --sync-replica)")
+                return False
+
+        elif not db.test_connection():
             logger.error("No se pudo conectar a la base de datos")
             print("❌ Error: No se pudo conectar a la base de datos")
             print("Verifica la configuración en config/config.yaml o variables de entorno")
@@ -47,21 +54,32 @@ def generate_reports(grados=None, year_start=None, year_end=None):
         generator = ExcelGenerator()
 
         results = {}
-        for grado in grados:
-            try:
-                print(f"\n📊 Generando reporte para {grado}...")
-                output_file = generator.generate_report_for_grado(
-                    grado,
-                    year_start=year_start,
-                    year_end=year_end
-                )
-                results[grado] = output_file
-                print(f"   ✅ Generado: {output_file}")
-
-            except Exception as e:
-                logger.error(f"Error generando {grado}: {e}")
-                print(f"   ❌ Error: {str(e)}")
-                results[grado] = None
+        with track_run('manual_report_generation'):
+            if config.reports.workers > 1 and len(grados) > 1:
+                print(f"\n📊 Generando {len(grados)} reportes en {config.reports.workers} procesos...")
+                results = generator.generate_all_reports(year_start, year_end, grados=grados)
+                for grado, output_file in results.items():
+                    if output_file:
+                        print(f"   ✅ Generado: {output_file}")
+                    else:
+                        print(f"   ❌ Error generando {grado} (ver logs)")
+
+            else:
+                for grado in grados:
+                    try:
+                        print(f"\n📊 Generando reporte para {grado}...")
+                        output_file = generator.generate_report_for_grado(
+                            grado,
+                            year_start=year_start,
+                            year_end=year_end
+                        )
+                        results[grado] = output_file
+                        print(f"   ✅ Generado: {output_file}")
+
+                    except Exception as e:
+                        logger.error(f"Error generando {grado}: {e}")
+                        print(f"   ❌ Error: {str(e)}")
+                        results[grado] = None
 
         # Resumen
         print("\n" + "="*60)
@@ -77,6 +95,291 @@ def generate_reports(grados=None, year_start=None, year_end=None):
         return False
 
 
+def show_metrics(job_name='daily_report_generation', runs=10, factor=None):
+    """
+    Muestra tendencias de las últimas ejecuciones y etapas con regresión
+
+    Args:
+        job_name: Nombre de la tarea registrada
+        runs: Número de ejecuciones a mostrar
+        factor: Factor de regresión (por defecto config.monitoring.regression_factor)
+    """
+    import pandas as pd
+    from src.backend.monitoring.metrics import MetricsStore, STAGE_SECONDS, QUERY_ROWS
+
+    store = MetricsStore()
+    df_runs = store.get_runs(job_name, limit=runs)
+
+    if df_runs.empty:
+        print(f"No hay ejecuciones registradas para '{job_name}'")
+        return True
+
+    print(f"📈 Últimas {len(df_runs)} ejecuciones de '{job_name}'\n")
+    print(df_runs[['id', 'started_at', 'status', 'elapsed_seconds', 'peak_memory_mb']].round(1).to_string(index=False))
+
+    with pd.option_context('display.width', 200, 'display.max_columns', None):
+        stages = store.get_metric_history(STAGE_SECONDS, job_name, limit=runs)
+        if not stages.empty:
+            print("\n⏱  Segundos por etapa (columnas = ejecución)\n")
+            print(stages.T.round(2).to_string())
+
+        query_rows = store.get_metric_history(QUERY_ROWS, job_name, limit=runs)
+        if not query_rows.empty:
+            print("\n🔢 Filas por query (columnas = ejecución)\n")
+            print(query_rows.T.fillna(0).astype(int).to_string())
+
+    factor = factor or config.monitoring.regression_factor
+    regressions = store.find_regressions(job_name, factor=factor, limit=runs)
+
+    print("\n" + "="*60)
+    if regressions:
+        print(f"⚠️  {len(regressions)} etapas superaron {factor}x su línea base:")
+        for r in regressions:
+            print(f"   #{r['run_id']} {r['stage']}: {r['seconds']}s vs {r['baseline_seconds']}s ({r['ratio']}x)")
+    else:
+        print(f"✅ Sin regresiones (factor {factor}x, ventana {config.monitoring.baseline_window} ejecuciones)")
+    print("="*60)
+
+    return not regressions
+
+
+def show_plans(job_name=None, run_id=None, top=None):
+    """
+    Muestra los nodos más costosos de los planes capturados y su diferencia con el plan anterior
+
+    Args:
+        job_name: Nombre de la tarea (opcional; por defecto cualquier tarea)
+        run_id: Ejecución a analizar (por defecto la última con planes)
+        top: Nodos por plan (por defecto config.monitoring.plan_top_nodes)
+
+    Returns:
+        True si ningún plan cambió de estructura ni superó el factor de regresión
+    """
+    import pandas as pd
+    from src.backend.monitoring.metrics import MetricsStore
+    from src.backend.monitoring.plans import plan_totals, summarize_plan
+
+    store = MetricsStore()
+    run_id = run_id or store.latest_plan_run(job_name)
+    if run_id is None:
+        print("No hay planes de ejecución registrados (genera con --diagnostics)")
+        return True
+
+    top = top or config.monitoring.plan_top_nodes
+    plans = store.get_plans(run_id)
+    print(f"🔬 Planes de ejecución de la ejecución #{run_id} ({len(plans)} queries)")
+
+    with pd.option_context('display.width', 200, 'display.max_columns', None, 'display.max_colwidth', 60):
+        for name, plan in plans.items():
+            totals = plan_totals(plan)
+            print(f"\n▶ {name}: costo {totals['total_cost']}, ejecución {totals['execution_ms']} ms, "
+                  f"planeación {totals['planning_ms']} ms")
+            print(pd.DataFrame(summarize_plan(plan, top=top)).to_string(index=False))
+
+    factor = config.monitoring.regression_factor
+    diffs = store.diff_plans(run_id)
+    changed = [
+        d for d in diffs
+        if d['structure_changed'] or (d['execution_ratio'] is not None and d['execution_ratio'] > factor)
+    ]
+
+    print("\n" + "="*60)
+    if not diffs:
+        print("Sin planes anteriores para comparar")
+    elif changed:
+        print(f"⚠️  {len(changed)} queries cambiaron de plan o superaron {factor}x su tiempo anterior:")
+        for d in changed:
+            print(f"   {d['query']} (vs #{d['previous_run_id']}): tiempo {d['execution_ratio']}x, "
+                  f"costo {d['cost_ratio']}x")
+            if d['removed_nodes']:
+                print(f"      - {', '.join(d['removed_nodes'])}")
+            if d['added_nodes']:
+                print(f"      + {', '.join(d['added_nodes'])}")
+    else:
+        print(f"✅ {len(diffs)} planes sin cambios respecto a la ejecución anterior")
+    print("="*60)
+
+    return not changed
+
+
+def advise_indexes(year_start=None, year_end=None, output=None, use_hypopg=None):
+    """
+    Genera el script DDL de índices recomendados para la carga de reportes
+
+    Args:
+        year_start: Año inicial de la carga
+        year_end: Año final de la carga
+        output: Ruta del script (por defecto data/index_advisor_<fecha>.sql)
+        use_hypopg: Si estimar con índices hipotéticos (por defecto, si hypopg está instalada)
+
+    Returns:
+        True si el script se generó
+    """
+    from datetime import datetime
+    from src.backend.db.index_advisor import IndexAdvisor
+
+    if not db.test_connection():
+        print("❌ Error: No se pudo conectar a la base de datos")
+        return False
+
+    advisor = IndexAdvisor(year_start=year_start, year_end=year_end)
+    recommendations = advisor.analyze(use_hypopg=use_hypopg)
+    script = advisor.render_script(recommendations)
+
+    output = Path(output or config.paths.data_dir / f"index_advisor_{datetime.now():%Y%m%d}.sql")
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(script, encoding='utf-8')
+
+    print(f"🧭 Índices analizados: {len(recommendations)}")
+    for rec in recommendations:
+        if rec.existing:
+            status = f"cubierto por {rec.existing}"
+        elif rec.improvement is not None:
+            status = f"mejora estimada {rec.improvement:.1%}"
+        else:
+            status = "sin estimación (hypopg no disponible)"
+        print(f"   {rec.candidate.name}: {status}")
+    print(f"\n📄 Script DDL para revisión: {output}")
+    return True
+
+
+def sync_replica(full=False):
+    """
+    Sincroniza la réplica local (DuckDB) desde PostgreSQL
+
+    Args:
+        full: Si True, copia completas también las tablas incrementales
+
+    Returns:
+        True si la sincronización terminó
+    """
+    if not db.test_connection():
+        print("❌ Error: No se pudo conectar a la base de datos")
+        return False
+
+    print(f"🔄 Sincronizando réplica local {replica.path} ({'completa' if full else 'incremental'})...")
+    try:
+        copied = replica.sync(full=full)
+    except Exception as e:
+        logger.error(f"Error sincronizando la réplica: {e}")
+        print(f"   ❌ Error: {str(e)}")
+        return False
+
+    for table, rows in copied.items():
+        print(f"   ✅ {table}: {rows} filas copiadas")
+
+    status = replica.status()
+    if not status.empty:
+        print("\n" + status.to_string(index=False))
+    return True
+
+
+def compare_reports(pairs):
+    """
+    Compara reportes de referencia contra reportes generados
+
+    Args:
+        pairs: Lista de pares [ruta_referencia, ruta_generado]
+
+    Returns:
+        True si todas las hojas comparadas son iguales
+    """
+    from src.backend.processors.report_reader import diff_reports
+
+    all_equal = True
+    for legacy_path, generated_path in pairs:
+        print(f"\n🔎 {Path(legacy_path).name}  vs  {Path(generated_path).name}")
+
+        for diff in diff_reports(legacy_path, generated_path):
+            if diff.is_equal:
+                print(f"   ✅ {diff.sheet}: {diff.generated_rows} filas iguales")
+                continue
+
+            all_equal = False
+            print(f"   ❌ {diff.sheet}: {diff.legacy_rows} filas (referencia) / {diff.generated_rows} filas (generado)")
+            if diff.missing_columns:
+                print(f"      Columnas faltantes: {', '.join(diff.missing_columns)}")
+            if diff.extra_columns:
+                print(f"      Columnas adicionales: {', '.join(diff.extra_columns)}")
+            if diff.rows_only_legacy or diff.rows_only_generated:
+                print(f"      Filas sin pareja: {diff.rows_only_legacy} (referencia), {diff.rows_only_generated} (generado)")
+            for col, count in diff.mismatches.items():
+                if count:
+                    print(f"      {col}: {count} valores distintos")
+            if not diff.sample.empty:
+                print(diff.sample.head(5).to_string(index=False))
+
+    return all_equal
+
+
+def run_load_test(users=10, duration=60.0, think_time=1.0, grados=None, year_start=None, year_end=None,
+                  use_cache=True, output=None):
+    """
+    Simula usuarios concurrentes del dashboard sobre el servicio de datos
+
+    Args:
+        users: Usuarios simultáneos
+        duration: Duración en segundos
+        think_time: Pausa media entre solicitudes de un usuario en segundos
+        grados: Grados a consultar (por defecto todos)
+        year_start: Año inicial (por defecto desde config)
+        year_end: Año final (por defecto desde config)
+        use_cache: Si False, desactiva el cache de resultados (base de datos en frío)
+        output: Ruta JSON con el resumen y cada solicitud (opcional)
+
+    Returns:
+        True si ninguna solicitud falló
+    """
+    import json
+    from src.backend.monitoring.loadtest import LoadTest
+
+    if config.replica.backend == 'replica' and not replica.exists:
+        print(f"❌ La réplica {replica.path} no existe; ejecuta 'python main.py --sync-replica'")
+        return False
+
+    config.cache.enabled = use_cache
+    print(f"🏋️ Prueba de carga: {users} usuarios, {duration:.0f}s, pausa media {think_time}s")
+    print(f"   Origen: {config.replica.backend} · pool: {config.database.pool_size} conexiones · "
+          f"cache: {'sí' if use_cache else 'no'}\n")
+
+    result = LoadTest(
+        users=users,
+        duration_seconds=duration,
+        think_time_seconds=think_time,
+        grados=grados,
+        year_start=year_start,
+        year_end=year_end
+    ).run()
+    summary = result.summary()
+
+    print(f"   Solicitudes: {summary['requests']} · throughput: {summary['throughput_rps']} sol/s")
+    if 'latency_p50_ms' in summary:
+        print(f"   Latencia (ms): p50 {summary['latency_p50_ms']:.0f} · p95 {summary['latency_p95_ms']:.0f} · "
+              f"p99 {summary['latency_p99_ms']:.0f} · máx {summary['latency_max_ms']:.0f}")
+    if 'pool_wait_p50_ms' in summary:
+        print(f"   Espera del pool (ms): p50 {summary['pool_wait_p50_ms']:.0f} · p95 {summary['pool_wait_p95_ms']:.0f} · "
+              f"p99 {summary['pool_wait_p99_ms']:.0f} · máx {summary['pool_wait_max_ms']:.0f}")
+    memory = {k: f"{v:.0f}" if v is not None else '?' for k, v in result.memory_mb.items()}
+    print(f"   Memoria (MB): inicial {memory['start']} · pico {memory['peak']} · final {memory['end']}")
+
+    scenarios = result.by_scenario()
+    if not scenarios.empty:
+        print("\n" + scenarios.round(1).to_string(index=False))
+
+    if summary['errors']:
+        print("\n⚠️  Errores: " + ", ".join(f"{name} x{count}" for name, count in summary['errors'].items()))
+
+    if output:
+        with open(output, 'w') as f:
+            json.dump({
+                'summary': summary,
+                'requests': json.loads(result.samples.to_json(orient='records'))
+            }, f, ensure_ascii=False, indent=2, default=str)
+        print(f"\n💾 Resultado guardado en {output}")
+
+    return not summary['errors']
+
+
 def test_connection():
     """Prueba la conexión a la base de datos"""
     print("🔍 Probando conexión a PostgreSQL...")
@@ -105,6 +408,16 @@ Ejemplos:
   python main.py --generate --grados LL EL     # Solo Licenciatura y Especialidad
   python main.py --generate --year-start 2024  # Solo año 2024
   python main.py --test-connection             # Prueba la conexión a BD
+  python main.py --metrics                     # Tendencias y regresiones del job diario
+  python main.py --generate --diagnostics      # Genera y guarda EXPLAIN ANALYZE de cada query
+  python main.py --plans                       # Nodos más costosos y cambios de plan
+  python main.py --index-advisor               # Script DDL de índices recomendados
+  python main.py --sync-replica                # Copia incremental a la réplica local (DuckDB)
+  python main.py --generate --backend replica  # Genera sin consultar PostgreSQL
+  python main.py --generate --workers 3        # Un proceso por grado (extracción compartida)
+  python main.py --compare ref.xlsb nuevo.xlsx # Compara un reporte contra su referencia
+  python main.py --api                         # Inicia la API HTTP de solo lectura
+  python main.py --load-test --users 20        # Prueba de carga del dashboard sobre la réplica local
         """
     )
 
@@ -145,6 +458,138 @@ Ejemplos:
         help='Inicia el dashboard web'
     )
 
+    parser.add_argument(
+        '--api',
+        action='store_true',
+        help='Inicia la API HTTP de solo lectura'
+    )
+
+    parser.add_argument(
+        '--metrics', '-m',
+        action='store_true',
+        help='Muestra el historial de métricas y las etapas con regresión'
+    )
+
+    parser.add_argument(
+        '--metrics-job',
+        default='daily_report_generation',
+        help='Tarea a analizar con --metrics (por defecto: daily_report_generation)'
+    )
+
+    parser.add_argument(
+        '--metrics-runs',
+        type=int,
+        default=10,
+        help='Número de ejecuciones a mostrar con --metrics (por defecto: 10)'
+    )
+
+    parser.add_argument(
+        '--regression-factor',
+        type=float,
+        help=f'Factor sobre la línea base para marcar regresión (por defecto: {config.monitoring.regression_factor})'
+    )
+
+    parser.add_argument(
+        '--diagnostics',
+        action='store_true',
+        help='Con --generate: captura EXPLAIN (ANALYZE, BUFFERS) de cada query junto a las métricas'
+    )
+
+    parser.add_argument(
+        '--plans',
+        action='store_true',
+        help='Muestra los planes capturados de la última ejecución y los compara con los anteriores'
+    )
+
+    parser.add_argument(
+        '--plans-run',
+        type=int,
+        help='Ejecución a analizar con --plans (por defecto: la última con planes)'
+    )
+
+    parser.add_argument(
+        '--index-advisor',
+        action='store_true',
+        help='Analiza la carga de reportes y genera un script DDL de índices recomendados'
+    )
+
+    parser.add_argument(
+        '--output', '-o',
+        help='Ruta del script generado por --index-advisor (por defecto: data/index_advisor_<fecha>.sql) '
+             'o del JSON de --load-test'
+    )
+
+    parser.add_argument(
+        '--no-hypopg',
+        action='store_true',
+        help='Con --index-advisor: no estimar costos con índices hipotéticos'
+    )
+
+    parser.add_argument(
+        '--sync-replica',
+        action='store_true',
+        help='Sincroniza la réplica local (DuckDB) de las tablas usadas por los reportes'
+    )
+
+    parser.add_argument(
+        '--full-sync',
+        action='store_true',
+        help='Con --sync-replica: vuelve a copiar todas las tablas completas'
+    )
+
+    parser.add_argument(
+        '--backend',
+        choices=['postgres', 'replica'],
+        help=f'Origen de los datos para --generate (por defecto: {config.replica.backend}) y --load-test (por defecto: replica)'
+    )
+
+    parser.add_argument(
+        '--workers',
+        type=int,
+        help=f'Procesos para generar los grados en paralelo (por defecto: {config.reports.workers})'
+    )
+
+    parser.add_argument(
+        '--load-test',
+        action='store_true',
+        help='Simula usuarios concurrentes del dashboard (por defecto sobre la réplica local)'
+    )
+
+    parser.add_argument(
+        '--users',
+        type=int,
+        default=10,
+        help='Usuarios simultáneos de --load-test (por defecto: 10)'
+    )
+
+    parser.add_argument(
+        '--duration',
+        type=float,
+        default=60.0,
+        help='Segundos de --load-test (por defecto: 60)'
+    )
+
+    parser.add_argument(
+        '--think-time',
+        type=float,
+        default=1.0,
+        help='Pausa media en segundos entre solicitudes de un usuario con --load-test (por defecto: 1.0)'
+    )
+
+    parser.add_argument(
+        '--no-cache',
+        action='store_true',
+        help='Con --load-test: desactiva el cache de resultados para medir la base de datos en frío'
+    )
+
+    parser.add_argument(
+        '--compare',
+        nargs=2,
+        action='append',
+        metavar=('REFERENCIA', 'GENERADO'),
+        help='Compara hoja por hoja un reporte de referencia (XLSB/XLSX) contra uno generado (repetible)'
+    )
+
     args = parser.parse_args()
 
     # Si no se proporcionan argumentos, mostrar ayuda
@@ -157,6 +602,57 @@ Ejemplos:
         test_connection()
         return
 
+    # Historial de métricas
+    if args.metrics:
+        ok = show_metrics(
+            job_name=args.metrics_job,
+            runs=args.metrics_runs,
+            factor=args.regression_factor
+        )
+        sys.exit(0 if ok else 1)
+
+    # Planes de ejecución capturados
+    if args.plans:
+        ok = show_plans(run_id=args.plans_run)
+        sys.exit(0 if ok else 1)
+
+    # Recomendación de índices
+    if args.index_advisor:
+        ok = advise_indexes(
+            year_start=args.year_start,
+            year_end=args.year_end,
+            output=args.output,
+            use_hypopg=False if args.no_hypopg else None
+        )
+        sys.exit(0 if ok else 1)
+
+    # Sincronización de la réplica local
+    if args.sync_replica:
+        config.create_directories()
+        ok = sync_replica(full=args.full_sync)
+        sys.exit(0 if ok else 1)
+
+    # Prueba de carga
+    if args.load_test:
+        config.create_directories()
+        config.replica.backend = args.backend or 'replica'
+        ok = run_load_test(
+            users=args.users,
+            duration=args.duration,
+            think_time=args.think_time,
+            grados=args.grados,
+            year_start=args.year_start,
+            year_end=args.year_end,
+            use_cache=not args.no_cache,
+            output=args.output
+        )
+        sys.exit(0 if ok else 1)
+
+    # Comparación contra reportes de referencia
+    if args.compare:
+        ok = compare_reports(args.compare)
+        sys.exit(0 if ok else 1)
+
     # Iniciar dashboard
     if args.dashboard:
         print("🚀 Iniciando dashboard web...")
@@ -171,10 +667,25 @@ Ejemplos:
         ])
         return
 
+    # Iniciar API
+    if args.api:
+        import uvicorn
+        print("🚀 Iniciando API de reportes...")
+        print(f"   URL: http://localhost:{config.api.port}/docs")
+        uvicorn.run('src.backend.api.app:app', host=config.api.host, port=config.api.port)
+        return
+
     # Generar reportes
     if args.generate:
         config.create_directories()
 
+        if args.diagnostics:
+            config.monitoring.capture_plans = True
+        if args.backend:
+            config.replica.backend = args.backend
+        if args.workers:
+            config.reports.workers = args.workers
+
         success = generate_reports(
             grados=args.grados,
             year_start=args.year_start,
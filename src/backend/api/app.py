@@ -0,0 +1,351 @@
+"""
+API HTTP de solo lectura para indicadores de trayectoria (JSON y Arrow)
+"""
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import pandas as pd
+from fastapi import FastAPI, HTTPException, Query, Request, Response
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import JSONResponse
+
+from src import __version__
+from src.backend.db import cancellable, QueryCancelledError, QueryTimeoutError
+from src.backend.db.cancel import is_cancelled
+from src.backend.processors.cube import DIMENSIONS
+from src.backend.processors.data_service import load_trayectoria_data
+from src.utils.config import config
+from src.utils.logger import get_logger
+from src.utils.singleflight import SingleFlight
+
+
+logger = get_logger(__name__, config.paths.logs_dir)
+
+
+MEDIA_JSON = 'application/json'
+MEDIA_ARROW = 'application/vnd.apache.arrow.stream'
+
+# Encabezado con el que un cliente identifica solicitudes que se reemplazan entre sí
+CANCEL_HEADER = 'x-cancel-key'
+
+# Recurso -> función que obtiene el DataFrame desde load_trayectoria_data
+FRAME_RESOURCES: Dict[str, Callable[[Dict[str, Any]], pd.DataFrame]] = {
+    'resumen': lambda result: result['datos']['resumen'],
+    'trayectoria': lambda result: result['trayectoria'],
+    'fimpes': lambda result: result['fimpes']
+}
+
+
+class ResponseCache:
+    """LRU en memoria de respuestas ya serializadas (etag, cuerpo, tipo de contenido)"""
+
+    def __init__(self, max_items: int, ttl_seconds: int):
+        self.max_items = max_items
+        self.ttl_seconds = ttl_seconds
+        self._items: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Tuple) -> Optional[Tuple[str, bytes, str]]:
+        with self._lock:
+            item = self._items.get(key)
+            if item is None:
+                return None
+            stored_at, entry = item
+            if time.monotonic() - stored_at > self.ttl_seconds:
+                del self._items[key]
+                return None
+            self._items.move_to_end(key)
+            return entry
+
+    def put(self, key: Tuple, body: bytes, media_type: str) -> Tuple[str, bytes, str]:
+        etag = f'"{hashlib.sha1(body).hexdigest()}"'
+        entry = (etag, body, media_type)
+        with self._lock:
+            self._items[key] = (time.monotonic(), entry)
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_items:
+                self._items.popitem(last=False)
+        return entry
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+
+
+response_cache = ResponseCache(config.api.cache_items, config.api.cache_ttl_seconds)
+flight = SingleFlight()
+
+app = FastAPI(
+    title="API de Reportes de Trayectoria",
+    description="Indicadores de trayectoria por grado y rango de años (solo lectura)",
+    version=__version__
+)
+app.add_middleware(GZipMiddleware, minimum_size=config.api.gzip_min_size)
+
+
+@app.exception_handler(QueryTimeoutError)
+def query_timeout_handler(request: Request, exc: QueryTimeoutError) -> JSONResponse:
+    """La consulta excedió config.database.interactive_timeout_ms"""
+    return JSONResponse(status_code=504, content={'detail': 'La consulta excedió el tiempo límite'})
+
+
+@app.exception_handler(QueryCancelledError)
+def query_cancelled_handler(request: Request, exc: QueryCancelledError) -> JSONResponse:
+    """La solicitud fue reemplazada por otra con el mismo X-Cancel-Key"""
+    return JSONResponse(status_code=409, content={'detail': 'Solicitud reemplazada por una más reciente'})
+
+
+def _json_default(value: Any):
+    """Serializa tipos numpy/pandas para json.dumps"""
+    if hasattr(value, 'item'):
+        return value.item()
+    return str(value)
+
+
+def _frame_to_json(df: pd.DataFrame, meta: Dict[str, Any]) -> bytes:
+    """Serializa un DataFrame como {"meta": ..., "data": [registros]}"""
+    records = df.to_json(orient='records', force_ascii=False) if not df.empty else '[]'
+    meta_json = json.dumps(meta, ensure_ascii=False, default=_json_default)
+    return f'{{"meta": {meta_json}, "data": {records}}}'.encode('utf-8')
+
+
+def _frame_to_arrow(df: pd.DataFrame) -> bytes:
+    """Serializa un DataFrame en formato Arrow IPC (stream)"""
+    try:
+        import pyarrow as pa
+    except ImportError:
+        raise HTTPException(status_code=406, detail="Formato Arrow no disponible: instala pyarrow")
+
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def _validate_params(grado: str, year_start: Optional[int], year_end: Optional[int]) -> Tuple[int, int]:
+    """Valida grado y rango de años; retorna el rango con valores por defecto"""
+    if grado not in config.reports.grados:
+        raise HTTPException(status_code=404, detail=f"Grado no válido: {grado}")
+
+    year_start = year_start or config.reports.year_start
+    year_end = year_end or config.reports.year_end
+    if year_start > year_end:
+        raise HTTPException(status_code=422, detail="year_start debe ser menor o igual a year_end")
+
+    return year_start, year_end
+
+
+def _split(value: Optional[str]) -> List[str]:
+    """Convierte un parámetro separado por comas en lista"""
+    return [v.strip() for v in value.split(',') if v.strip()] if value else []
+
+
+def _shared(key: Tuple, fn: Callable[[], Any]) -> Tuple[Any, bool]:
+    """
+    flight.do que repite la ejecución si la compartida se canceló
+
+    Si la solicitud que ejecutaba la función fue reemplazada por su cliente,
+    las demás que esperaban su resultado no se cancelan: la repiten una vez.
+    """
+    try:
+        return flight.do(key, fn)
+    except QueryCancelledError:
+        if is_cancelled():
+            raise
+        logger.info(f"Ejecución compartida {key[0]} cancelada por otra solicitud; se repite")
+        return flight.do(key, fn)
+
+
+def _load(grado: str, year_start: int, year_end: int) -> Dict[str, Any]:
+    """Obtiene los datos de trayectoria coalesciendo solicitudes concurrentes idénticas"""
+    result, shared = _shared(
+        ('data', grado, year_start, year_end),
+        lambda: load_trayectoria_data(grado, year_start, year_end)
+    )
+    if shared:
+        logger.debug(f"Datos {grado} {year_start}-{year_end} compartidos con otra solicitud")
+    return result
+
+
+def _etag_matches(request: Request, etag: str) -> bool:
+    """Evalúa el encabezado If-None-Match contra el ETag actual"""
+    header = request.headers.get('if-none-match')
+    if not header:
+        return False
+    candidates = [tag.strip().removeprefix('W/') for tag in header.split(',')]
+    return '*' in candidates or etag in candidates
+
+
+def _cached_response(
+    request: Request,
+    key: Tuple,
+    build: Callable[[], Tuple[bytes, str]]
+) -> Response:
+    """
+    Responde desde el cache de respuestas o construye (una sola vez) la respuesta
+
+    Las queries se ejecutan con el límite config.database.interactive_timeout_ms;
+    una solicitud nueva con el mismo X-Cancel-Key cancela la anterior.
+
+    Args:
+        request: Solicitud HTTP (para If-None-Match)
+        key: Llave de la respuesta
+        build: Función que retorna (cuerpo, tipo de contenido)
+
+    Returns:
+        Respuesta 200 con ETag, o 304 si el cliente ya tiene la versión actual
+    """
+    entry = response_cache.get(key)
+    if entry is None:
+        cancel_key = request.headers.get(CANCEL_HEADER)
+        with cancellable(
+            ('api', cancel_key) if cancel_key else None,
+            timeout_ms=config.database.interactive_timeout_ms
+        ):
+            entry, _ = _shared(
+                ('response',) + key,
+                lambda: response_cache.get(key) or response_cache.put(key, *build())
+            )
+
+    etag, body, media_type = entry
+    headers = {'ETag': etag, 'Cache-Control': 'no-cache'}
+
+    if _etag_matches(request, etag):
+        return Response(status_code=304, headers=headers)
+
+    return Response(content=body, media_type=media_type, headers=headers)
+
+
+@app.get("/health")
+def health() -> Dict[str, Any]:
+    """Estado del servicio"""
+    return {'status': 'ok', 'version': __version__, 'in_flight': flight.in_flight()}
+
+
+@app.get("/api/v1/grados")
+def list_grados() -> Dict[str, Any]:
+    """Grados y rango de años configurados"""
+    return {
+        'grados': config.reports.grados,
+        'year_start': config.reports.year_start,
+        'year_end': config.reports.year_end
+    }
+
+
+@app.get("/api/v1/{grado}/metricas")
+def get_metricas(
+    request: Request,
+    grado: str,
+    year_start: Optional[int] = None,
+    year_end: Optional[int] = None,
+    format: str = Query('json', pattern='^(json|arrow)$')
+) -> Response:
+    """
+    Métricas de retención de un grado
+
+    Con format=arrow las métricas se entregan como una tabla de una fila
+    (una columna por métrica) en Arrow IPC (stream).
+    """
+    year_start, year_end = _validate_params(grado, year_start, year_end)
+
+    def build() -> Tuple[bytes, str]:
+        result = _load(grado, year_start, year_end)
+        if format == 'arrow':
+            metrics = result['metrics']
+            return _frame_to_arrow(pd.DataFrame([metrics]) if metrics else pd.DataFrame()), MEDIA_ARROW
+        body = {
+            'meta': {'grado': grado, 'year_start': year_start, 'year_end': year_end},
+            'data': result['metrics']
+        }
+        return json.dumps(body, ensure_ascii=False, default=_json_default).encode('utf-8'), MEDIA_JSON
+
+    return _cached_response(request, ('metricas', grado, year_start, year_end, format), build)
+
+
+@app.get("/api/v1/{grado}/cubo")
+def get_cubo(
+    request: Request,
+    grado: str,
+    year_start: Optional[int] = None,
+    year_end: Optional[int] = None,
+    dims: str = 'programa',
+    vista: str = Query('rollup', pattern='^(rollup|trayectoria)$'),
+    periodo: Optional[str] = None,
+    programa: Optional[str] = None,
+    campus: Optional[str] = None,
+    escuela: Optional[str] = None,
+    tipo: Optional[str] = None,
+    format: str = Query('json', pattern='^(json|arrow)$')
+) -> Response:
+    """
+    Consulta del cubo de trayectoria sin nuevas consultas a la base de datos
+
+    Los filtros periodo/programa/campus/escuela/tipo aceptan valores separados
+    por comas. vista=rollup cuenta estudiantes distintos por las dimensiones
+    de dims; vista=trayectoria entrega la matriz por generación del subconjunto.
+    """
+    year_start, year_end = _validate_params(grado, year_start, year_end)
+
+    group_by = _split(dims) if vista == 'rollup' else []
+    invalid = [d for d in group_by if d not in DIMENSIONS]
+    if invalid:
+        raise HTTPException(status_code=422, detail=f"Dimensiones no válidas: {', '.join(invalid)}")
+
+    filters = {
+        dim: values for dim, values in (
+            ('periodo', _split(periodo)),
+            ('programa', _split(programa)),
+            ('campus', _split(campus)),
+            ('escuela', _split(escuela)),
+            ('tipo', _split(tipo))
+        ) if values
+    }
+
+    def build() -> Tuple[bytes, str]:
+        cube = _load(grado, year_start, year_end)['cube'].dice(filters)
+        df = cube.rollup(group_by) if vista == 'rollup' else cube.trayectoria()
+        if format == 'arrow':
+            return _frame_to_arrow(df), MEDIA_ARROW
+        meta = {
+            'grado': grado, 'year_start': year_start, 'year_end': year_end,
+            'vista': vista, 'dims': group_by, 'filtros': filters, 'rows': len(df)
+        }
+        return _frame_to_json(df, meta), MEDIA_JSON
+
+    key = ('cubo', grado, year_start, year_end, vista, tuple(group_by),
+           tuple(sorted((d, tuple(v)) for d, v in filters.items())), format)
+    return _cached_response(request, key, build)
+
+
+@app.get("/api/v1/{grado}/{recurso}")
+def get_recurso(
+    request: Request,
+    grado: str,
+    recurso: str,
+    year_start: Optional[int] = None,
+    year_end: Optional[int] = None,
+    format: str = Query('json', pattern='^(json|arrow)$')
+) -> Response:
+    """
+    Tabla de un grado: resumen por periodo, matriz de trayectoria o cuadro FIMPES
+
+    El parámetro format=arrow entrega la tabla en Arrow IPC (stream).
+    """
+    if recurso not in FRAME_RESOURCES:
+        raise HTTPException(status_code=404, detail=f"Recurso no válido: {recurso}")
+
+    year_start, year_end = _validate_params(grado, year_start, year_end)
+
+    def build() -> Tuple[bytes, str]:
+        df = FRAME_RESOURCES[recurso](_load(grado, year_start, year_end))
+        if format == 'arrow':
+            return _frame_to_arrow(df), MEDIA_ARROW
+        meta = {'grado': grado, 'year_start': year_start, 'year_end': year_end, 'rows': len(df)}
+        return _frame_to_json(df, meta), MEDIA_JSON
+
+    return _cached_response(request, (recurso, grado, year_start, year_end, format), build)
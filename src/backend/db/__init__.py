@@ -3,5 +3,9 @@ Módulo de base de datos
 """
 from .connection import db, DatabaseConnection
 from .queries import QueryBuilder, TrayectoriaQueries
+from .replica_store import replica, ReplicaStore
+from .cancel import cancellable, QueryCancelledError, QueryTimeoutError
+from .slots import ConnectionSlots, PoolTimeoutError
 
-__all__ = ['db', 'DatabaseConnection', 'QueryBuilder', 'TrayectoriaQueries']
+__all__ = ['db', 'DatabaseConnection', 'QueryBuilder', 'TrayectoriaQueries', 'replica', 'ReplicaStore',
+           'cancellable', 'QueryCancelledError', 'QueryTimeoutError', 'ConnectionSlots', 'PoolTimeoutError']
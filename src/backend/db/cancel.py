@@ -0,0 +1,150 @@
+"""
+Módulo de cancelación y límite de tiempo de queries para solicitudes interactivas
+"""
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Dict, Generator, Hashable, Optional, Tuple
+
+from src.utils.config import config
+from src.utils.logger import get_logger
+
+
+logger = get_logger(__name__, config.paths.logs_dir)
+
+
+class QueryCancelledError(Exception):
+    """La query se canceló porque la solicitud fue reemplazada por una más reciente"""
+
+
+class QueryTimeoutError(Exception):
+    """La query excedió el límite de tiempo (statement_timeout)"""
+
+
+class CancelToken:
+    """
+    Señal de cancelación de las queries de una solicitud
+
+    Cada conexión registra su función de cancelación mientras ejecuta una
+    query (connection.cancel() en PostgreSQL, interrupt() en DuckDB); al
+    cancelar el token se interrumpen en el servidor las queries en curso y
+    las siguientes fallan antes de ejecutarse.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._cancelled = False
+        self._callbacks: Dict[int, Callable[[], None]] = {}
+        self._next_id = 0
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled
+
+    def cancel(self):
+        """Cancela las queries en curso y las posteriores"""
+        with self._lock:
+            self._cancelled = True
+            callbacks = list(self._callbacks.values())
+
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception as e:
+                logger.warning(f"No se pudo cancelar una query en curso: {e}")
+
+    def check(self):
+        """Lanza QueryCancelledError si el token ya se canceló"""
+        if self._cancelled:
+            raise QueryCancelledError("Solicitud reemplazada por una más reciente")
+
+    @contextmanager
+    def register(self, cancel: Callable[[], None]) -> Generator:
+        """
+        Registra la función que interrumpe la query en curso
+
+        Args:
+            cancel: Función sin argumentos que cancela la query en el servidor
+        """
+        with self._lock:
+            callback_id = self._next_id
+            self._next_id += 1
+            self._callbacks[callback_id] = cancel
+            cancelled = self._cancelled
+
+        try:
+            if cancelled:
+                cancel()
+            yield
+        finally:
+            with self._lock:
+                self._callbacks.pop(callback_id, None)
+
+
+# Token y límite de tiempo (ms) de la solicitud en el contexto actual
+_scope: ContextVar[Optional[Tuple[CancelToken, Optional[int]]]] = ContextVar('query_scope', default=None)
+
+# Solicitud vigente por llave (p. ej. sesión del dashboard o X-Cancel-Key de la API)
+_latest: Dict[Hashable, CancelToken] = {}
+_latest_lock = threading.Lock()
+
+
+def current_token() -> Optional[CancelToken]:
+    """Token de cancelación del contexto actual (o None)"""
+    scope = _scope.get()
+    return scope[0] if scope else None
+
+
+def current_timeout_ms() -> Optional[int]:
+    """Límite de tiempo por query del contexto actual en milisegundos (o None)"""
+    scope = _scope.get()
+    return scope[1] if scope else None
+
+
+def is_cancelled() -> bool:
+    """Si la solicitud del contexto actual fue cancelada"""
+    token = current_token()
+    return token is not None and token.cancelled
+
+
+@contextmanager
+def cancellable(key: Optional[Hashable] = None, timeout_ms: Optional[int] = None) -> Generator[CancelToken, None, None]:
+    """
+    Ámbito de queries cancelables y con límite de tiempo
+
+    Las queries de DatabaseConnection y de la réplica ejecutadas dentro del
+    ámbito (en el mismo hilo o contexto) usan su token y su límite. Con una
+    llave, abrir un ámbito nuevo con la misma llave cancela el anterior: la
+    solicitud reemplazada libera su conexión del pool y deja de consumir CPU
+    en el servidor.
+
+    Args:
+        key: Llave de la solicitud (None: no reemplaza a otras)
+        timeout_ms: Límite por query en milisegundos (None o 0: sin límite)
+
+    Yields:
+        Token de cancelación de la solicitud
+
+    Example:
+        with cancellable(('dashboard', session_id), timeout_ms=30000):
+            data = load_trayectoria_data('LL', 2021, 2025)
+    """
+    token = CancelToken()
+    previous = None
+    if key is not None:
+        with _latest_lock:
+            previous = _latest.get(key)
+            _latest[key] = token
+    if previous is not None and not previous.cancelled:
+        logger.info(f"Solicitud reemplazada, cancelando sus queries: {key}")
+        previous.cancel()
+
+    context = _scope.set((token, timeout_ms or None))
+    try:
+        yield token
+    finally:
+        _scope.reset(context)
+        if key is not None:
+            with _latest_lock:
+                if _latest.get(key) is token:
+                    del _latest[key]
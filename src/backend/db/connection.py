@@ -4,10 +4,16 @@ Módulo de conexión a PostgreSQL con pool de conexiones
 import psycopg2
 from psycopg2 import pool
 from psycopg2.extras import RealDictCursor
+from psycopg2.extensions import cursor as TupleCursor, QueryCanceledError
 from contextlib import contextmanager
-from typing import Optional, Generator
+from typing import Optional, Generator, List, Tuple
+import json
+import threading
 import time
+import uuid
 
+from src.backend.db.cancel import QueryCancelledError, QueryTimeoutError, current_token, current_timeout_ms
+from src.backend.db.slots import ConnectionSlots
 from src.utils.config import config
 from src.utils.logger import get_logger
 
@@ -19,15 +25,29 @@ class DatabaseConnection:
     """Manejador de conexiones a PostgreSQL con pool"""
 
     def __init__(self):
-        self._pool: Optional[pool.SimpleConnectionPool] = None
-        self._initialize_pool()
+        # El pool se crea con la primera conexión: importar el módulo no conecta a PostgreSQL
+        # (reportes con --backend replica, workers de generación en paralelo)
+        self._pool: Optional[pool.ThreadedConnectionPool] = None
+        self._pool_lock = threading.Lock()
+        # ThreadedConnectionPool falla si no hay conexión libre: los turnos hacen esperar
+        self.slots = ConnectionSlots(config.database.pool_size, config.database.pool_timeout_seconds)
+
+    @property
+    def pool(self) -> pool.ThreadedConnectionPool:
+        """Pool de conexiones (se inicializa en el primer uso)"""
+        if self._pool is None:
+            with self._pool_lock:
+                if self._pool is None:
+                    self._initialize_pool()
+        return self._pool
 
     def _initialize_pool(self):
         """Inicializa el pool de conexiones"""
         try:
             logger.info(f"Inicializando pool de conexiones a {config.database.host}:{config.database.port}")
 
-            self._pool = psycopg2.pool.SimpleConnectionPool(
+            # ThreadedConnectionPool: el dashboard, la API y el scheduler piden conexiones desde varios hilos
+            self._pool = psycopg2.pool.ThreadedConnectionPool(
                 minconn=1,
                 maxconn=config.database.pool_size,
                 host=config.database.host,
@@ -50,6 +70,9 @@ class DatabaseConnection:
         """
         Context manager para obtener una conexión del pool
 
+        Si todas las conexiones están ocupadas espera un turno (hasta
+        database.pool_timeout_seconds) en lugar de fallar.
+
         Yields:
             Conexión de PostgreSQL
 
@@ -59,21 +82,22 @@ class DatabaseConnection:
                     cur.execute("SELECT * FROM table")
         """
         conn = None
-        try:
-            conn = self._pool.getconn()
-            logger.debug("Conexión obtenida del pool")
-            yield conn
+        with self.slots.acquire():
+            try:
+                conn = self.pool.getconn()
+                logger.debug("Conexión obtenida del pool")
+                yield conn
 
-        except psycopg2.Error as e:
-            if conn:
-                conn.rollback()
-            logger.error(f"Error en la conexión: {e}")
-            raise
+            except psycopg2.Error as e:
+                if conn:
+                    conn.rollback()
+                logger.error(f"Error en la conexión: {e}")
+                raise
 
-        finally:
-            if conn:
-                self._pool.putconn(conn)
-                logger.debug("Conexión devuelta al pool")
+            finally:
+                if conn:
+                    self.pool.putconn(conn)
+                    logger.debug("Conexión devuelta al pool")
 
     @contextmanager
     def get_cursor(self, commit: bool = False) -> Generator:
@@ -104,10 +128,56 @@ class DatabaseConnection:
             finally:
                 cursor.close()
 
+    @contextmanager
+    def _interruptible(self, conn) -> Generator:
+        """
+        Aplica el límite de tiempo y la cancelación del ámbito actual (cancel.cancellable)
+
+        El límite se fija con SET LOCAL statement_timeout y la cancelación usa
+        connection.cancel() (cancelación a nivel de conexión, segura desde otro
+        hilo). Al terminar se revierte la transacción para que el límite no
+        quede en la conexión devuelta al pool.
+
+        Raises:
+            QueryCancelledError: Si la solicitud fue reemplazada
+            QueryTimeoutError: Si la query excedió el límite
+        """
+        token = current_token()
+        timeout_ms = current_timeout_ms()
+        if token is None and not timeout_ms:
+            yield
+            return
+
+        if token is not None:
+            token.check()
+        if timeout_ms:
+            with conn.cursor() as cursor:
+                cursor.execute("SET LOCAL statement_timeout = %s", (int(timeout_ms),))
+
+        try:
+            if token is not None:
+                with token.register(conn.cancel):
+                    yield
+            else:
+                yield
+        except QueryCanceledError as e:
+            conn.rollback()
+            if token is not None and token.cancelled:
+                logger.info("Query cancelada: la solicitud fue reemplazada")
+                raise QueryCancelledError("Solicitud reemplazada por una más reciente") from e
+            logger.warning(f"Query cancelada por límite de tiempo ({timeout_ms} ms)")
+            raise QueryTimeoutError(f"La query excedió el límite de {timeout_ms} ms") from e
+        finally:
+            if timeout_ms:
+                conn.rollback()
+
     def execute_query(self, query: str, params: tuple = None, fetch: str = 'all'):
         """
         Ejecuta una query y retorna los resultados
 
+        Dentro de un ámbito cancel.cancellable la query respeta su límite de
+        tiempo y se interrumpe si la solicitud es reemplazada.
+
         Args:
             query: Query SQL a ejecutar
             params: Parámetros de la query (opcional)
@@ -120,16 +190,17 @@ class DatabaseConnection:
 
         with self.get_cursor() as cursor:
             try:
-                cursor.execute(query, params)
-
-                if fetch == 'all':
-                    results = cursor.fetchall()
-                elif fetch == 'one':
-                    results = cursor.fetchone()
-                elif fetch == 'many':
-                    results = cursor.fetchmany(size=1000)
-                else:
-                    results = None
+                with self._interruptible(cursor.connection):
+                    cursor.execute(query, params)
+
+                    if fetch == 'all':
+                        results = cursor.fetchall()
+                    elif fetch == 'one':
+                        results = cursor.fetchone()
+                    elif fetch == 'many':
+                        results = cursor.fetchmany(size=1000)
+                    else:
+                        results = None
 
                 elapsed = time.time() - start_time
                 logger.debug(f"Query ejecutada en {elapsed:.2f}s")
@@ -141,6 +212,109 @@ class DatabaseConnection:
                 logger.error(f"Query: {query[:200]}")
                 raise
 
+    def explain_query(self, query: str, params: tuple = None, analyze: bool = True):
+        """
+        Obtiene el plan de ejecución de una query en formato JSON
+
+        Con analyze=True la query se ejecuta realmente (EXPLAIN ANALYZE, BUFFERS)
+        para obtener tiempos, filas e I/O reales por nodo; la transacción se
+        revierte al terminar.
+
+        Args:
+            query: Query SQL a analizar
+            params: Parámetros de la query (opcional)
+            analyze: Si ejecutar la query para obtener métricas reales
+
+        Returns:
+            Plan de EXPLAIN (FORMAT JSON): lista con un documento por sentencia
+        """
+        options = "ANALYZE, BUFFERS, FORMAT JSON" if analyze else "FORMAT JSON"
+        start_time = time.time()
+
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            try:
+                cursor.execute(f"EXPLAIN ({options}) {query}", params)
+                row = cursor.fetchone()
+                plan = row['QUERY PLAN'] if isinstance(row, dict) else row[0]
+                if isinstance(plan, str):
+                    plan = json.loads(plan)
+
+                elapsed = time.time() - start_time
+                logger.debug(f"Plan obtenido en {elapsed:.2f}s")
+
+                return plan
+
+            except psycopg2.Error as e:
+                logger.error(f"Error obteniendo plan de ejecución: {e}")
+                logger.error(f"Query: {query[:200]}")
+                raise
+
+            finally:
+                cursor.close()
+                conn.rollback()
+
+    def stream_query(
+        self,
+        query: str,
+        params: tuple = None,
+        batch_size: int = 5000
+    ) -> Generator[Tuple[List[str], List[tuple]], None, None]:
+        """
+        Ejecuta una query con un cursor del lado del servidor y entrega lotes de filas
+
+        A diferencia de execute_query, el resultado nunca se materializa completo:
+        PostgreSQL envía `batch_size` filas por viaje y cada lote se libera al
+        pedir el siguiente. Las filas son tuplas (no diccionarios) para reducir memoria.
+
+        Args:
+            query: Query SQL a ejecutar
+            params: Parámetros de la query (opcional)
+            batch_size: Número de filas por lote
+
+        Yields:
+            Tupla (columnas, filas) por lote; el primer lote siempre se entrega,
+            aunque esté vacío, para conocer los nombres de columna
+
+        Example:
+            for columns, rows in db.stream_query("SELECT * FROM table"):
+                process(rows)
+        """
+        start_time = time.time()
+        total_rows = 0
+
+        with self.get_connection() as conn, self._interruptible(conn):
+            cursor = conn.cursor(name=f"stream_{uuid.uuid4().hex[:12]}", cursor_factory=TupleCursor)
+            cursor.itersize = batch_size
+            try:
+                cursor.execute(query, params)
+
+                rows = cursor.fetchmany(batch_size)
+                columns = [desc[0] for desc in cursor.description]
+                while True:
+                    total_rows += len(rows)
+                    yield columns, rows
+                    if len(rows) < batch_size:
+                        break
+                    rows = cursor.fetchmany(batch_size)
+
+                elapsed = time.time() - start_time
+                logger.debug(f"Query en streaming completada: {total_rows} filas en {elapsed:.2f}s")
+
+            except QueryCanceledError:
+                # Cancelación o límite de tiempo: la reporta _interruptible
+                raise
+
+            except psycopg2.Error as e:
+                logger.error(f"Error ejecutando query en streaming: {e}")
+                logger.error(f"Query: {query[:200]}")
+                raise
+
+            finally:
+                cursor.close()
+                # Cierra la transacción de lectura abierta por el cursor con nombre
+                conn.rollback()
+
     def execute_many(self, query: str, params_list: list):
         """
         Ejecuta una query múltiples veces con diferentes parámetros
@@ -173,9 +347,10 @@ class DatabaseConnection:
             return False
 
     def close(self):
-        """Cierra el pool de conexiones"""
+        """Cierra el pool de conexiones (no hace nada si nunca se abrió)"""
         if self._pool:
             self._pool.closeall()
+            self._pool = None
             logger.info("Pool de conexiones cerrado")
 
     def __del__(self):
@@ -0,0 +1,426 @@
+"""
+Módulo de recomendación de índices para el esquema core según la carga de los reportes
+"""
+import re
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from src.backend.db.connection import db, DatabaseConnection
+from src.backend.db.queries import QueryBuilder
+from src.utils.config import config
+from src.utils.logger import get_logger
+
+
+logger = get_logger(__name__, config.paths.logs_dir)
+
+
+@dataclass
+class IndexCandidate:
+    """Índice candidato para la carga de reportes"""
+    table: str
+    columns: List[str]
+    rationale: str
+    include: List[str] = field(default_factory=list)
+    where: Optional[str] = None
+    opclass: Optional[str] = None
+    pattern: Optional[str] = None  # Regex que la query debe contener para beneficiarse
+
+    @property
+    def name(self) -> str:
+        """Nombre determinista del índice (idx_<tabla>_<columnas>[_pattern|_partial])"""
+        suffix = '_pattern' if self.opclass else ''
+        suffix += '_partial' if self.where else ''
+        return f"idx_{self.table}_{'_'.join(self.columns)}{suffix}"
+
+    def ddl(self, schema: str, hypothetical: bool = False) -> str:
+        """
+        Sentencia CREATE INDEX del candidato
+
+        Args:
+            schema: Esquema de la tabla
+            hypothetical: Si True, sentencia simple para hypopg_create_index
+                (sin CONCURRENTLY, IF NOT EXISTS ni punto y coma)
+        """
+        columns = ', '.join(f"{c} {self.opclass}" if self.opclass else c for c in self.columns)
+        modifiers = '' if hypothetical else 'CONCURRENTLY IF NOT EXISTS '
+        sql = f"CREATE INDEX {modifiers}{self.name}\n    ON {schema}.{self.table} ({columns})"
+        if self.include:
+            sql += f"\n    INCLUDE ({', '.join(self.include)})"
+        if self.where:
+            sql += f"\n    WHERE {self.where}"
+        return sql if hypothetical else sql + ';'
+
+
+# Candidatos derivados de los joins y filtros de TrayectoriaQueries
+CANDIDATES = [
+    IndexCandidate(
+        'lista_asistencia', ['periodo_id', 'estudiante_id'],
+        "Subconsultas correlacionadas (la.periodo_id = pe.id) y joins de NI/REI/Hoja1; "
+        "cubre count(DISTINCT la.estudiante_id) con un index-only scan"
+    ),
+    IndexCandidate(
+        'estudiante_programa', ['estudiante_id', 'periodo_ingreso_id'],
+        "Join ep.estudiante_id = e.id con filtro ep.periodo_ingreso_id = pe.id; "
+        "INCLUDE evita leer el heap para el filtro de programa y estatus",
+        include=['programa_id', 'estatus_academico_id']
+    ),
+    IndexCandidate(
+        'estudiante_programa', ['programa_id'],
+        "Filtro ep.programa_id LIKE '<grado>%': con una intercalación distinta de C "
+        "un índice btree normal no sirve para prefijos",
+        opclass='text_pattern_ops',
+        pattern=r"programa_id LIKE '"
+    ),
+    IndexCandidate(
+        'estudiante_programa', ['programa_id', 'periodo_ingreso_id'],
+        "Subconsultas de egresados y titulados (ep.estatus_academico_id = 'EG'); "
+        "índice parcial pequeño solo con los egresados",
+        include=['estudiante_id'],
+        where="estatus_academico_id = 'EG'",
+        pattern=r"estatus_academico_id = 'EG'"
+    ),
+    IndexCandidate(
+        'titulado', ['estudiante_id', 'programa_id'],
+        "Join (ep.estudiante_id, ep.programa_id) = (t.estudiante_id, t.programa_id) "
+        "y EXISTS de la query de estatus"
+    ),
+    IndexCandidate(
+        'periodo', ['year'],
+        'Filtro pe."year" BETWEEN en todas las queries',
+        include=['id']
+    ),
+    IndexCandidate(
+        'programas_titulados', ['clave_programa'],
+        "Semi-join programa_id IN (SELECT clave_programa FROM core.programas_titulados)"
+    )
+]
+
+
+@dataclass
+class IndexRecommendation:
+    """Resultado del análisis de un candidato"""
+    candidate: IndexCandidate
+    queries: List[str]
+    existing: Optional[str] = None
+    stats: Dict[str, Dict] = field(default_factory=dict)
+    cost_before: Dict[str, float] = field(default_factory=dict)
+    cost_after: Dict[str, float] = field(default_factory=dict)
+
+    @property
+    def improvement(self) -> Optional[float]:
+        """Reducción relativa del costo estimado de la carga (0-1), None sin hypopg"""
+        before = sum(self.cost_before.get(q, 0.0) for q in self.cost_after)
+        after = sum(self.cost_after.values())
+        if not self.cost_after or not before:
+            return None
+        return (before - after) / before
+
+
+class IndexAdvisor:
+    """
+    Recomienda índices para las queries de TrayectoriaQueries
+
+    Compara los candidatos contra pg_indexes, documenta la selectividad de sus
+    columnas con pg_stats y, si la extensión hypopg está instalada, estima el
+    efecto de cada índice con planes hipotéticos (EXPLAIN sin ejecutar la query).
+    """
+
+    def __init__(
+        self,
+        connection: Optional[DatabaseConnection] = None,
+        year_start: Optional[int] = None,
+        year_end: Optional[int] = None,
+        grados: Optional[List[str]] = None
+    ):
+        """
+        Inicializa el recomendador
+
+        Args:
+            connection: Conexión a PostgreSQL (por defecto la instancia global db)
+            year_start: Año inicial de la carga (por defecto desde config)
+            year_end: Año final de la carga (por defecto desde config)
+            grados: Grados de la carga (por defecto config.reports.grados)
+        """
+        self.db = connection or db
+        self.schema = config.database.schema
+        self.year_start = year_start or config.reports.year_start
+        self.year_end = year_end or config.reports.year_end
+        self.grados = grados or config.reports.grados
+
+    def workload(self) -> Dict[str, str]:
+        """
+        Queries de la generación nocturna
+
+        Returns:
+            Diccionario nombre -> SQL
+        """
+        builder = QueryBuilder(self.year_start, self.year_end)
+        queries = {
+            'periodo_programa': builder.get_query('periodo_programa'),
+            'periodos': builder.get_query('periodos'),
+            'todos': builder.get_query('todos')
+        }
+        for grado in self.grados:
+            for query_type in ('resumen', 'nuevo_ingreso', 'reinscritos', 'estatus'):
+                queries[f"{query_type}_{grado}"] = builder.get_query(query_type, grado=grado)
+        return queries
+
+    @staticmethod
+    def queries_using(candidate: IndexCandidate, workload: Dict[str, str]) -> List[str]:
+        """Queries de la carga que referencian la tabla, las columnas clave y el patrón del candidato"""
+        patterns = [rf"\bcore\.{candidate.table}\b"] + [rf"\b{c}\b" for c in candidate.columns]
+        if candidate.pattern:
+            patterns.append(candidate.pattern)
+        compiled = [re.compile(p) for p in patterns]
+        return [name for name, sql in workload.items() if all(p.search(sql) for p in compiled)]
+
+    def existing_indexes(self) -> Dict[str, List[Tuple[str, str]]]:
+        """
+        Índices existentes del esquema (pg_indexes)
+
+        Returns:
+            Diccionario tabla -> lista de (nombre, definición)
+        """
+        rows = self.db.execute_query(
+            "SELECT tablename, indexname, indexdef FROM pg_indexes WHERE schemaname = %s",
+            (self.schema,)
+        )
+        indexes: Dict[str, List[Tuple[str, str]]] = {}
+        for row in rows or []:
+            indexes.setdefault(row['tablename'], []).append((row['indexname'], row['indexdef']))
+        return indexes
+
+    @staticmethod
+    def covering_index(candidate: IndexCandidate, indexes: List[Tuple[str, str]]) -> Optional[str]:
+        """
+        Índice existente que ya sirve al candidato
+
+        Un índice lo cubre si sus columnas clave empiezan con las del candidato
+        (con el mismo opclass cuando el candidato lo requiere) y, para candidatos
+        parciales, si no es a su vez parcial sobre otra condición.
+
+        Returns:
+            Nombre del índice existente o None
+        """
+        for name, indexdef in indexes:
+            match = re.search(r"USING \w+ \((.*?)\)(?: INCLUDE|\s*WHERE|$)", indexdef)
+            if not match:
+                continue
+            keys = [k.strip().strip('"') for k in match.group(1).split(',')]
+            if len(keys) < len(candidate.columns):
+                continue
+
+            prefix_ok = all(
+                key.split()[0].strip('"') == column and
+                (candidate.opclass is None or candidate.opclass in key)
+                for key, column in zip(keys, candidate.columns)
+            )
+            # Sin text_pattern_ops, un índice con opclass de patrón no sirve a igualdades con orden
+            if candidate.opclass is None and any('pattern_ops' in k for k in keys[:len(candidate.columns)]):
+                prefix_ok = False
+            partial = ' WHERE ' in indexdef
+            if prefix_ok and (not partial or (candidate.where and candidate.where in indexdef)):
+                return name
+        return None
+
+    def column_stats(self, candidates: List[IndexCandidate]) -> Dict[Tuple[str, str], Dict]:
+        """
+        Estadísticas de las columnas candidatas (pg_stats) y filas estimadas por tabla (pg_class)
+
+        Returns:
+            Diccionario (tabla, columna) -> n_distinct, null_frac, correlation, reltuples
+        """
+        tables = sorted({c.table for c in candidates})
+        rows = self.db.execute_query(
+            """
+            SELECT s.tablename, s.attname, s.n_distinct, s.null_frac, s.correlation, c.reltuples
+            FROM pg_stats AS s
+            JOIN pg_namespace AS n ON n.nspname = s.schemaname
+            JOIN pg_class AS c ON c.relnamespace = n.oid AND c.relname = s.tablename
+            WHERE s.schemaname = %s AND s.tablename = ANY(%s)
+            """,
+            (self.schema, tables)
+        )
+        return {
+            (row['tablename'], row['attname']): {
+                'n_distinct': row['n_distinct'],
+                'null_frac': row['null_frac'],
+                'correlation': row['correlation'],
+                'reltuples': row['reltuples']
+            }
+            for row in rows or []
+        }
+
+    def collation(self) -> Optional[str]:
+        """Intercalación de la base de datos (con 'C' o 'POSIX' no hace falta text_pattern_ops)"""
+        row = self.db.execute_query(
+            "SELECT datcollate FROM pg_database WHERE datname = current_database()",
+            fetch='one'
+        )
+        return row['datcollate'] if row else None
+
+    def hypopg_available(self) -> bool:
+        """Si la extensión hypopg está instalada en la base de datos"""
+        row = self.db.execute_query(
+            "SELECT count(*) AS n FROM pg_extension WHERE extname = 'hypopg'",
+            fetch='one'
+        )
+        return bool(row and row['n'])
+
+    def estimate(self, recommendations: List[IndexRecommendation], workload: Dict[str, str]):
+        """
+        Estima con hypopg el costo de las queries antes y después de cada índice
+
+        Los índices hipotéticos solo existen en la sesión, por lo que todo el
+        análisis usa una misma conexión. Se compara el costo total estimado por
+        el planificador (EXPLAIN sin ANALYZE: las queries no se ejecutan).
+
+        Args:
+            recommendations: Recomendaciones a evaluar (se completan en sitio)
+            workload: Queries de la carga
+        """
+        def plan_cost(cursor, sql: str) -> float:
+            cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}")
+            row = cursor.fetchone()
+            plan = row['QUERY PLAN'] if isinstance(row, dict) else row[0]
+            return float(plan[0]['Plan']['Total Cost'])
+
+        with self.db.get_cursor() as cursor:
+            cursor.execute("SELECT hypopg_reset()")
+            baseline = {
+                name: plan_cost(cursor, sql)
+                for name, sql in workload.items()
+                if any(name in rec.queries for rec in recommendations)
+            }
+
+            for rec in recommendations:
+                rec.cost_before = {q: baseline[q] for q in rec.queries}
+                cursor.execute(
+                    "SELECT * FROM hypopg_create_index(%s)",
+                    (rec.candidate.ddl(self.schema, hypothetical=True),)
+                )
+                rec.cost_after = {q: plan_cost(cursor, workload[q]) for q in rec.queries}
+                cursor.execute("SELECT hypopg_reset()")
+
+                if rec.improvement is not None:
+                    logger.info(f"{rec.candidate.name}: costo estimado {rec.improvement:+.1%} menor")
+
+    def analyze(self, use_hypopg: Optional[bool] = None) -> List[IndexRecommendation]:
+        """
+        Analiza los candidatos contra el esquema actual
+
+        Args:
+            use_hypopg: Si estimar con índices hipotéticos (por defecto, si hypopg está instalada)
+
+        Returns:
+            Lista de recomendaciones (incluye candidatos ya cubiertos, con `existing`)
+        """
+        workload = self.workload()
+        indexes = self.existing_indexes()
+        collation = self.collation()
+        stats = self.column_stats(CANDIDATES)
+
+        recommendations = []
+        for candidate in CANDIDATES:
+            queries = self.queries_using(candidate, workload)
+            if not queries:
+                continue
+            if candidate.opclass == 'text_pattern_ops' and collation in ('C', 'POSIX'):
+                logger.info(f"Intercalación {collation}: {candidate.name} no es necesario")
+                continue
+
+            recommendations.append(IndexRecommendation(
+                candidate=candidate,
+                queries=queries,
+                existing=self.covering_index(candidate, indexes.get(candidate.table, [])),
+                stats={
+                    column: stats[(candidate.table, column)]
+                    for column in candidate.columns
+                    if (candidate.table, column) in stats
+                }
+            ))
+
+        pending = [rec for rec in recommendations if rec.existing is None]
+        if use_hypopg is None:
+            use_hypopg = self.hypopg_available()
+        if use_hypopg and pending:
+            self.estimate(pending, workload)
+        elif pending:
+            logger.info("hypopg no disponible: las recomendaciones no incluyen costos estimados")
+
+        logger.info(
+            f"Índices analizados: {len(recommendations)} candidatos, "
+            f"{len(pending)} sin índice existente equivalente"
+        )
+        return recommendations
+
+    def render_script(self, recommendations: List[IndexRecommendation]) -> str:
+        """
+        Genera el script DDL para revisión de los DBAs
+
+        Los índices se crean con CONCURRENTLY (no bloquean escrituras) y cada uno
+        lleva como comentario la evidencia: queries afectadas, estadísticas y
+        costo estimado antes/después.
+
+        Returns:
+            Script SQL
+        """
+        lines = [
+            "-- Recomendación de índices para la generación de reportes de trayectoria",
+            f"-- Generado: {datetime.now():%Y-%m-%d %H:%M}",
+            f"-- Base de datos: {config.database.database} (esquema {self.schema})",
+            f"-- Carga: TrayectoriaQueries {self.year_start}-{self.year_end}, grados {', '.join(self.grados)}",
+            "-- Revisar antes de aplicar. CREATE INDEX CONCURRENTLY no puede ejecutarse dentro de una transacción.",
+            ""
+        ]
+
+        pending = [rec for rec in recommendations if rec.existing is None]
+        pending.sort(key=lambda rec: -(rec.improvement or 0.0))
+
+        created_tables = set()
+        for rec in pending:
+            lines.append(f"-- {rec.candidate.name}")
+            lines.append(f"-- Motivo: {rec.candidate.rationale}")
+            lines.append(f"-- Queries: {', '.join(rec.queries)}")
+            for column, s in rec.stats.items():
+                lines.append(
+                    f"-- pg_stats {column}: n_distinct={s['n_distinct']}, null_frac={s['null_frac']}, "
+                    f"correlation={s['correlation']}, filas≈{int(s['reltuples'] or 0)}"
+                )
+
+            if rec.improvement is not None:
+                changed = [q for q in rec.queries if rec.cost_after[q] != rec.cost_before[q]]
+                for query in changed:
+                    lines.append(
+                        f"-- Costo {query}: {rec.cost_before[query]:.0f} -> {rec.cost_after[query]:.0f}"
+                    )
+                if len(changed) < len(rec.queries):
+                    lines.append(f"-- Sin cambio de costo en {len(rec.queries) - len(changed)} queries")
+                lines.append(f"-- Mejora estimada de la carga: {rec.improvement:.1%}")
+
+                if rec.improvement <= 0:
+                    lines.append("-- El planificador no usaría este índice; se deja comentado")
+                    lines.extend(f"-- {line}" for line in rec.candidate.ddl(self.schema).splitlines())
+                    lines.append("")
+                    continue
+
+            lines.append(rec.candidate.ddl(self.schema))
+            lines.append("")
+            created_tables.add(rec.candidate.table)
+
+        if created_tables:
+            lines.append("-- Actualizar estadísticas después de crear los índices")
+            lines.extend(f"ANALYZE {self.schema}.{table};" for table in sorted(created_tables))
+            lines.append("")
+        else:
+            lines.append("-- Sin índices nuevos recomendados")
+            lines.append("")
+
+        covered = [rec for rec in recommendations if rec.existing]
+        if covered:
+            lines.append("-- Candidatos ya cubiertos por índices existentes:")
+            lines.extend(f"--   {rec.candidate.name}: {rec.existing}" for rec in covered)
+            lines.append("")
+
+        return '\n'.join(lines)
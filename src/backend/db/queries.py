@@ -192,6 +192,175 @@ class TrayectoriaQueries:
         ORDER BY pe.id ASC, pr.id ASC
         """
 
+    @staticmethod
+    def get_hechos_inscripcion(year_start: int, year_end: int, grado: str) -> str:
+        """
+        Hechos de inscripción del grado (NI y Reinscritos) con solo llaves
+
+        Mismos joins y filtros que get_estudiantes_nuevo_ingreso y
+        get_estudiantes_reinscritos, sin columnas de texto: los nombres, campus,
+        escuela y descripciones se obtienen de las dimensiones.
+
+        Args:
+            year_start: Año inicial
+            year_end: Año final
+            grado: Grado académico (LL, EL, ML)
+
+        Returns:
+            Query SQL con periodo_id, estudiante_id, programa_id y es_ni
+        """
+        return f"""
+        SELECT DISTINCT
+            pe.id AS "periodo_id",
+            e.id AS "estudiante_id",
+            pr.id AS "programa_id",
+            (ep.periodo_ingreso_id = pe.id) AS "es_ni"
+        FROM core.periodo AS pe
+        JOIN core.lista_asistencia AS la ON pe.id = la.periodo_id
+        JOIN core.estudiante AS e ON la.estudiante_id = e.id
+        JOIN core.estudiante_programa AS ep ON (e.id) = (ep.estudiante_id)
+        JOIN core.programa AS pr ON ep.programa_id = pr.id
+        JOIN core.cat_grado_academico AS cga ON pr.grado_academico_id = cga.id
+        WHERE pe."year" BETWEEN {year_start} AND {year_end}
+        AND pr.id IN (SELECT clave_programa FROM core.programas_titulados)
+        AND ep.periodo_ingreso_id IS NOT NULL
+        AND ep.programa_id LIKE '{grado}%'
+        ORDER BY pe.id ASC, pr.id ASC
+        """
+
+    @staticmethod
+    def get_hechos_asistencia(year_start: int, year_end: int) -> str:
+        """
+        Hechos de asistencia consolidados (Hoja1) con solo llaves
+
+        Mismos joins y orden que get_todos_los_datos.
+
+        Args:
+            year_start: Año inicial
+            year_end: Año final
+
+        Returns:
+            Query SQL con periodo_id, estudiante_id y programa_id
+        """
+        return f"""
+        SELECT
+            pe.id AS "periodo_id",
+            e.id AS "estudiante_id",
+            pr.id AS "programa_id"
+        FROM core.periodo AS pe
+        JOIN core.lista_asistencia AS la ON pe.id = la.periodo_id
+        JOIN core.estudiante AS e ON la.estudiante_id = e.id
+        JOIN core.estudiante_programa AS ep ON (e.id) = (ep.estudiante_id)
+        JOIN core.programa AS pr ON ep.programa_id = pr.id
+        JOIN core.cat_grado_academico AS cga ON pr.grado_academico_id = cga.id
+        WHERE pe."year" BETWEEN {year_start} AND {year_end}
+        ORDER BY pe.id DESC, e.apellidos ASC
+        """
+
+    @staticmethod
+    def get_dim_estudiantes(year_start: int, year_end: int) -> str:
+        """
+        Dimensión de estudiantes con asistencia en el rango
+
+        Args:
+            year_start: Año inicial
+            year_end: Año final
+
+        Returns:
+            Query SQL con estudiante_id y nombre completo
+        """
+        return f"""
+        SELECT
+            e.id AS "estudiante_id",
+            e.apellidos || ' ' || e.nombres AS "estudiante_nombre"
+        FROM core.estudiante AS e
+        WHERE e.id IN (
+            SELECT la.estudiante_id
+            FROM core.lista_asistencia AS la
+            JOIN core.periodo AS pe ON la.periodo_id = pe.id
+            WHERE pe."year" BETWEEN {year_start} AND {year_end}
+        )
+        """
+
+    @staticmethod
+    def get_dim_programas() -> str:
+        """
+        Dimensión de programas con su nivel académico
+
+        Returns:
+            Query SQL con programa_id, campus, escuela, nivel y descripciones
+        """
+        return """
+        SELECT
+            pr.id AS "programa_id",
+            pr.campus,
+            cga.descripcion AS "nivel",
+            LEFT(pr.id, LENGTH(pr.id) - 3) AS "program",
+            pr.escuela,
+            pr.nombre || ' ' || pr.plan AS "programa"
+        FROM core.programa AS pr
+        JOIN core.cat_grado_academico AS cga ON pr.grado_academico_id = cga.id
+        """
+
+    @staticmethod
+    def get_estatus_estudiantes(year_start: int, year_end: int, grado: str) -> str:
+        """
+        Programas, estatus académico y titulación de los estudiantes del grado
+
+        Una fila por (estudiante, programa) para los estudiantes con asistencia
+        en el rango; se usa para egresados, titulados y cambios de carrera.
+
+        Args:
+            year_start: Año inicial
+            year_end: Año final
+            grado: Grado académico (LL, EL, ML)
+
+        Returns:
+            Query SQL con el estatus por estudiante y programa
+        """
+        return f"""
+        SELECT
+            ep.estudiante_id,
+            ep.programa_id,
+            ep.periodo_ingreso_id,
+            ep.estatus_academico_id,
+            EXISTS (
+                SELECT 1 FROM core.titulado AS t
+                WHERE (t.estudiante_id, t.programa_id) = (ep.estudiante_id, ep.programa_id)
+            ) AS "titulado"
+        FROM core.estudiante_programa AS ep
+        WHERE ep.programa_id IN (SELECT clave_programa FROM core.programas_titulados)
+        AND ep.programa_id LIKE '{grado}%'
+        AND ep.estudiante_id IN (
+            SELECT la.estudiante_id
+            FROM core.lista_asistencia AS la
+            JOIN core.periodo AS pe ON la.periodo_id = pe.id
+            WHERE pe."year" BETWEEN {year_start} AND {year_end}
+        )
+        ORDER BY ep.estudiante_id ASC, ep.periodo_ingreso_id ASC
+        """
+
+    @staticmethod
+    def get_periodos(year_start: int, year_end: int) -> str:
+        """
+        Calendario de periodos del rango en orden cronológico
+
+        Args:
+            year_start: Año inicial
+            year_end: Año final
+
+        Returns:
+            Query SQL con los periodos del rango
+        """
+        return f"""
+        SELECT
+            pe.id AS "periodo_id",
+            pe."year"
+        FROM core.periodo AS pe
+        WHERE pe."year" BETWEEN {year_start} AND {year_end}
+        ORDER BY pe."year" ASC, pe.id ASC
+        """
+
     @staticmethod
     def get_todos_los_datos(year_start: int, year_end: int) -> str:
         """
@@ -233,7 +402,9 @@ class QueryBuilder:
         Obtiene una query según el tipo solicitado
 
         Args:
-            query_type: Tipo de query ('periodo_programa', 'resumen', 'nuevo_ingreso', 'reinscritos', 'todos')
+            query_type: Tipo de query ('periodo_programa', 'resumen', 'nuevo_ingreso',
+                'reinscritos', 'estatus', 'periodos', 'todos', 'hechos_inscripcion',
+                'hechos_asistencia', 'dim_estudiantes', 'dim_programas')
             grado: Grado académico (LL, EL, ML) - requerido para algunas queries
 
         Returns:
@@ -262,8 +433,30 @@ class QueryBuilder:
                 raise ValueError("Se requiere especificar el grado para query tipo 'reinscritos'")
             return queries.get_estudiantes_reinscritos(self.year_start, self.year_end, grado)
 
+        elif query_type == 'estatus':
+            if not grado:
+                raise ValueError("Se requiere especificar el grado para query tipo 'estatus'")
+            return queries.get_estatus_estudiantes(self.year_start, self.year_end, grado)
+
+        elif query_type == 'periodos':
+            return queries.get_periodos(self.year_start, self.year_end)
+
         elif query_type == 'todos':
             return queries.get_todos_los_datos(self.year_start, self.year_end)
 
+        elif query_type == 'hechos_inscripcion':
+            if not grado:
+                raise ValueError("Se requiere especificar el grado para query tipo 'hechos_inscripcion'")
+            return queries.get_hechos_inscripcion(self.year_start, self.year_end, grado)
+
+        elif query_type == 'hechos_asistencia':
+            return queries.get_hechos_asistencia(self.year_start, self.year_end)
+
+        elif query_type == 'dim_estudiantes':
+            return queries.get_dim_estudiantes(self.year_start, self.year_end)
+
+        elif query_type == 'dim_programas':
+            return queries.get_dim_programas()
+
         else:
             raise ValueError(f"Tipo de query no válido: {query_type}")
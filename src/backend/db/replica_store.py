@@ -0,0 +1,418 @@
+"""
+Módulo de réplica local (DuckDB) de las tablas del esquema core usadas por los reportes
+"""
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Generator, List, Optional, Tuple
+
+import pandas as pd
+
+from src.backend.db.cancel import QueryCancelledError, QueryTimeoutError, current_token, current_timeout_ms
+from src.backend.db.slots import ConnectionSlots
+from src.utils.config import config
+from src.utils.logger import get_logger
+
+
+logger = get_logger(__name__, config.paths.logs_dir)
+
+
+@dataclass
+class ReplicaTable:
+    """Tabla replicada y su estrategia de sincronización"""
+    name: str
+    mode: str  # 'full': se copia completa; 'periodo': incremental desde el año de la marca
+    key: Optional[str] = None  # Columna para reemplazar filas en modo incremental
+
+    def source_query(self, schema: str, watermark: Optional[int]) -> str:
+        """Query de origen en PostgreSQL (completa o desde el año de la marca)"""
+        if self.mode == 'full' or watermark is None:
+            return f"SELECT * FROM {schema}.{self.name}"
+
+        asistencia = f"""
+            FROM {schema}.lista_asistencia AS la
+            JOIN {schema}.periodo AS pe ON la.periodo_id = pe.id
+            WHERE pe."year" >= {watermark}
+        """
+        if self.name == 'lista_asistencia':
+            return f"SELECT la.* {asistencia}"
+        return f"SELECT t.* FROM {schema}.{self.name} AS t WHERE t.{self.key} IN (SELECT la.estudiante_id {asistencia})"
+
+
+# Tablas que leen las queries de TrayectoriaQueries, en orden de sincronización
+# (periodo primero: define la marca de agua de las tablas incrementales)
+REPLICA_TABLES = [
+    ReplicaTable('periodo', 'full'),
+    ReplicaTable('programa', 'full'),
+    ReplicaTable('programas_titulados', 'full'),
+    ReplicaTable('cat_grado_academico', 'full'),
+    ReplicaTable('estudiante_programa', 'full'),
+    ReplicaTable('titulado', 'full'),
+    ReplicaTable('lista_asistencia', 'periodo'),
+    ReplicaTable('estudiante', 'periodo', key='id')
+]
+
+# Tipos de PostgreSQL (information_schema.columns.data_type) a tipos de DuckDB
+_PG_TYPES = {
+    'smallint': 'SMALLINT',
+    'integer': 'INTEGER',
+    'bigint': 'BIGINT',
+    'numeric': 'DOUBLE',
+    'real': 'DOUBLE',
+    'double precision': 'DOUBLE',
+    'boolean': 'BOOLEAN',
+    'date': 'DATE',
+    'timestamp without time zone': 'TIMESTAMP',
+    'timestamp with time zone': 'TIMESTAMPTZ'
+}
+
+
+class ReplicaStore:
+    """
+    Réplica analítica local en DuckDB con el mismo esquema que PostgreSQL
+
+    Las queries de TrayectoriaQueries se ejecutan sin cambios sobre la réplica
+    (mismos nombres de esquema y tabla), de modo que DataExtractor puede leer
+    de PostgreSQL o de la réplica con solo cambiar de backend.
+
+    La sincronización copia completas las tablas pequeñas y mutables y de forma
+    incremental lista_asistencia y estudiante: se vuelven a copiar las filas de
+    los periodos cuyo año es mayor o igual a la marca de agua (último año
+    sincronizado, que puede seguir abierto); los años cerrados no se releen.
+    """
+
+    META_TABLE = 'replica_meta'
+
+    def __init__(self, path: Optional[Path] = None):
+        """
+        Inicializa la réplica (la conexión se abre al primer uso)
+
+        Args:
+            path: Archivo DuckDB (por defecto data/<replica.path>)
+        """
+        self.path = Path(path or config.paths.data_dir / config.replica.path)
+        self.schema = config.database.schema
+        self._conn = None
+        self._lock = threading.Lock()
+        # Mismo límite de queries simultáneas que el pool de PostgreSQL (la réplica sirve de sustituto local)
+        self.slots = ConnectionSlots(config.database.pool_size, config.database.pool_timeout_seconds)
+
+    @property
+    def exists(self) -> bool:
+        """Si la réplica ya fue sincronizada al menos una vez"""
+        return self.path.exists()
+
+    def _connect(self, read_only: bool):
+        import duckdb
+
+        return duckdb.connect(str(self.path), read_only=read_only)
+
+    @contextmanager
+    def _reader(self) -> Generator:
+        """Cursor de lectura sobre una conexión de solo lectura compartida (uno por llamada, con turno)"""
+        if not self.exists:
+            raise FileNotFoundError(
+                f"La réplica {self.path} no existe; ejecuta 'python main.py --sync-replica'"
+            )
+        with self.slots.acquire():
+            with self._lock:
+                if self._conn is None:
+                    self._conn = self._connect(read_only=True)
+                    logger.info(f"Réplica local abierta: {self.path}")
+                cursor = self._conn.cursor()
+            try:
+                yield cursor
+            finally:
+                cursor.close()
+
+    def close(self):
+        """Cierra la conexión de lectura"""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    @contextmanager
+    def _interruptible(self, cursor) -> Generator:
+        """
+        Aplica el límite de tiempo y la cancelación del ámbito actual (cancel.cancellable)
+
+        DuckDB no tiene statement_timeout: al vencer el límite un temporizador
+        interrumpe la query con cursor.interrupt(), igual que la cancelación.
+
+        Raises:
+            QueryCancelledError: Si la solicitud fue reemplazada
+            QueryTimeoutError: Si la query excedió el límite
+        """
+        token = current_token()
+        timeout_ms = current_timeout_ms()
+        if token is None and not timeout_ms:
+            yield
+            return
+
+        import duckdb
+
+        if token is not None:
+            token.check()
+        timer = threading.Timer(timeout_ms / 1000, cursor.interrupt) if timeout_ms else None
+
+        try:
+            if timer is not None:
+                timer.start()
+            if token is not None:
+                with token.register(cursor.interrupt):
+                    yield
+            else:
+                yield
+        except duckdb.InterruptException as e:
+            if token is not None and token.cancelled:
+                logger.info("Query de la réplica cancelada: la solicitud fue reemplazada")
+                raise QueryCancelledError("Solicitud reemplazada por una más reciente") from e
+            logger.warning(f"Query de la réplica cancelada por límite de tiempo ({timeout_ms} ms)")
+            raise QueryTimeoutError(f"La query excedió el límite de {timeout_ms} ms") from e
+        finally:
+            if timer is not None:
+                timer.cancel()
+
+    # ------------------------------------------------------------------
+    # Lectura (misma interfaz que DatabaseConnection)
+    # ------------------------------------------------------------------
+
+    def query_dataframe(self, query: str, params: tuple = None) -> pd.DataFrame:
+        """
+        Ejecuta una query en la réplica y retorna un DataFrame (sin pasar por filas Python)
+
+        Args:
+            query: Query SQL (sintaxis de PostgreSQL compatible con DuckDB)
+            params: Parámetros con marcadores %s (opcional)
+
+        Returns:
+            DataFrame con los resultados
+        """
+        with self._reader() as cursor, self._interruptible(cursor):
+            return cursor.execute(query.replace('%s', '?'), params or []).fetchdf()
+
+    def execute_query(self, query: str, params: tuple = None, fetch: str = 'all'):
+        """
+        Ejecuta una query y retorna filas como diccionarios (compatible con DatabaseConnection)
+
+        Args:
+            query: Query SQL a ejecutar
+            params: Parámetros de la query (opcional)
+            fetch: Tipo de fetch ('all', 'one', 'many', None)
+
+        Returns:
+            Resultados de la query según el tipo de fetch
+        """
+        with self._reader() as cursor, self._interruptible(cursor):
+            cursor.execute(query.replace('%s', '?'), params or [])
+            if fetch is None:
+                return None
+            columns = [desc[0] for desc in cursor.description]
+            if fetch == 'one':
+                row = cursor.fetchone()
+                return dict(zip(columns, row)) if row else None
+            rows = cursor.fetchmany(1000) if fetch == 'many' else cursor.fetchall()
+            return [dict(zip(columns, row)) for row in rows]
+
+    def stream_query(
+        self,
+        query: str,
+        params: tuple = None,
+        batch_size: int = 5000
+    ) -> Generator[Tuple[List[str], List[tuple]], None, None]:
+        """
+        Ejecuta una query y entrega lotes de filas (compatible con DatabaseConnection.stream_query)
+
+        Yields:
+            Tupla (columnas, filas) por lote; el primer lote siempre se entrega
+        """
+        with self._reader() as cursor, self._interruptible(cursor):
+            cursor.execute(query.replace('%s', '?'), params or [])
+            columns = [desc[0] for desc in cursor.description]
+            rows = cursor.fetchmany(batch_size)
+            while True:
+                yield columns, rows
+                if len(rows) < batch_size:
+                    break
+                rows = cursor.fetchmany(batch_size)
+
+    def test_connection(self) -> bool:
+        """Verifica que la réplica exista y responda"""
+        try:
+            self.execute_query("SELECT 1 AS test", fetch='one')
+            return True
+        except Exception as e:
+            logger.error(f"Réplica no disponible: {e}")
+            return False
+
+    # ------------------------------------------------------------------
+    # Sincronización
+    # ------------------------------------------------------------------
+
+    def status(self) -> pd.DataFrame:
+        """
+        Estado de la última sincronización por tabla
+
+        Returns:
+            DataFrame con table_name, mode, watermark_year, rows, copied_rows y synced_at
+        """
+        if not self.exists:
+            return pd.DataFrame()
+        return self.query_dataframe(f"SELECT * FROM {self.schema}.{self.META_TABLE} ORDER BY table_name")
+
+    def sync(self, full: bool = False, source=None, batch_size: Optional[int] = None) -> Dict[str, int]:
+        """
+        Sincroniza la réplica desde PostgreSQL
+
+        Args:
+            full: Si True, vuelve a copiar todas las tablas completas
+            source: Conexión de origen (por defecto la instancia global db)
+            batch_size: Filas por lote del cursor de origen (por defecto config.replica.batch_size)
+
+        Returns:
+            Diccionario tabla -> filas copiadas
+        """
+        from src.backend.db.connection import db
+
+        source = source or db
+        batch_size = batch_size or config.replica.batch_size
+        self.close()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+        copied = {}
+        start_time = datetime.now()
+        conn = self._connect(read_only=False)
+        try:
+            conn.execute(f"CREATE SCHEMA IF NOT EXISTS {self.schema}")
+            conn.execute(f"""
+                CREATE TABLE IF NOT EXISTS {self.schema}.{self.META_TABLE} (
+                    table_name VARCHAR PRIMARY KEY,
+                    mode VARCHAR,
+                    watermark_year INTEGER,
+                    rows BIGINT,
+                    copied_rows BIGINT,
+                    synced_at TIMESTAMP
+                )
+            """)
+
+            for table in REPLICA_TABLES:
+                watermark = None if full else self._watermark(conn, table)
+                copied[table.name] = self._sync_table(conn, source, table, watermark, batch_size)
+
+        finally:
+            conn.close()
+
+        elapsed = (datetime.now() - start_time).total_seconds()
+        logger.info(f"Réplica sincronizada en {elapsed:.2f}s: {sum(copied.values())} filas copiadas")
+        return copied
+
+    def _watermark(self, conn, table: ReplicaTable) -> Optional[int]:
+        """Año desde el que se vuelve a copiar una tabla incremental (None = copia completa)"""
+        if table.mode != 'periodo':
+            return None
+        row = conn.execute(
+            f"SELECT watermark_year FROM {self.schema}.{self.META_TABLE} WHERE table_name = ?",
+            [table.name]
+        ).fetchone()
+        return row[0] if row else None
+
+    def _column_types(self, source, table: ReplicaTable) -> List[Tuple[str, str]]:
+        """Columnas de la tabla en PostgreSQL con su tipo equivalente en DuckDB"""
+        rows = source.execute_query(
+            """
+            SELECT column_name, data_type FROM information_schema.columns
+            WHERE table_schema = %s AND table_name = %s
+            ORDER BY ordinal_position
+            """,
+            (self.schema, table.name)
+        )
+        return [(row['column_name'], _PG_TYPES.get(row['data_type'], 'VARCHAR')) for row in rows or []]
+
+    def _sync_table(self, conn, source, table: ReplicaTable, watermark: Optional[int], batch_size: int) -> int:
+        """Copia una tabla (completa o desde la marca) dentro de una transacción"""
+        target = f"{self.schema}.{table.name}"
+        columns = self._column_types(source, table)
+        if not columns:
+            raise ValueError(f"Tabla no encontrada en el origen: {self.schema}.{table.name}")
+
+        column_ddl = ', '.join(f'"{name}" {dtype}' for name, dtype in columns)
+        query = table.source_query(self.schema, watermark)
+        logger.info(
+            f"Sincronizando {target} "
+            f"({'completa' if watermark is None else f'desde el año {watermark}'})"
+        )
+
+        conn.execute("BEGIN TRANSACTION")
+        try:
+            if watermark is None:
+                conn.execute(f"CREATE OR REPLACE TABLE {target} ({column_ddl})")
+            else:
+                conn.execute(f"CREATE TABLE IF NOT EXISTS {target} ({column_ddl})")
+
+            if watermark is not None:
+                self._delete_from_watermark(conn, table, watermark)
+
+            total = 0
+            for names, rows in source.stream_query(query, batch_size=batch_size):
+                if not rows:
+                    continue
+                batch = pd.DataFrame.from_records(rows, columns=names)
+                conn.register('_replica_batch', batch)
+                if watermark is not None and table.key:
+                    conn.execute(
+                        f'DELETE FROM {target} WHERE "{table.key}" IN (SELECT "{table.key}" FROM _replica_batch)'
+                    )
+                conn.execute(f"INSERT INTO {target} BY NAME SELECT * FROM _replica_batch")
+                conn.unregister('_replica_batch')
+                total += len(rows)
+
+            new_watermark = self._max_year(conn, table)
+            rows_total = conn.execute(f"SELECT count(*) FROM {target}").fetchone()[0]
+            conn.execute(
+                f"""
+                INSERT OR REPLACE INTO {self.schema}.{self.META_TABLE}
+                (table_name, mode, watermark_year, rows, copied_rows, synced_at)
+                VALUES (?, ?, ?, ?, ?, ?)
+                """,
+                [table.name, table.mode, new_watermark, rows_total, total, datetime.now()]
+            )
+            conn.execute("COMMIT")
+
+        except Exception:
+            conn.execute("ROLLBACK")
+            logger.error(f"Error sincronizando {target}; se conserva la versión anterior")
+            raise
+
+        logger.info(f"  {target}: {total} filas copiadas, {rows_total} en la réplica")
+        return total
+
+    def _delete_from_watermark(self, conn, table: ReplicaTable, watermark: int):
+        """Elimina de lista_asistencia las filas de los periodos que se vuelven a copiar"""
+        if table.name != 'lista_asistencia':
+            return
+        conn.execute(
+            f"""
+            DELETE FROM {self.schema}.lista_asistencia
+            WHERE periodo_id IN (SELECT id FROM {self.schema}.periodo WHERE "year" >= ?)
+            """,
+            [watermark]
+        )
+
+    def _max_year(self, conn, table: ReplicaTable) -> Optional[int]:
+        """Último año con asistencia en la réplica: marca de agua de las tablas incrementales"""
+        if table.mode != 'periodo':
+            return None
+        row = conn.execute(
+            f"""
+            SELECT max(pe."year") FROM {self.schema}.lista_asistencia AS la
+            JOIN {self.schema}.periodo AS pe ON la.periodo_id = pe.id
+            """
+        ).fetchone()
+        return int(row[0]) if row and row[0] is not None else None
+
+
+# Instancia global de la réplica (no abre el archivo hasta el primer uso)
+replica = ReplicaStore()
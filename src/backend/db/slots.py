@@ -0,0 +1,72 @@
+"""
+Módulo de turnos de conexión: limita las queries simultáneas al tamaño del pool
+"""
+import threading
+from contextlib import contextmanager
+from typing import Generator
+
+from src.backend.monitoring.metrics import track_stage
+
+
+# Etapa (monitoring.metrics) con el tiempo de espera de una conexión libre
+POOL_WAIT_STAGE = 'pool_wait'
+
+
+class PoolTimeoutError(Exception):
+    """No se liberó ninguna conexión del pool dentro del tiempo de espera"""
+
+
+class ConnectionSlots:
+    """
+    Turnos de conexión compartidos por los hilos de un proceso
+
+    Con todas las conexiones ocupadas, una solicitud espera su turno (hasta
+    timeout segundos) en lugar de fallar con el pool agotado. La espera se
+    registra como la etapa 'pool_wait' de la ejecución activa. Cada conexión
+    física ocupa su propio turno, también las de un hilo que ya tiene otra
+    (p. ej. una query dentro de un streaming): el pool nunca entrega más de
+    size conexiones.
+    """
+
+    def __init__(self, size: int, timeout: float):
+        """
+        Inicializa los turnos
+
+        Args:
+            size: Conexiones simultáneas (config.database.pool_size)
+            timeout: Segundos máximos de espera de un turno
+        """
+        self.size = size
+        self.timeout = timeout
+        self._semaphore = threading.BoundedSemaphore(size)
+        self._lock = threading.Lock()
+        self._in_use = 0
+
+    @property
+    def in_use(self) -> int:
+        """Turnos ocupados en este momento"""
+        return self._in_use
+
+    @contextmanager
+    def acquire(self) -> Generator:
+        """
+        Ocupa un turno mientras dura el bloque
+
+        Raises:
+            PoolTimeoutError: Si no se liberó un turno dentro de timeout
+        """
+        with track_stage(POOL_WAIT_STAGE):
+            acquired = self._semaphore.acquire(timeout=self.timeout)
+        if not acquired:
+            raise PoolTimeoutError(
+                f"Sin conexiones libres tras {self.timeout:.0f}s ({self.size} en uso)"
+            )
+
+        with self._lock:
+            self._in_use += 1
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._in_use -= 1
+            self._semaphore.release()
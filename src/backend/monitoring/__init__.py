@@ -0,0 +1,12 @@
+"""
+Módulo de monitoreo de ejecuciones
+"""
+from .metrics import (
+    MetricsStore, RunMetrics, MemorySampler, track_run, track_stage, record_metric, record_plan, current_rss_mb
+)
+from .plans import summarize_plan, diff_plans
+
+__all__ = [
+    'MetricsStore', 'RunMetrics', 'MemorySampler', 'track_run', 'track_stage', 'record_metric', 'record_plan',
+    'current_rss_mb', 'summarize_plan', 'diff_plans'
+]
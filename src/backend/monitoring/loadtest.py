@@ -0,0 +1,278 @@
+"""
+Módulo de prueba de carga del servicio de datos del dashboard
+"""
+import random
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from src.backend.db.cancel import cancellable
+from src.backend.db.slots import POOL_WAIT_STAGE
+from src.backend.monitoring.metrics import STAGE_SECONDS, MemorySampler, collect_metrics, current_rss_mb
+from src.backend.processors.data_service import load_fact_store, load_student_listing, load_trayectoria_data
+from src.backend.processors.listing import SORT_COLUMNS
+from src.backend.processors.transformer import TrayectoriaTransformer
+from src.utils.config import config
+from src.utils.logger import get_logger
+
+
+logger = get_logger(__name__, config.paths.logs_dir)
+
+
+# Interacción de la página de trayectoria -> peso en la mezcla de solicitudes
+SCENARIO_WEIGHTS = {
+    'trayectoria': 0.2,  # Botón "Cargar Datos"
+    'detalle': 0.4,      # Filtros del detalle por programa/campus
+    'listado': 0.4       # Página del listado de estudiantes
+}
+
+PERCENTILES = (50, 95, 99)
+
+
+@dataclass
+class LoadTestResult:
+    """Resultado de una prueba de carga: una fila por solicitud más la memoria del proceso"""
+    users: int
+    duration_seconds: float
+    samples: pd.DataFrame
+    memory_mb: Dict[str, Optional[float]] = field(default_factory=dict)
+
+    @staticmethod
+    def _percentiles(values: pd.Series, prefix: str) -> Dict[str, float]:
+        if values.empty:
+            return {}
+        ms = values.to_numpy() * 1000
+        stats = {f"{prefix}_p{p}_ms": float(np.percentile(ms, p)) for p in PERCENTILES}
+        stats[f"{prefix}_max_ms"] = float(ms.max())
+        return stats
+
+    def summary(self) -> Dict[str, Any]:
+        """Solicitudes, throughput, percentiles de latencia y de espera del pool, y memoria"""
+        ok = self.samples[self.samples['error'].isna()] if not self.samples.empty else self.samples
+        errors = self.samples['error'].dropna().value_counts().to_dict() if not self.samples.empty else {}
+        return {
+            'users': self.users,
+            'duration_seconds': round(self.duration_seconds, 2),
+            'requests': len(self.samples),
+            'errors': errors,
+            'throughput_rps': round(len(ok) / self.duration_seconds, 2) if self.duration_seconds else 0.0,
+            **self._percentiles(ok['latency'] if not ok.empty else pd.Series(dtype=float), 'latency'),
+            **self._percentiles(self.samples['pool_wait'] if not self.samples.empty else pd.Series(dtype=float),
+                                'pool_wait'),
+            **{f"memory_{name}_mb": value for name, value in self.memory_mb.items()}
+        }
+
+    def by_scenario(self) -> pd.DataFrame:
+        """Solicitudes, errores y percentiles de latencia (ms) por interacción"""
+        if self.samples.empty:
+            return pd.DataFrame()
+        rows = []
+        for scenario, group in self.samples.groupby('scenario'):
+            ok = group[group['error'].isna()]
+            rows.append({
+                'scenario': scenario,
+                'requests': len(group),
+                'errors': int(group['error'].notna().sum()),
+                **self._percentiles(ok['latency'], 'latency'),
+                'pool_wait_p95_ms': float(np.percentile(group['pool_wait'] * 1000, 95))
+            })
+        return pd.DataFrame(rows)
+
+
+class LoadTest:
+    """
+    Simula usuarios concurrentes del dashboard sobre el servicio de datos
+
+    Cada usuario es un hilo del mismo proceso (como las sesiones de un
+    Streamlit de un solo proceso) que repite las interacciones de la página
+    de trayectoria con una mezcla de grados, rangos de años y filtros, con
+    una pausa aleatoria entre solicitudes. Las queries pasan por los mismos
+    turnos de conexión que el pool, por lo que la espera de una conexión
+    libre se mide igual que en producción.
+    """
+
+    def __init__(
+        self,
+        users: int = 10,
+        duration_seconds: float = 60.0,
+        think_time_seconds: float = 1.0,
+        grados: Optional[List[str]] = None,
+        year_start: Optional[int] = None,
+        year_end: Optional[int] = None,
+        adhoc_ratio: float = 0.1,
+        seed: int = 0
+    ):
+        """
+        Inicializa la prueba
+
+        Args:
+            users: Usuarios simultáneos
+            duration_seconds: Duración de la prueba
+            think_time_seconds: Pausa media entre solicitudes de un usuario (exponencial; 0 = sin pausa)
+            grados: Grados a consultar (por defecto config.reports.grados)
+            year_start: Año inicial del rango por defecto (por defecto desde config)
+            year_end: Año final del rango por defecto (por defecto desde config)
+            adhoc_ratio: Fracción de solicitudes con un sub-rango de años arbitrario (no pre-calentado)
+            seed: Semilla de la mezcla de solicitudes
+        """
+        self.users = users
+        self.duration_seconds = duration_seconds
+        self.think_time_seconds = think_time_seconds
+        self.grados = grados or config.reports.grados
+        self.year_start = year_start or config.reports.year_start
+        self.year_end = year_end or config.reports.year_end
+        self.adhoc_ratio = adhoc_ratio
+        self.seed = seed
+
+        self.ranges = [(self.year_start, self.year_end)] + [
+            (int(start), int(end)) for start, end in config.cache.warmup_ranges
+            if (int(start), int(end)) != (self.year_start, self.year_end)
+        ]
+        self.scenarios: Dict[str, Callable[[random.Random, str, int, int], None]] = {
+            'trayectoria': self._trayectoria,
+            'detalle': self._detalle,
+            'listado': self._listado
+        }
+
+    # ------------------------------------------------------------------
+    # Interacciones de la página de trayectoria
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _filters(
+        rng: random.Random,
+        options: Callable[[str], List],
+        dimensions: Tuple[str, ...],
+        probability: float,
+        max_items: int = 3
+    ) -> Dict[str, List]:
+        """Filtros aleatorios: cada dimensión se filtra con la probabilidad dada por 1 a max_items valores"""
+        filters = {}
+        for dimension in dimensions:
+            values = list(options(dimension))
+            if values and rng.random() < probability:
+                filters[dimension] = rng.sample(values, rng.randint(1, min(max_items, len(values))))
+        return filters
+
+    def _trayectoria(self, rng: random.Random, grado: str, year_start: int, year_end: int):
+        load_trayectoria_data(grado, year_start, year_end)
+
+    def _detalle(self, rng: random.Random, grado: str, year_start: int, year_end: int):
+        cube = load_trayectoria_data(grado, year_start, year_end)['cube']
+        filters = self._filters(rng, cube.members, ('campus', 'escuela', 'programa'), 0.5)
+        dims = rng.sample(['programa', 'campus', 'escuela', 'periodo', 'tipo'], rng.randint(1, 2))
+        cube.dice(filters).rollup(dims)
+
+        store = load_fact_store(grado, year_start, year_end)
+        TrayectoriaTransformer().create_trayectoria_from_facts(store, store.mask(filters) if filters else None)
+
+    def _listado(self, rng: random.Random, grado: str, year_start: int, year_end: int):
+        listing = load_student_listing(grado, year_start, year_end, rng.choice(['nuevo_ingreso', 'reinscritos']))
+        filters = self._filters(rng, listing.options, ('programa', 'campus', 'periodo'), 0.4)
+        listing.page(
+            filters,
+            rng.choice(SORT_COLUMNS),
+            rng.random() < 0.3,
+            rng.randint(1, 5),
+            rng.choice([25, 50, 100])
+        )
+
+    # ------------------------------------------------------------------
+    # Ejecución
+    # ------------------------------------------------------------------
+
+    def _years(self, rng: random.Random) -> Tuple[int, int]:
+        """Rango por defecto o pre-calentado; a veces un sub-rango arbitrario"""
+        if rng.random() < self.adhoc_ratio and self.year_end > self.year_start:
+            start = rng.randint(self.year_start, self.year_end - 1)
+            return start, rng.randint(start + 1, self.year_end)
+        return rng.choice(self.ranges)
+
+    def _user(self, user_id: int, deadline: float, samples: List[Dict[str, Any]], lock: threading.Lock):
+        """Hilo de un usuario simulado"""
+        rng = random.Random(self.seed * 1000 + user_id)
+        names = list(SCENARIO_WEIGHTS)
+        weights = list(SCENARIO_WEIGHTS.values())
+
+        # Pausa inicial: los usuarios no llegan todos en el mismo instante
+        if self.think_time_seconds:
+            time.sleep(min(rng.uniform(0, self.think_time_seconds), max(0.0, deadline - time.monotonic())))
+
+        with collect_metrics() as run:
+            while time.monotonic() < deadline:
+                scenario = rng.choices(names, weights)[0]
+                grado = rng.choice(self.grados)
+                year_start, year_end = self._years(rng)
+                waited = run.values[STAGE_SECONDS].get(POOL_WAIT_STAGE, 0.0)
+
+                error = None
+                start = time.perf_counter()
+                try:
+                    with cancellable(timeout_ms=config.database.interactive_timeout_ms):
+                        self.scenarios[scenario](rng, grado, year_start, year_end)
+                except Exception as e:
+                    error = type(e).__name__
+                    logger.warning(f"Usuario {user_id}: {scenario} {grado} {year_start}-{year_end} falló: {e}")
+                latency = time.perf_counter() - start
+
+                with lock:
+                    samples.append({
+                        'user': user_id,
+                        'scenario': scenario,
+                        'grado': grado,
+                        'year_start': year_start,
+                        'year_end': year_end,
+                        'latency': latency,
+                        'pool_wait': run.values[STAGE_SECONDS].get(POOL_WAIT_STAGE, 0.0) - waited,
+                        'error': error
+                    })
+
+                if self.think_time_seconds:
+                    pause = rng.expovariate(1 / self.think_time_seconds)
+                    time.sleep(min(pause, max(0.0, deadline - time.monotonic())))
+
+    def run(self) -> LoadTestResult:
+        """
+        Ejecuta la prueba
+
+        Returns:
+            LoadTestResult con una fila por solicitud
+        """
+        logger.info(
+            f"Prueba de carga: {self.users} usuarios, {self.duration_seconds:.0f}s, "
+            f"pausa media {self.think_time_seconds}s, backend {config.replica.backend}"
+        )
+        samples: List[Dict[str, Any]] = []
+        lock = threading.Lock()
+        memory_start = current_rss_mb()
+        sampler = MemorySampler()
+        sampler.start()
+
+        start = time.perf_counter()
+        deadline = time.monotonic() + self.duration_seconds
+        threads = [
+            threading.Thread(
+                target=self._user, args=(i, deadline, samples, lock), name=f"loadtest-user-{i}", daemon=True
+            )
+            for i in range(self.users)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - start
+
+        result = LoadTestResult(
+            users=self.users,
+            duration_seconds=elapsed,
+            samples=pd.DataFrame(samples, columns=[
+                'user', 'scenario', 'grado', 'year_start', 'year_end', 'latency', 'pool_wait', 'error'
+            ]),
+            memory_mb={'start': memory_start, 'peak': sampler.stop(), 'end': current_rss_mb()}
+        )
+        logger.info(f"Prueba de carga terminada: {len(samples)} solicitudes en {elapsed:.1f}s")
+        return result
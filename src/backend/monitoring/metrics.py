@@ -0,0 +1,530 @@
+"""
+Módulo de métricas por ejecución con historial en SQLite y detección de regresiones
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Generator, List, Optional, Tuple
+
+import pandas as pd
+
+from src.backend.monitoring.plans import diff_plans, plan_signature, plan_totals
+from src.utils.config import config
+from src.utils.logger import get_logger
+
+
+logger = get_logger(__name__, config.paths.logs_dir)
+
+
+# Tipos de métrica almacenados en run_metrics.kind
+STAGE_SECONDS = 'stage_seconds'
+QUERY_ROWS = 'query_rows'
+SHEET_ROWS = 'sheet_rows'
+FILE_BYTES = 'file_bytes'
+
+
+def current_rss_mb() -> Optional[float]:
+    """Retorna la memoria residente actual del proceso en MB (None si no se puede medir)"""
+    try:
+        with open('/proc/self/statm', 'r') as f:
+            resident_pages = int(f.read().split()[1])
+        return resident_pages * os.sysconf('SC_PAGE_SIZE') / 1024 / 1024
+    except (OSError, ValueError, IndexError):
+        pass
+
+    try:
+        import resource
+        # ru_maxrss está en KB en Linux; es el pico del proceso, no el actual
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    except ImportError:
+        return None
+
+
+class MemorySampler(threading.Thread):
+    """Hilo que muestrea la memoria residente para obtener el pico de una ejecución"""
+
+    def __init__(self, interval: float = 0.25):
+        super().__init__(daemon=True, name='metrics-memory-sampler')
+        self.interval = interval
+        self.peak_mb: Optional[float] = current_rss_mb()
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.wait(self.interval):
+            self._sample()
+
+    def _sample(self):
+        rss = current_rss_mb()
+        if rss is not None and (self.peak_mb is None or rss > self.peak_mb):
+            self.peak_mb = rss
+
+    def stop(self) -> Optional[float]:
+        self._stop_event.set()
+        self._sample()
+        return self.peak_mb
+
+
+class RunMetrics:
+    """Colector de métricas de una ejecución (tiempos por etapa, filas, archivos, memoria)"""
+
+    def __init__(self, job_name: str):
+        """
+        Inicializa el colector
+
+        Args:
+            job_name: Nombre de la tarea (ej. 'daily_report_generation')
+        """
+        self.job_name = job_name
+        self.run_id: Optional[int] = None
+        self.started_at = datetime.now()
+        self.finished_at: Optional[datetime] = None
+        self.status = 'running'
+        self.elapsed_seconds: Optional[float] = None
+        self.peak_memory_mb: Optional[float] = None
+        self.values: Dict[str, Dict[str, float]] = {
+            STAGE_SECONDS: {},
+            QUERY_ROWS: {},
+            SHEET_ROWS: {},
+            FILE_BYTES: {}
+        }
+        self.plans: Dict[str, object] = {}
+        self._lock = threading.Lock()
+        self._start = time.perf_counter()
+        self._sampler = MemorySampler()
+        self._sampler.start()
+
+    def record(self, kind: str, name: str, value: float, accumulate: bool = False):
+        """
+        Registra un valor de métrica
+
+        Args:
+            kind: Tipo de métrica (STAGE_SECONDS, QUERY_ROWS, SHEET_ROWS, FILE_BYTES)
+            name: Nombre de la etapa, query, hoja o archivo
+            value: Valor a registrar
+            accumulate: Si True, suma al valor existente en lugar de reemplazarlo
+        """
+        with self._lock:
+            bucket = self.values.setdefault(kind, {})
+            if accumulate:
+                bucket[name] = bucket.get(name, 0) + value
+            else:
+                bucket[name] = value
+
+    def record_plan(self, name: str, plan: object):
+        """
+        Registra el plan de ejecución de una query (EXPLAIN FORMAT JSON)
+
+        Args:
+            name: Nombre de la query
+            plan: Plan devuelto por DatabaseConnection.explain_query
+        """
+        with self._lock:
+            self.plans[name] = plan
+
+    @contextmanager
+    def stage(self, name: str) -> Generator:
+        """Mide la duración de una etapa (acumulativa si se repite)"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(STAGE_SECONDS, name, time.perf_counter() - start, accumulate=True)
+
+    def finish(self, status: str = 'success'):
+        """Cierra la ejecución calculando duración total y pico de memoria"""
+        self.status = status
+        self.finished_at = datetime.now()
+        self.elapsed_seconds = time.perf_counter() - self._start
+        self.peak_memory_mb = self._sampler.stop()
+
+
+_active_run: ContextVar[Optional[RunMetrics]] = ContextVar('active_run', default=None)
+
+
+def get_active_run() -> Optional[RunMetrics]:
+    """Retorna el colector de la ejecución activa en el contexto actual (o None)"""
+    return _active_run.get()
+
+
+@contextmanager
+def track_stage(name: str) -> Generator:
+    """
+    Mide una etapa dentro de la ejecución activa (no hace nada si no hay ejecución)
+
+    Example:
+        with track_stage('LL:extraccion'):
+            data = extractor.extract_all_for_grado('LL')
+    """
+    run = _active_run.get()
+    if run is None:
+        yield
+        return
+
+    with run.stage(name):
+        yield
+
+
+def record_metric(kind: str, name: str, value: float):
+    """Registra una métrica en la ejecución activa (no hace nada si no hay ejecución)"""
+    run = _active_run.get()
+    if run is not None:
+        run.record(kind, name, value)
+
+
+def record_plan(name: str, plan: object):
+    """Registra un plan de ejecución en la ejecución activa (no hace nada si no hay ejecución)"""
+    run = _active_run.get()
+    if run is not None:
+        run.record_plan(name, plan)
+
+
+@contextmanager
+def collect_metrics() -> Generator[RunMetrics, None, None]:
+    """
+    Activa un colector que no se guarda en el historial (ej. en un proceso trabajador)
+
+    Sus valores se incorporan a la ejecución del proceso principal con merge_metrics.
+    """
+    run = RunMetrics('worker')
+    token = _active_run.set(run)
+    try:
+        yield run
+    finally:
+        _active_run.reset(token)
+        run.finish()
+
+
+def merge_metrics(values: Dict[str, Dict[str, float]]):
+    """Incorpora a la ejecución activa los valores de un colector de collect_metrics"""
+    run = _active_run.get()
+    if run is None:
+        return
+    for kind, bucket in values.items():
+        for name, value in bucket.items():
+            run.record(kind, name, value, accumulate=(kind == STAGE_SECONDS))
+
+
+class MetricsStore:
+    """Historial de métricas de ejecución en SQLite"""
+
+    def __init__(self, db_path: Optional[Path] = None):
+        """
+        Inicializa el almacén
+
+        Args:
+            db_path: Ruta del archivo SQLite (por defecto data/<monitoring.metrics_db>)
+        """
+        self.db_path = Path(db_path or config.paths.data_dir / config.monitoring.metrics_db)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._ensure_schema()
+
+    @contextmanager
+    def _connect(self) -> Generator[sqlite3.Connection, None, None]:
+        """Conexión SQLite con commit automático y cierre al finalizar"""
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def _ensure_schema(self):
+        with self._connect() as conn:
+            conn.executescript("""
+            CREATE TABLE IF NOT EXISTS runs (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                job_name TEXT NOT NULL,
+                started_at TEXT NOT NULL,
+                finished_at TEXT,
+                status TEXT NOT NULL,
+                elapsed_seconds REAL,
+                peak_memory_mb REAL
+            );
+            CREATE TABLE IF NOT EXISTS run_metrics (
+                run_id INTEGER NOT NULL REFERENCES runs(id),
+                kind TEXT NOT NULL,
+                name TEXT NOT NULL,
+                value REAL NOT NULL,
+                PRIMARY KEY (run_id, kind, name)
+            );
+            CREATE TABLE IF NOT EXISTS query_plans (
+                run_id INTEGER NOT NULL REFERENCES runs(id),
+                query_name TEXT NOT NULL,
+                total_cost REAL,
+                execution_ms REAL,
+                signature TEXT NOT NULL,
+                plan_json TEXT NOT NULL,
+                PRIMARY KEY (run_id, query_name)
+            );
+            CREATE INDEX IF NOT EXISTS idx_runs_job ON runs(job_name, started_at);
+            CREATE INDEX IF NOT EXISTS idx_plans_query ON query_plans(query_name, run_id);
+            """)
+
+    def save_run(self, run: RunMetrics) -> int:
+        """
+        Guarda una ejecución y sus métricas
+
+        Args:
+            run: Colector finalizado
+
+        Returns:
+            ID de la ejecución almacenada
+        """
+        with self._connect() as conn:
+            cur = conn.execute(
+                """
+                INSERT INTO runs (job_name, started_at, finished_at, status, elapsed_seconds, peak_memory_mb)
+                VALUES (?, ?, ?, ?, ?, ?)
+                """,
+                (
+                    run.job_name,
+                    run.started_at.isoformat(timespec='seconds'),
+                    run.finished_at.isoformat(timespec='seconds') if run.finished_at else None,
+                    run.status,
+                    run.elapsed_seconds,
+                    run.peak_memory_mb
+                )
+            )
+            run_id = cur.lastrowid
+            conn.executemany(
+                "INSERT INTO run_metrics (run_id, kind, name, value) VALUES (?, ?, ?, ?)",
+                [
+                    (run_id, kind, name, float(value))
+                    for kind, bucket in run.values.items()
+                    for name, value in bucket.items()
+                ]
+            )
+            conn.executemany(
+                """
+                INSERT INTO query_plans (run_id, query_name, total_cost, execution_ms, signature, plan_json)
+                VALUES (?, ?, ?, ?, ?, ?)
+                """,
+                [
+                    (run_id, name, totals['total_cost'], totals['execution_ms'],
+                     '\n'.join(plan_signature(plan)), json.dumps(plan))
+                    for name, plan in run.plans.items()
+                    for totals in [plan_totals(plan)]
+                ]
+            )
+
+        logger.info(f"Métricas de ejecución #{run_id} guardadas en {self.db_path.name}")
+        return run_id
+
+    def get_runs(self, job_name: Optional[str] = None, limit: int = 20) -> pd.DataFrame:
+        """
+        Obtiene las últimas ejecuciones
+
+        Args:
+            job_name: Filtrar por nombre de tarea (opcional)
+            limit: Número máximo de ejecuciones
+
+        Returns:
+            DataFrame con una fila por ejecución (más reciente al final)
+        """
+        where = "WHERE job_name = ?" if job_name else ""
+        params = (job_name, limit) if job_name else (limit,)
+        with self._connect() as conn:
+            df = pd.read_sql_query(
+                f"SELECT * FROM runs {where} ORDER BY id DESC LIMIT ?",
+                conn,
+                params=params
+            )
+        return df.sort_values('id').reset_index(drop=True)
+
+    def get_metric_history(
+        self,
+        kind: str = STAGE_SECONDS,
+        job_name: Optional[str] = None,
+        limit: int = 20
+    ) -> pd.DataFrame:
+        """
+        Obtiene el historial de un tipo de métrica en formato ancho
+
+        Args:
+            kind: Tipo de métrica
+            job_name: Filtrar por nombre de tarea (opcional)
+            limit: Número máximo de ejecuciones
+
+        Returns:
+            DataFrame indexado por run_id con una columna por nombre de métrica
+        """
+        runs = self.get_runs(job_name, limit)
+        if runs.empty:
+            return pd.DataFrame()
+
+        placeholders = ','.join('?' for _ in runs['id'])
+        with self._connect() as conn:
+            df = pd.read_sql_query(
+                f"SELECT run_id, name, value FROM run_metrics WHERE kind = ? AND run_id IN ({placeholders})",
+                conn,
+                params=(kind, *runs['id'].tolist())
+            )
+
+        if df.empty:
+            return pd.DataFrame()
+
+        return df.pivot(index='run_id', columns='name', values='value').sort_index()
+
+    def get_plans(self, run_id: int) -> Dict[str, object]:
+        """
+        Obtiene los planes de ejecución almacenados para una ejecución
+
+        Args:
+            run_id: ID de la ejecución
+
+        Returns:
+            Diccionario nombre de query -> plan (EXPLAIN FORMAT JSON)
+        """
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT query_name, plan_json FROM query_plans WHERE run_id = ? ORDER BY query_name",
+                (run_id,)
+            ).fetchall()
+        return {name: json.loads(plan_json) for name, plan_json in rows}
+
+    def get_previous_plan(self, query_name: str, before_run_id: int) -> Optional[Tuple[int, object]]:
+        """
+        Obtiene el plan más reciente de una query anterior a una ejecución
+
+        Args:
+            query_name: Nombre de la query
+            before_run_id: Se buscan planes de ejecuciones anteriores a este ID
+
+        Returns:
+            Tupla (run_id, plan) o None si no hay plan previo
+        """
+        with self._connect() as conn:
+            row = conn.execute(
+                """
+                SELECT run_id, plan_json FROM query_plans
+                WHERE query_name = ? AND run_id < ?
+                ORDER BY run_id DESC LIMIT 1
+                """,
+                (query_name, before_run_id)
+            ).fetchone()
+        return (row[0], json.loads(row[1])) if row else None
+
+    def latest_plan_run(self, job_name: Optional[str] = None) -> Optional[int]:
+        """ID de la última ejecución con planes almacenados (opcionalmente de una tarea)"""
+        where = "WHERE r.job_name = ?" if job_name else ""
+        with self._connect() as conn:
+            row = conn.execute(
+                f"""
+                SELECT MAX(p.run_id) FROM query_plans p JOIN runs r ON r.id = p.run_id {where}
+                """,
+                (job_name,) if job_name else ()
+            ).fetchone()
+        return row[0] if row and row[0] is not None else None
+
+    def diff_plans(self, run_id: int) -> List[Dict]:
+        """
+        Compara los planes de una ejecución contra el plan anterior de cada query
+
+        Args:
+            run_id: ID de la ejecución
+
+        Returns:
+            Lista con query, run_id del plan anterior y el resultado de plans.diff_plans
+            (solo queries con plan anterior)
+        """
+        diffs = []
+        for name, plan in self.get_plans(run_id).items():
+            previous = self.get_previous_plan(name, run_id)
+            if previous is None:
+                continue
+            previous_run_id, previous_plan = previous
+            diffs.append({
+                'query': name,
+                'previous_run_id': previous_run_id,
+                **diff_plans(previous_plan, plan)
+            })
+        return diffs
+
+    def find_regressions(
+        self,
+        job_name: Optional[str] = None,
+        factor: Optional[float] = None,
+        window: Optional[int] = None,
+        limit: int = 50,
+        min_seconds: Optional[float] = None
+    ) -> List[Dict]:
+        """
+        Detecta etapas que superaron su línea base móvil
+
+        La línea base de cada etapa es la mediana de las `window` ejecuciones
+        anteriores; se marca regresión cuando el tiempo supera factor x línea base.
+
+        Args:
+            job_name: Filtrar por nombre de tarea (opcional)
+            factor: Factor de tolerancia (por defecto config.monitoring.regression_factor)
+            window: Ejecuciones para la línea base (por defecto config.monitoring.baseline_window)
+            limit: Número de ejecuciones a analizar
+            min_seconds: Duración mínima para considerar una etapa
+
+        Returns:
+            Lista de regresiones con run_id, etapa, segundos, línea base y razón
+        """
+        factor = factor or config.monitoring.regression_factor
+        window = window or config.monitoring.baseline_window
+        min_seconds = config.monitoring.min_stage_seconds if min_seconds is None else min_seconds
+
+        history = self.get_metric_history(STAGE_SECONDS, job_name, limit)
+        if history.empty:
+            return []
+
+        baseline = history.shift(1).rolling(window, min_periods=min(3, window)).median()
+        flags = (history > baseline * factor) & (history >= min_seconds)
+
+        regressions = []
+        stacked = flags.stack()
+        for run_id, stage in stacked[stacked].index:
+            seconds = history.at[run_id, stage]
+            base = baseline.at[run_id, stage]
+            regressions.append({
+                'run_id': int(run_id),
+                'stage': stage,
+                'seconds': round(float(seconds), 2),
+                'baseline_seconds': round(float(base), 2),
+                'ratio': round(float(seconds / base), 2) if base else None
+            })
+
+        return regressions
+
+
+@contextmanager
+def track_run(job_name: str, store: Optional[MetricsStore] = None) -> Generator[RunMetrics, None, None]:
+    """
+    Registra una ejecución completa y la guarda en el historial al terminar
+
+    Args:
+        job_name: Nombre de la tarea
+        store: Almacén de métricas (por defecto MetricsStore())
+
+    Yields:
+        Colector de la ejecución
+
+    Example:
+        with track_run('daily_report_generation') as run:
+            generator.generate_all_reports()
+    """
+    run = RunMetrics(job_name)
+    token = _active_run.set(run)
+    status = 'success'
+    try:
+        yield run
+    except Exception:
+        status = 'error'
+        raise
+    finally:
+        _active_run.reset(token)
+        run.finish(status)
+        try:
+            run.run_id = (store or MetricsStore()).save_run(run)
+        except Exception as e:
+            logger.error(f"No se pudieron guardar las métricas de ejecución: {e}")
@@ -0,0 +1,158 @@
+"""
+Módulo de análisis de planes de ejecución (EXPLAIN ANALYZE en formato JSON)
+"""
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+
+def _root(plan: Any) -> Dict[str, Any]:
+    """Documento raíz de EXPLAIN (FORMAT JSON): lista de un elemento o diccionario"""
+    if isinstance(plan, list):
+        plan = plan[0] if plan else {}
+    return plan or {}
+
+
+def _walk(node: Dict[str, Any], depth: int = 0) -> Iterator[Tuple[int, Dict[str, Any]]]:
+    """Recorre los nodos del plan en preorden con su profundidad"""
+    yield depth, node
+    for child in node.get('Plans', []):
+        yield from _walk(child, depth + 1)
+
+
+def _node_label(node: Dict[str, Any]) -> str:
+    """Etiqueta legible de un nodo: tipo, relación/índice y subplan"""
+    label = node.get('Node Type', '?')
+    if node.get('Index Name'):
+        label += f" using {node['Index Name']}"
+    if node.get('Relation Name'):
+        label += f" on {node['Relation Name']}"
+    if node.get('Subplan Name'):
+        label += f" ({node['Subplan Name']})"
+    return label
+
+
+def _inclusive_ms(node: Dict[str, Any]) -> float:
+    """Tiempo real total del nodo considerando todas sus iteraciones (loops)"""
+    return float(node.get('Actual Total Time', 0.0)) * int(node.get('Actual Loops', 1) or 1)
+
+
+def plan_totals(plan: Any) -> Dict[str, Optional[float]]:
+    """
+    Totales del plan
+
+    Args:
+        plan: Resultado de EXPLAIN (FORMAT JSON)
+
+    Returns:
+        Diccionario con total_cost, planning_ms, execution_ms y filas reales
+    """
+    root = _root(plan)
+    node = root.get('Plan', {})
+    return {
+        'total_cost': node.get('Total Cost'),
+        'planning_ms': root.get('Planning Time'),
+        'execution_ms': root.get('Execution Time'),
+        'actual_rows': node.get('Actual Rows')
+    }
+
+
+def plan_signature(plan: Any) -> List[str]:
+    """
+    Estructura del plan (tipo de nodo y relación por profundidad), sin costos ni tiempos
+
+    Dos ejecuciones con la misma firma usaron la misma estrategia; un cambio de
+    firma indica que el planificador eligió otro plan.
+
+    Args:
+        plan: Resultado de EXPLAIN (FORMAT JSON)
+
+    Returns:
+        Lista de nodos como '<profundidad>:<etiqueta>'
+    """
+    node = _root(plan).get('Plan')
+    if not node:
+        return []
+    return [f"{depth}:{_node_label(n)}" for depth, n in _walk(node)]
+
+
+def summarize_plan(plan: Any, top: int = 5) -> List[Dict[str, Any]]:
+    """
+    Nodos más costosos del plan
+
+    El tiempo exclusivo de cada nodo es su tiempo total por iteraciones menos el
+    de sus hijos; así un SubPlan correlacionado que se ejecuta una vez por fila
+    aparece con su costo real aunque cada iteración sea rápida.
+
+    Args:
+        plan: Resultado de EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON)
+        top: Número de nodos a retornar
+
+    Returns:
+        Lista de nodos ordenada por tiempo exclusivo (o costo si no hay ANALYZE)
+    """
+    node = _root(plan).get('Plan')
+    if not node:
+        return []
+
+    nodes = []
+    for depth, n in _walk(node):
+        children_ms = sum(_inclusive_ms(child) for child in n.get('Plans', []))
+        nodes.append({
+            'node': _node_label(n),
+            'depth': depth,
+            'total_cost': n.get('Total Cost'),
+            'exclusive_ms': round(max(_inclusive_ms(n) - children_ms, 0.0), 3),
+            'loops': n.get('Actual Loops'),
+            'plan_rows': n.get('Plan Rows'),
+            'actual_rows': n.get('Actual Rows'),
+            'shared_hit': n.get('Shared Hit Blocks'),
+            'shared_read': n.get('Shared Read Blocks')
+        })
+
+    analyzed = 'Actual Total Time' in node
+    key = (lambda n: n['exclusive_ms']) if analyzed else (lambda n: n['total_cost'] or 0.0)
+    return sorted(nodes, key=key, reverse=True)[:top]
+
+
+def diff_plans(previous: Any, current: Any) -> Dict[str, Any]:
+    """
+    Compara un plan contra el plan almacenado anteriormente para la misma query
+
+    Args:
+        previous: Plan anterior (EXPLAIN FORMAT JSON)
+        current: Plan actual
+
+    Returns:
+        Diccionario con structure_changed, nodos agregados/eliminados y las
+        razones de costo y tiempo de ejecución (actual / anterior)
+    """
+    old_signature = plan_signature(previous)
+    new_signature = plan_signature(current)
+    old_totals = plan_totals(previous)
+    new_totals = plan_totals(current)
+
+    def ratio(key: str) -> Optional[float]:
+        old, new = old_totals.get(key), new_totals.get(key)
+        if not old or new is None:
+            return None
+        return round(float(new) / float(old), 2)
+
+    # Comparación por etiqueta (sin profundidad) para reportar nodos nuevos o eliminados
+    old_nodes = [entry.split(':', 1)[1] for entry in old_signature]
+    new_nodes = [entry.split(':', 1)[1] for entry in new_signature]
+    added = list(new_nodes)
+    removed = []
+    for label in old_nodes:
+        if label in added:
+            added.remove(label)
+        else:
+            removed.append(label)
+
+    return {
+        'structure_changed': old_signature != new_signature,
+        'added_nodes': added,
+        'removed_nodes': removed,
+        'cost_ratio': ratio('total_cost'),
+        'execution_ratio': ratio('execution_ms'),
+        'previous_execution_ms': old_totals.get('execution_ms'),
+        'execution_ms': new_totals.get('execution_ms')
+    }
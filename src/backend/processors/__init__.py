@@ -4,5 +4,8 @@ Módulo de procesamiento de datos
 from .extractor import DataExtractor
 from .transformer import TrayectoriaTransformer
 from .excel_generator import ExcelGenerator
+from .cache import ResultCache, result_cache
+from .cube import TrayectoriaCube
 
-__all__ = ['DataExtractor', 'TrayectoriaTransformer', 'ExcelGenerator']
+__all__ = ['DataExtractor', 'TrayectoriaTransformer', 'ExcelGenerator', 'ResultCache', 'result_cache',
+           'TrayectoriaCube']
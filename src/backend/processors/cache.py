@@ -0,0 +1,221 @@
+"""
+Módulo de cache de resultados (memoria + disco) para extracciones y agregados
+"""
+import hashlib
+import os
+import pickle
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+
+from src.utils.config import config
+from src.utils.logger import get_logger
+
+
+logger = get_logger(__name__, config.paths.logs_dir)
+
+
+class ResultCache:
+    """
+    Cache de dos niveles para resultados de queries y agregados del dashboard
+
+    El nivel en memoria (LRU) evita deserializar en el mismo proceso; el nivel
+    en disco (pickle en data/cache/) permite que el scheduler pre-caliente datos
+    que después leen el dashboard y la generación bajo demanda.
+    """
+
+    def __init__(
+        self,
+        cache_dir: Optional[Path] = None,
+        ttl_hours: Optional[float] = None,
+        max_memory_items: Optional[int] = None
+    ):
+        """
+        Inicializa el cache
+
+        Args:
+            cache_dir: Directorio de archivos de cache (por defecto config.paths.cache_dir)
+            ttl_hours: Vigencia de cada entrada en horas (por defecto desde config)
+            max_memory_items: Máximo de entradas en memoria (por defecto desde config)
+        """
+        self.cache_dir = Path(cache_dir or config.paths.cache_dir)
+        self.ttl_seconds = (ttl_hours if ttl_hours is not None else config.cache.ttl_hours) * 3600
+        self.max_memory_items = max_memory_items or config.cache.max_memory_items
+
+        self._memory: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(*parts) -> str:
+        """
+        Genera una llave estable a partir de las partes proporcionadas
+
+        Args:
+            *parts: Elementos que identifican el resultado (query, grado, años...)
+
+        Returns:
+            Hash SHA1 en hexadecimal
+        """
+        raw = '|'.join(str(p) for p in parts)
+        return hashlib.sha1(raw.encode('utf-8')).hexdigest()
+
+    def _path_for(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.pkl"
+
+    def _is_fresh(self, stored_at: float, ttl_seconds: Optional[float] = None) -> bool:
+        ttl_seconds = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+        return (time.time() - stored_at) < ttl_seconds
+
+    def get(self, key: str, ttl_seconds: Optional[float] = None) -> Optional[Any]:
+        """
+        Obtiene un valor del cache
+
+        Args:
+            key: Llave del resultado
+            ttl_seconds: Vigencia para esta lectura (por defecto la del cache;
+                float('inf') para entradas que no expiran)
+
+        Returns:
+            Valor almacenado o None si no existe o expiró
+        """
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                stored_at, value = entry
+                if self._is_fresh(stored_at, ttl_seconds):
+                    self._memory.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._memory[key]
+
+        path = self._path_for(key)
+        try:
+            stored_at = path.stat().st_mtime
+        except FileNotFoundError:
+            with self._lock:
+                self.misses += 1
+            return None
+
+        if not self._is_fresh(stored_at, ttl_seconds):
+            with self._lock:
+                self.misses += 1
+            return None
+
+        try:
+            with open(path, 'rb') as f:
+                value = pickle.load(f)
+        except Exception as e:
+            logger.warning(f"Entrada de cache ilegible {path.name}: {e}")
+            with self._lock:
+                self.misses += 1
+            return None
+
+        with self._lock:
+            self._remember(key, stored_at, value)
+            self.hits += 1
+        return value
+
+    def set(self, key: str, value: Any):
+        """
+        Guarda un valor en memoria y en disco
+
+        Args:
+            key: Llave del resultado
+            value: Valor serializable con pickle
+        """
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        path = self._path_for(key)
+        tmp_path = path.with_suffix(f'.{os.getpid()}.{threading.get_ident()}.tmp')
+
+        try:
+            with open(tmp_path, 'wb') as f:
+                pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+            tmp_path.replace(path)
+        except Exception as e:
+            logger.warning(f"No se pudo persistir entrada de cache {path.name}: {e}")
+            tmp_path.unlink(missing_ok=True)
+
+        with self._lock:
+            self._remember(key, time.time(), value)
+
+    def _remember(self, key: str, stored_at: float, value: Any):
+        """Registra una entrada en el LRU de memoria (requiere _lock)"""
+        self._memory[key] = (stored_at, value)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_items:
+            self._memory.popitem(last=False)
+
+    def get_or_compute(
+        self,
+        key: str,
+        compute: Callable[[], Any],
+        refresh: bool = False
+    ) -> Any:
+        """
+        Obtiene un valor del cache o lo calcula y almacena
+
+        Args:
+            key: Llave del resultado
+            compute: Función sin argumentos que produce el valor
+            refresh: Si True, ignora el valor almacenado y lo recalcula
+
+        Returns:
+            Valor almacenado o recién calculado
+        """
+        if not refresh:
+            value = self.get(key)
+            if value is not None:
+                return value
+
+        value = compute()
+        self.set(key, value)
+        return value
+
+    def invalidate(self, key: str):
+        """Elimina una entrada del cache"""
+        with self._lock:
+            self._memory.pop(key, None)
+        self._path_for(key).unlink(missing_ok=True)
+
+    def clear(self):
+        """Elimina todas las entradas del cache"""
+        with self._lock:
+            self._memory.clear()
+        if self.cache_dir.exists():
+            for path in self.cache_dir.glob('*.pkl'):
+                path.unlink(missing_ok=True)
+        logger.info("Cache de resultados limpiado")
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Obtiene estadísticas del cache
+
+        Returns:
+            Diccionario con entradas, bytes en disco, hits y misses
+        """
+        disk_entries = 0
+        disk_bytes = 0
+        if self.cache_dir.exists():
+            for path in self.cache_dir.glob('*.pkl'):
+                try:
+                    disk_bytes += path.stat().st_size
+                    disk_entries += 1
+                except FileNotFoundError:
+                    continue
+
+        with self._lock:
+            return {
+                'disk_entries': disk_entries,
+                'disk_bytes': disk_bytes,
+                'memory_entries': len(self._memory),
+                'hits': self.hits,
+                'misses': self.misses
+            }
+
+
+# Instancia global de cache
+result_cache = ResultCache()
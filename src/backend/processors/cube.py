@@ -0,0 +1,272 @@
+"""
+Módulo de cubo pre-agregado de trayectoria para consultas por programa, campus y escuela
+"""
+from typing import Dict, Iterable, List, Optional, Sequence, Union
+
+import numpy as np
+import pandas as pd
+
+from src.backend.processors.periodos import PeriodoIndex, periodo_ordinals
+from src.utils.config import config
+from src.utils.logger import get_logger
+
+
+logger = get_logger(__name__, config.paths.logs_dir)
+
+
+# Dimensión del cubo -> columna de origen en los DataFrames de NI/Reinscritos
+SOURCE_COLUMNS = {
+    'periodo': 'periodo_id',
+    'programa': 'programa_id',
+    'campus': 'campus',
+    'escuela': 'escuela',
+    'tipo': 'tipo'
+}
+
+# Dimensiones derivadas del periodo de ingreso de cada estudiante
+COHORT_DIMENSIONS = ('generacion', 'offset')
+
+DIMENSIONS = tuple(SOURCE_COLUMNS) + COHORT_DIMENSIONS
+
+MEASURE = 'estudiantes'
+
+
+class TrayectoriaCube:
+    """
+    Cubo de estudiantes distintos por periodo, programa, campus, escuela,
+    tipo y cohorte (generación y periodos desde el ingreso)
+
+    Cada dimensión se guarda como un arreglo de códigos enteros más su
+    arreglo de etiquetas; los hechos quedan deduplicados a nivel
+    (estudiante, celda), de modo que slice/dice son máscaras sobre arreglos
+    y rollup cuenta estudiantes distintos sin volver a la base de datos.
+    El código -1 indica un valor faltante (p. ej. estudiantes sin periodo
+    de ingreso en el rango).
+    """
+
+    def __init__(
+        self,
+        codes: Dict[str, np.ndarray],
+        labels: Dict[str, np.ndarray],
+        students: np.ndarray,
+        ordinals: Optional[Dict[str, int]] = None
+    ):
+        self.codes = codes
+        self.labels = labels
+        self.students = students
+        self.ordinals = ordinals or {}
+
+    @classmethod
+    def from_frames(
+        cls,
+        df_nuevo_ingreso: pd.DataFrame,
+        df_reinscritos: pd.DataFrame,
+        periodo_index: Optional[PeriodoIndex] = None
+    ) -> 'TrayectoriaCube':
+        """
+        Construye el cubo a partir de las extracciones de NI y Reinscritos
+
+        Args:
+            df_nuevo_ingreso: DataFrame con estudiantes de nuevo ingreso
+            df_reinscritos: DataFrame con estudiantes reinscritos
+            periodo_index: Calendario de periodos para los periodos desde el ingreso
+
+        Returns:
+            Cubo con los hechos codificados
+        """
+        columns = ['estudiante_id'] + list(SOURCE_COLUMNS.values())
+        frames = [
+            df[[c for c in columns if c in df.columns]]
+            for df in (df_nuevo_ingreso, df_reinscritos)
+            if not df.empty
+        ]
+        df_all = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=columns)
+        for column in columns:
+            if column not in df_all.columns:
+                df_all[column] = None
+
+        periodo = df_all['periodo_id'].astype(str)
+
+        # Generación: primer periodo de nuevo ingreso de cada estudiante
+        ingreso = (
+            pd.DataFrame({'estudiante_id': df_all['estudiante_id'], 'generacion': periodo})
+            [df_all['tipo'].eq('NI')]
+            .drop_duplicates('estudiante_id')
+            .set_index('estudiante_id')['generacion']
+        )
+        generacion = df_all['estudiante_id'].map(ingreso)
+
+        # Periodos transcurridos desde el ingreso: diferencia de ordinales de calendario
+        periodo_codes, periodo_labels = pd.factorize(periodo, sort=True)
+        periodo_labels = np.asarray(periodo_labels, dtype=str)
+        ordinals = periodo_ordinals(periodo_labels, periodo_index)
+        gen_codes = pd.Index(periodo_labels).get_indexer(generacion)
+
+        has_gen = gen_codes >= 0
+        offset = pd.Series(pd.NA, index=df_all.index, dtype='Int64')
+        offset[has_gen] = ordinals[periodo_codes[has_gen]] - ordinals[gen_codes[has_gen]]
+
+        values = {dim: df_all[col] for dim, col in SOURCE_COLUMNS.items()}
+        values['periodo'] = periodo
+        values['generacion'] = generacion
+        values['offset'] = offset
+
+        codes: Dict[str, np.ndarray] = {}
+        labels: Dict[str, np.ndarray] = {}
+        for dim in DIMENSIONS:
+            dim_codes, dim_labels = pd.factorize(values[dim], sort=True)
+            codes[dim] = dim_codes.astype(np.int32)
+            labels[dim] = np.asarray(dim_labels)
+
+        student_codes, _ = pd.factorize(df_all['estudiante_id'])
+
+        # Deduplicar a nivel (estudiante, celda)
+        facts = pd.DataFrame(codes)
+        facts['_student'] = student_codes.astype(np.int32)
+        facts = facts.drop_duplicates()
+
+        cube = cls(
+            codes={dim: facts[dim].to_numpy() for dim in DIMENSIONS},
+            labels=labels,
+            students=facts['_student'].to_numpy(),
+            ordinals=dict(zip(periodo_labels.tolist(), ordinals.tolist()))
+        )
+        logger.info(f"Cubo de trayectoria construido: {cube.size} hechos")
+        return cube
+
+    @property
+    def size(self) -> int:
+        """Número de hechos (estudiante, celda)"""
+        return len(self.students)
+
+    def members(self, dimension: str) -> List:
+        """
+        Valores presentes de una dimensión
+
+        Args:
+            dimension: Nombre de la dimensión
+
+        Returns:
+            Lista ordenada de etiquetas con al menos un hecho
+        """
+        self._check_dimension(dimension)
+        present = np.unique(self.codes[dimension])
+        present = present[present >= 0]
+        return self.labels[dimension][present].tolist()
+
+    def dice(self, filters: Dict[str, Union[object, Iterable]]) -> 'TrayectoriaCube':
+        """
+        Filtra el cubo por uno o varios valores en varias dimensiones
+
+        Args:
+            filters: Dimensión -> valor o lista de valores permitidos
+
+        Returns:
+            Nuevo cubo con los hechos que cumplen todos los filtros
+        """
+        mask = np.ones(self.size, dtype=bool)
+        for dimension, wanted in filters.items():
+            self._check_dimension(dimension)
+            if isinstance(wanted, (str, bytes)) or not isinstance(wanted, Iterable):
+                wanted = [wanted]
+            wanted_codes = np.flatnonzero(np.isin(self.labels[dimension], list(wanted)))
+            mask &= np.isin(self.codes[dimension], wanted_codes)
+
+        return TrayectoriaCube(
+            codes={dim: arr[mask] for dim, arr in self.codes.items()},
+            labels=self.labels,
+            students=self.students[mask],
+            ordinals=self.ordinals
+        )
+
+    def slice(self, dimension: str, value) -> 'TrayectoriaCube':
+        """
+        Fija una dimensión en un solo valor
+
+        Args:
+            dimension: Nombre de la dimensión
+            value: Valor a conservar
+
+        Returns:
+            Nuevo cubo filtrado
+        """
+        return self.dice({dimension: [value]})
+
+    def rollup(self, dimensions: Sequence[str] = ()) -> pd.DataFrame:
+        """
+        Cuenta estudiantes distintos agrupando por las dimensiones indicadas
+
+        Args:
+            dimensions: Dimensiones a conservar (vacío para el total)
+
+        Returns:
+            DataFrame con una columna por dimensión y la columna 'estudiantes'
+        """
+        dimensions = list(dimensions)
+        for dimension in dimensions:
+            self._check_dimension(dimension)
+
+        if not dimensions:
+            return pd.DataFrame({MEASURE: [len(np.unique(self.students))]})
+
+        mask = np.ones(self.size, dtype=bool)
+        for dimension in dimensions:
+            mask &= self.codes[dimension] >= 0
+
+        dim_codes = [self.codes[d][mask].astype(np.int64) for d in dimensions]
+        students = self.students[mask].astype(np.int64)
+        sizes = [len(self.labels[d]) for d in dimensions]
+
+        if not len(students):
+            return pd.DataFrame({**{d: pd.Series(dtype=self.labels[d].dtype) for d in dimensions},
+                                 MEASURE: pd.Series(dtype=np.int64)})
+
+        # Llave de grupo empacada en un entero; pares (grupo, estudiante) únicos
+        group_key = np.ravel_multi_index(dim_codes, sizes)
+        n_students = int(students.max()) + 1
+        pairs = np.unique(group_key * n_students + students)
+        groups, counts = np.unique(pairs // n_students, return_counts=True)
+
+        group_codes = np.unravel_index(groups, sizes)
+        result = pd.DataFrame({
+            d: self.labels[d][codes] for d, codes in zip(dimensions, group_codes)
+        })
+        result[MEASURE] = counts.astype(np.int64)
+        return result
+
+    def trayectoria(self) -> pd.DataFrame:
+        """
+        Matriz de trayectoria por generación a partir del cubo
+
+        Returns:
+            DataFrame con el mismo formato que create_trayectoria_table
+        """
+        counts = self.rollup(['generacion', 'offset'])
+        if counts.empty:
+            return pd.DataFrame()
+
+        generaciones = sorted(counts['generacion'].unique())
+
+        # Columnas: periodos entre la primera generación y el último periodo con datos
+        with_gen = self.codes['generacion'] >= 0
+        periodos = self.labels['periodo'][np.unique(self.codes['periodo'][with_gen])]
+        last_ordinal = max(self.ordinals[p] for p in periodos)
+        max_periodos = last_ordinal - self.ordinals[generaciones[0]] + 1
+
+        matrix = (
+            counts[counts['offset'].between(0, max_periodos - 1)]
+            .pivot(index='generacion', columns='offset', values=MEASURE)
+            .reindex(index=generaciones, columns=range(max_periodos))
+            .fillna(0)
+            .astype(int)
+        )
+        matrix.columns = ['Nuevo ingreso' if p == 0 else f'P{p+1}' for p in matrix.columns]
+        matrix.index.name = 'Generación'
+
+        df_trayectoria = matrix.reset_index()
+        df_trayectoria['Generación'] = df_trayectoria['Generación'].astype(str)
+        return df_trayectoria
+
+    def _check_dimension(self, dimension: str):
+        if dimension not in self.codes:
+            raise ValueError(f"Dimensión no válida: {dimension}. Opciones: {', '.join(DIMENSIONS)}")
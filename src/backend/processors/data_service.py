@@ -0,0 +1,235 @@
+"""
+Módulo de servicio de datos compartido por el dashboard y el pre-calentamiento
+"""
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import pandas as pd
+
+from src.backend.processors.cache import result_cache
+from src.backend.processors.extractor import DataExtractor
+from src.backend.processors.fact_store import FactStore
+from src.backend.processors.listing import StudentListing
+from src.backend.processors.periodos import PeriodoIndex
+from src.backend.processors.transformer import TrayectoriaTransformer
+from src.utils.config import config
+from src.utils.logger import get_logger
+
+
+logger = get_logger(__name__, config.paths.logs_dir)
+
+
+# Versión del contenido de los agregados: cambia la llave del cache al agregar campos
+AGGREGATES_VERSION = 4
+
+
+def _backend_key() -> tuple:
+    """Parte de la llave de cache que distingue los agregados calculados sobre la réplica local"""
+    return () if config.replica.backend == 'postgres' else (config.replica.backend,)
+
+
+def fact_store_path(grado: str, year_start: int, year_end: int) -> Path:
+    """Directorio del almacén de hechos de un grado y rango de años"""
+    suffix = ''.join(f"_{part}" for part in _backend_key())
+    return config.paths.data_dir / "facts" / f"{grado}_{year_start}_{year_end}{suffix}"
+
+
+def _write_fact_store(grado: str, year_start: int, year_end: int, datos: Dict[str, pd.DataFrame]) -> Path:
+    """Escribe el almacén de hechos desde las extracciones de un grado"""
+    return FactStore.write(
+        fact_store_path(grado, year_start, year_end),
+        datos['nuevo_ingreso'],
+        datos['reinscritos'],
+        datos.get('estatus'),
+        PeriodoIndex.from_frame(datos['periodos']),
+        grado=grado,
+        year_start=year_start,
+        year_end=year_end,
+        backend=config.replica.backend
+    )
+
+
+def load_fact_store(
+    grado: str,
+    year_start: Optional[int] = None,
+    year_end: Optional[int] = None,
+    refresh: bool = False
+) -> FactStore:
+    """
+    Abre el almacén de hechos de un grado (np.memmap), escribiéndolo si no existe
+
+    Abrirlo no lee los datos: en cada ejecución del dashboard o en otro proceso
+    cuesta milisegundos. Se reconstruye desde las extracciones (cacheadas) si
+    no existe, si tiene más de cache.ttl_hours o con refresh.
+
+    Args:
+        grado: Grado académico (LL, EL, ML)
+        year_start: Año inicial (por defecto desde config)
+        year_end: Año final (por defecto desde config)
+        refresh: Si True, vuelve a consultar la base de datos y reescribe el almacén
+
+    Returns:
+        Almacén de hechos
+    """
+    year_start = year_start or config.reports.year_start
+    year_end = year_end or config.reports.year_end
+    path = fact_store_path(grado, year_start, year_end)
+
+    if refresh or not FactStore.is_fresh(path, config.cache.ttl_hours * 3600):
+        extractor = DataExtractor(year_start, year_end, refresh_cache=refresh)
+        _write_fact_store(grado, year_start, year_end, {
+            'nuevo_ingreso': extractor.extract_nuevo_ingreso(grado),
+            'reinscritos': extractor.extract_reinscritos(grado),
+            'estatus': extractor.extract_estatus(grado),
+            'periodos': extractor.extract_periodos()
+        })
+
+    return FactStore.open(path)
+
+
+def load_student_listing(
+    grado: str,
+    year_start: Optional[int] = None,
+    year_end: Optional[int] = None,
+    tipo: str = 'nuevo_ingreso',
+    refresh: bool = False
+) -> StudentListing:
+    """
+    Obtiene el listado paginable de registros de NI o Reinscritos de un grado
+
+    El listado (con sus índices de orden ya calculados) se cachea por
+    (grado, años, tipo): cada página posterior solo recorre los índices.
+
+    Args:
+        grado: Grado académico (LL, EL, ML)
+        year_start: Año inicial (por defecto desde config)
+        year_end: Año final (por defecto desde config)
+        tipo: 'nuevo_ingreso' o 'reinscritos'
+        refresh: Si True, vuelve a consultar la base de datos y reemplaza el cache
+
+    Returns:
+        StudentListing
+    """
+    if tipo not in ('nuevo_ingreso', 'reinscritos'):
+        raise ValueError(f"Tipo de listado no válido: {tipo}")
+    year_start = year_start or config.reports.year_start
+    year_end = year_end or config.reports.year_end
+
+    def compute() -> StudentListing:
+        extractor = DataExtractor(year_start, year_end, refresh_cache=refresh)
+        if tipo == 'nuevo_ingreso':
+            return StudentListing(extractor.extract_nuevo_ingreso(grado))
+        return StudentListing(extractor.extract_reinscritos(grado))
+
+    if config.cache.enabled:
+        key = result_cache.make_key('listing', grado, year_start, year_end, tipo, *_backend_key())
+        return result_cache.get_or_compute(key, compute, refresh=refresh)
+    return compute()
+
+
+def load_trayectoria_data(
+    grado: str,
+    year_start: Optional[int] = None,
+    year_end: Optional[int] = None,
+    refresh: bool = False
+) -> Dict[str, Any]:
+    """
+    Obtiene los datos y agregados de trayectoria para un grado y rango de años
+
+    Las extracciones se cachean por query en DataExtractor; los agregados
+    (trayectoria, FIMPES, métricas y cubo por programa/campus/escuela) se
+    cachean aquí por (grado, años).
+    Los datos consolidados (Hoja1) no se cargan: solo los usa el reporte Excel.
+    También escribe el almacén de hechos del grado (load_fact_store).
+
+    Args:
+        grado: Grado académico (LL, EL, ML)
+        year_start: Año inicial (por defecto desde config)
+        year_end: Año final (por defecto desde config)
+        refresh: Si True, vuelve a consultar la base de datos y reemplaza el cache
+
+    Returns:
+        Diccionario con 'datos' (DataFrames extraídos), 'trayectoria',
+        'fimpes', 'metrics' y 'cube' (TrayectoriaCube)
+    """
+    year_start = year_start or config.reports.year_start
+    year_end = year_end or config.reports.year_end
+
+    extractor = DataExtractor(year_start, year_end, refresh_cache=refresh)
+    datos = extractor.extract_all_for_grado(grado, include_todos=False)
+
+    # Almacén de hechos para el detalle del dashboard (se escribe una vez por extracción)
+    if refresh or not FactStore.is_fresh(fact_store_path(grado, year_start, year_end), config.cache.ttl_hours * 3600):
+        _write_fact_store(grado, year_start, year_end, datos)
+
+    def compute_aggregates() -> Dict[str, Any]:
+        logger.info(f"Calculando agregados de trayectoria para {grado} ({year_start}-{year_end})")
+        transformer = TrayectoriaTransformer(PeriodoIndex.from_frame(datos['periodos']))
+        df_trayectoria = transformer.create_trayectoria_table(
+            datos['nuevo_ingreso'],
+            datos['reinscritos']
+        )
+        return {
+            'trayectoria': df_trayectoria,
+            'fimpes': transformer.create_cuadro_fimpes(
+                df_trayectoria, datos['nuevo_ingreso'], datos['reinscritos'], datos.get('estatus')
+            ),
+            'metrics': transformer.calculate_retention_metrics(df_trayectoria),
+            'cube': transformer.build_cube(datos['nuevo_ingreso'], datos['reinscritos'])
+        }
+
+    if config.cache.enabled:
+        key = result_cache.make_key('trayectoria', AGGREGATES_VERSION, grado, year_start, year_end,
+                                    *_backend_key())
+        aggregates = result_cache.get_or_compute(key, compute_aggregates, refresh=refresh)
+    else:
+        aggregates = compute_aggregates()
+
+    return {'datos': datos, **aggregates}
+
+
+def load_batch_trayectoria(
+    grados: Optional[List[str]] = None,
+    year_start: Optional[int] = None,
+    year_end: Optional[int] = None,
+    include_programas: bool = False,
+    refresh: bool = False
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Obtiene trayectoria, FIMPES y métricas de varios grados (y opcionalmente de
+    cada programa) en una sola pasada del transformador
+
+    Args:
+        grados: Grados a incluir (por defecto config.reports.grados)
+        year_start: Año inicial (por defecto desde config)
+        year_end: Año final (por defecto desde config)
+        include_programas: Si True, incluye las matrices por programa
+        refresh: Si True, vuelve a consultar la base de datos y reemplaza el cache
+
+    Returns:
+        Diccionario grado -> {'trayectoria', 'fimpes', 'metrics'[, 'programas']}
+    """
+    grados = grados or config.reports.grados
+    year_start = year_start or config.reports.year_start
+    year_end = year_end or config.reports.year_end
+
+    def compute() -> Dict[str, Dict[str, Any]]:
+        extractor = DataExtractor(year_start, year_end, refresh_cache=refresh)
+        frames = []
+        estatus = []
+        for grado in grados:
+            frames.append(extractor.extract_nuevo_ingreso(grado))
+            frames.append(extractor.extract_reinscritos(grado))
+            estatus.append(extractor.extract_estatus(grado))
+        transformer = TrayectoriaTransformer(PeriodoIndex.from_frame(extractor.extract_periodos()))
+        return transformer.create_batch(
+            frames,
+            include_programas=include_programas,
+            df_estatus=pd.concat(estatus, ignore_index=True)
+        )
+
+    if config.cache.enabled:
+        key = result_cache.make_key('batch', AGGREGATES_VERSION, tuple(grados), year_start, year_end,
+                                    include_programas, *_backend_key())
+        return result_cache.get_or_compute(key, compute, refresh=refresh)
+    return compute()
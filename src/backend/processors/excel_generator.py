@@ -4,13 +4,22 @@ Módulo de generación de reportes Excel con formato
 import pandas as pd
 from pathlib import Path
 from datetime import datetime
-from typing import Dict, Optional
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
 import openpyxl
-from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Font, PatternFill, Alignment, Border, Side, NamedStyle
 from openpyxl.utils import get_column_letter
 
 from src.backend.processors.extractor import DataExtractor
+from src.backend.processors.periodos import PeriodoIndex
+from src.backend.processors.shared_frames import SharedFrames, iter_frame_rows
 from src.backend.processors.transformer import TrayectoriaTransformer
+from src.backend.processors.validator import ReportValidator, ReportValidationError
+from src.backend.monitoring.metrics import (
+    track_stage, record_metric, collect_metrics, merge_metrics, SHEET_ROWS, FILE_BYTES
+)
 from src.utils.config import config
 from src.utils.logger import get_logger
 
@@ -27,6 +36,11 @@ class ExcelGenerator:
     COLOR_ALTERNATE = "D9E1F2"  # Gris azulado claro
     COLOR_TOTAL = "FFC000"  # Naranja
 
+    # Estilos con nombre para workbooks write-only (se registran una vez por workbook)
+    STYLE_HEADER = "tray_header"
+    STYLE_ROW_EVEN = "tray_row_even"
+    STYLE_ROW_ODD = "tray_row_odd"
+
     def __init__(self, output_dir: Optional[Path] = None):
         """
         Inicializa el generador
@@ -89,6 +103,132 @@ class ExcelGenerator:
         """Congela paneles para mantener encabezados visibles"""
         ws.freeze_panes = ws.cell(row=row, column=col)
 
+    def _register_named_styles(self, wb):
+        """Registra en el workbook los estilos equivalentes a _apply_header_style/_apply_data_style"""
+        thin = Side(style='thin')
+        border = Border(left=thin, right=thin, top=thin, bottom=thin)
+
+        header = NamedStyle(name=self.STYLE_HEADER)
+        header.font = Font(bold=True, color="FFFFFF", size=11)
+        header.fill = PatternFill(start_color=self.COLOR_HEADER, end_color=self.COLOR_HEADER, fill_type="solid")
+        header.alignment = Alignment(horizontal="center", vertical="center", wrap_text=True)
+        header.border = border
+        wb.add_named_style(header)
+
+        for name, color in [(self.STYLE_ROW_EVEN, self.COLOR_ALTERNATE), (self.STYLE_ROW_ODD, "FFFFFF")]:
+            row_style = NamedStyle(name=name)
+            row_style.fill = PatternFill(start_color=color, end_color=color, fill_type="solid")
+            row_style.alignment = Alignment(horizontal="left", vertical="center")
+            row_style.border = border
+            wb.add_named_style(row_style)
+
+    def _column_widths(self, df: pd.DataFrame, min_width: int = 10, max_width: int = 50) -> List[int]:
+        """Calcula el ancho de cada columna a partir del DataFrame (equivalente a _auto_adjust_columns)"""
+        widths = []
+        for col in df.columns:
+            lengths = df[col].dropna().astype(str).str.len()
+            max_length = max(len(str(col)), int(lengths.max()) if len(lengths) else 0)
+            widths.append(min(max(max_length + 2, min_width), max_width))
+        return widths
+
+    def _write_only_title(self, ws, title: Optional[str]):
+        """Escribe el título y la fila en blanco que lo separa de la tabla"""
+        if title:
+            title_cell = WriteOnlyCell(ws, value=title)
+            title_cell.font = Font(bold=True, size=14)
+            ws.append([title_cell])
+            ws.append([])
+
+    def _create_write_only_worksheet(
+        self,
+        wb,
+        df: pd.DataFrame,
+        sheet_name: str,
+        title: Optional[str] = None,
+        apply_styles: bool = True
+    ):
+        """
+        Crea una hoja en un workbook write-only a partir de un DataFrame
+
+        Las filas se vuelcan a disco conforme se escriben. Anchos de columna y
+        paneles se definen antes de la primera fila, como exige el modo write-only.
+        """
+        ws = wb.create_sheet(sheet_name)
+        start_data_row = 4 if title else 2
+
+        if apply_styles and len(df) > 0:
+            for col_idx, width in enumerate(self._column_widths(df), start=1):
+                ws.column_dimensions[get_column_letter(col_idx)].width = width
+            ws.freeze_panes = f"A{start_data_row}"
+
+        self._write_only_title(ws, title)
+
+        if apply_styles:
+            header = []
+            for col_name in df.columns:
+                cell = WriteOnlyCell(ws, value=col_name)
+                cell.style = self.STYLE_HEADER
+                header.append(cell)
+            ws.append(header)
+        else:
+            ws.append(list(df.columns))
+
+        for row_number, row in enumerate(df.itertuples(index=False), start=start_data_row):
+            if apply_styles:
+                style = self.STYLE_ROW_EVEN if row_number % 2 == 0 else self.STYLE_ROW_ODD
+                cells = []
+                for value in row:
+                    cell = WriteOnlyCell(ws, value=value)
+                    cell.style = style
+                    cells.append(cell)
+                ws.append(cells)
+            else:
+                ws.append(row)
+
+        logger.debug(f"Hoja '{sheet_name}' creada con {len(df)} filas (write-only)")
+
+    def write_streaming_worksheet(
+        self,
+        wb,
+        batches: Iterable[Tuple[List[str], List[tuple]]],
+        sheet_name: str,
+        title: Optional[str] = None,
+        on_batch: Optional[Callable[[List[str], List[tuple]], None]] = None
+    ) -> int:
+        """
+        Escribe una hoja sin estilos directamente desde lotes de filas de la base de datos
+
+        Cada lote se escribe y se libera antes de pedir el siguiente, por lo que la
+        memoria no crece con el número de filas. Requiere un workbook write-only.
+
+        Args:
+            wb: Workbook de openpyxl creado con write_only=True
+            batches: Iterable de tuplas (columnas, filas), ej. DataExtractor.iter_todos_datos()
+            sheet_name: Nombre de la hoja
+            title: Título opcional sobre la tabla
+            on_batch: Función llamada con (columnas, filas) por cada lote (ej. validación)
+
+        Returns:
+            Número de filas de datos escritas
+        """
+        ws = wb.create_sheet(sheet_name)
+        self._write_only_title(ws, title)
+
+        total_rows = 0
+        header_written = False
+        for columns, rows in batches:
+            if not header_written:
+                ws.append(columns)
+                header_written = True
+            if on_batch:
+                on_batch(columns, rows)
+            for row in rows:
+                ws.append(row)
+            total_rows += len(rows)
+
+        logger.debug(f"Hoja '{sheet_name}' escrita en streaming con {total_rows} filas")
+        return total_rows
+
     def create_worksheet_from_dataframe(
         self,
         wb,
@@ -107,6 +247,10 @@ class ExcelGenerator:
             title: Título opcional sobre la tabla
             apply_styles: Si aplicar estilos automáticos
         """
+        if wb.write_only:
+            self._create_write_only_worksheet(wb, df, sheet_name, title, apply_styles)
+            return
+
         if sheet_name in wb.sheetnames:
             ws = wb[sheet_name]
         else:
@@ -156,7 +300,9 @@ class ExcelGenerator:
         grado: str,
         year_start: Optional[int] = None,
         year_end: Optional[int] = None,
-        filename: Optional[str] = None
+        filename: Optional[str] = None,
+        stream_hoja1: Optional[bool] = None,
+        progress_callback: Optional[Callable[[str, float], None]] = None
     ) -> Path:
         """
         Genera reporte completo para un grado académico
@@ -166,19 +312,69 @@ class ExcelGenerator:
             year_start: Año inicial (opcional)
             year_end: Año final (opcional)
             filename: Nombre del archivo (opcional, se genera automático)
+            stream_hoja1: Si escribir Hoja1 en lotes desde el cursor con un workbook
+                write-only (por defecto config.reports.stream_hoja1)
+            progress_callback: Función llamada con (etapa, avance 0-1) al iniciar cada etapa
 
         Returns:
             Path del archivo generado
         """
         logger.info(f"Generando reporte para {grado}")
 
+        if stream_hoja1 is None:
+            stream_hoja1 = config.reports.stream_hoja1
+
+        def progress(stage: str, fraction: float):
+            if progress_callback:
+                progress_callback(stage, fraction)
+
         try:
-            # Extraer datos
-            extractor = DataExtractor(year_start, year_end)
-            data = extractor.extract_all_for_grado(grado)
+            # Extraer datos (en streaming, Hoja1 se consulta al momento de escribirla)
+            progress('Extracción', 0.0)
+            with track_stage(f"{grado}:extraccion"):
+                extractor = DataExtractor(year_start, year_end)
+                data = extractor.extract_all_for_grado(grado, include_todos=not stream_hoja1)
+
+            return self._build_report(
+                grado,
+                data,
+                extractor.iter_todos_datos if stream_hoja1 else None,
+                filename,
+                progress
+            )
+
+        except Exception as e:
+            logger.error(f"Error generando reporte para {grado}: {e}")
+            raise
+
+    def _build_report(
+        self,
+        grado: str,
+        data: Dict[str, pd.DataFrame],
+        hoja1_batches: Optional[Callable[[], Iterable[Tuple[List[str], List[tuple]]]]],
+        filename: Optional[str],
+        progress: Callable[[str, float], None]
+    ) -> Path:
+        """
+        Transforma los datos extraídos de un grado y escribe su reporte
 
-            # Transformar datos
-            transformer = TrayectoriaTransformer()
+        Args:
+            grado: Grado académico (LL, EL, ML)
+            data: DataFrames de extract_all_for_grado
+            hoja1_batches: Función que entrega Hoja1 en lotes (columnas, filas) para
+                escribirla en streaming; None para escribirla desde data['todos']
+            filename: Nombre del archivo (opcional, se genera automático)
+            progress: Función llamada con (etapa, avance 0-1) al iniciar cada etapa
+
+        Returns:
+            Path del archivo generado
+        """
+        stream_hoja1 = hoja1_batches is not None
+
+        # Transformar datos
+        progress('Transformación', 0.35)
+        with track_stage(f"{grado}:transformacion"):
+            transformer = TrayectoriaTransformer(PeriodoIndex.from_frame(data['periodos']))
 
             # Procesar resumen con trayectoria
             df_resumen = transformer.create_trayectoria_table(
@@ -187,72 +383,96 @@ class ExcelGenerator:
             )
 
             # Procesar cuadro FIMPES
-            df_fimpes = transformer.create_cuadro_fimpes(df_resumen)
+            df_fimpes = transformer.create_cuadro_fimpes(
+                df_resumen,
+                data['nuevo_ingreso'],
+                data['reinscritos'],
+                data.get('estatus')
+            )
 
-            # Nombre del archivo
-            if not filename:
-                grado_names = {'LL': 'Licenciatura', 'EL': 'Especialidad', 'ML': 'Maestría'}
-                timestamp = datetime.now().strftime('%Y%m%d')
-                filename = f"Trayectoria_online_{grado_names.get(grado, grado)}_{timestamp}.xlsx"
+        # Nombre del archivo
+        if not filename:
+            grado_names = {'LL': 'Licenciatura', 'EL': 'Especialidad', 'ML': 'Maestría'}
+            timestamp = datetime.now().strftime('%Y%m%d')
+            filename = f"Trayectoria_online_{grado_names.get(grado, grado)}_{timestamp}.xlsx"
 
-            output_file = self.output_dir / filename
+        output_file = self.output_dir / filename
 
-            # Crear workbook
+        # Crear workbook
+        if stream_hoja1:
+            wb = openpyxl.Workbook(write_only=True)
+            self._register_named_styles(wb)
+        else:
             wb = openpyxl.Workbook()
             wb.remove(wb.active)  # Remover hoja por defecto
 
-            # Crear hojas
-            # Hoja1: Datos consolidados SIN estilos (para velocidad)
-            self.create_worksheet_from_dataframe(
-                wb,
-                data['todos'],
-                'Hoja1',
-                title='Datos Consolidados',
-                apply_styles=False  # Sin estilos para agilizar con grandes volúmenes
-            )
-
-            self.create_worksheet_from_dataframe(
-                wb,
-                df_resumen,
-                'Resumen',
-                title=f'Trayectoria {grado}'
-            )
-
-            self.create_worksheet_from_dataframe(
-                wb,
-                data['nuevo_ingreso'],
-                'NI',
-                title='Nuevo Ingreso'
-            )
-
-            self.create_worksheet_from_dataframe(
-                wb,
-                data['reinscritos'],
-                'Reinscritos',
-                title='Estudiantes Reinscritos'
-            )
-
-            self.create_worksheet_from_dataframe(
-                wb,
-                df_fimpes,
-                'Cuadro FIMPES',
-                title='Indicadores FIMPES'
-            )
+        validator = ReportValidator(grado) if config.validation.enabled else None
+
+        # Hoja1: Datos consolidados SIN estilos (para velocidad)
+        if stream_hoja1:
+            progress('Escritura Hoja1', 0.45)
+            with track_stage(f"{grado}:escritura:Hoja1"):
+                rows_hoja1 = self.write_streaming_worksheet(
+                    wb,
+                    hoja1_batches(),
+                    'Hoja1',
+                    title='Datos Consolidados',
+                    on_batch=(lambda cols, rows: validator.check_batch('Hoja1', cols, rows)) if validator else None
+                )
+            record_metric(SHEET_ROWS, f"{grado}:Hoja1", rows_hoja1)
+            sheets = []
+        else:
+            sheets = [(data['todos'], 'Hoja1', 'Datos Consolidados', False)]
+
+        sheets += [
+            (df_resumen, 'Resumen', f'Trayectoria {grado}', True),
+            (data['nuevo_ingreso'], 'NI', 'Nuevo Ingreso', True),
+            (data['reinscritos'], 'Reinscritos', 'Estudiantes Reinscritos', True),
+            (df_fimpes, 'Cuadro FIMPES', 'Indicadores FIMPES', True)
+        ]
+
+        # Crear hojas
+        write_start = 0.6 if stream_hoja1 else 0.45
+        for idx, (df_sheet, sheet_name, title, apply_styles) in enumerate(sheets):
+            progress(f"Escritura {sheet_name}", write_start + (0.85 - write_start) * idx / len(sheets))
+            if validator:
+                validator.check_sheet(sheet_name, df_sheet)
+            with track_stage(f"{grado}:escritura:{sheet_name}"):
+                self.create_worksheet_from_dataframe(
+                    wb,
+                    df_sheet,
+                    sheet_name,
+                    title=title,
+                    apply_styles=apply_styles
+                )
+            record_metric(SHEET_ROWS, f"{grado}:{sheet_name}", len(df_sheet))
+
+        # Validar antes de guardar (los hallazgos quedan junto al reporte)
+        if validator:
+            validation = validator.finish()
+            validator.write_sidecar(output_file)
+            if not validation.is_valid and config.validation.fail_on_error:
+                raise ReportValidationError(
+                    f"Reporte {grado} con {len(validation.errors)} hallazgos de validación"
+                )
 
-            # Guardar archivo
+        # Guardar archivo
+        progress('Guardado', 0.85)
+        with track_stage(f"{grado}:guardado"):
             wb.save(output_file)
-            logger.info(f"Reporte generado exitosamente: {output_file}")
 
-            return output_file
+        record_metric(FILE_BYTES, grado, output_file.stat().st_size)
+        progress('Completado', 1.0)
+        logger.info(f"Reporte generado exitosamente: {output_file}")
 
-        except Exception as e:
-            logger.error(f"Error generando reporte para {grado}: {e}")
-            raise
+        return output_file
 
     def generate_all_reports(
         self,
         year_start: Optional[int] = None,
-        year_end: Optional[int] = None
+        year_end: Optional[int] = None,
+        workers: Optional[int] = None,
+        grados: Optional[List[str]] = None
     ) -> Dict[str, Path]:
         """
         Genera todos los reportes (LL, EL, ML)
@@ -260,26 +480,142 @@ class ExcelGenerator:
         Args:
             year_start: Año inicial
             year_end: Año final
+            workers: Procesos para transformar y escribir los reportes en paralelo
+                (por defecto config.reports.workers; 1 = secuencial)
+            grados: Grados a generar (por defecto config.reports.grados)
 
         Returns:
             Diccionario con los paths de archivos generados
         """
         logger.info("Generando todos los reportes")
 
-        results = {}
-        for grado in config.reports.grados:
-            try:
-                output_file = self.generate_report_for_grado(grado, year_start, year_end)
-                results[grado] = output_file
-            except Exception as e:
-                logger.error(f"Error generando reporte para {grado}: {e}")
-                results[grado] = None
+        workers = config.reports.workers if workers is None else workers
+        grados = grados or config.reports.grados
+        if workers > 1 and len(grados) > 1:
+            results = self._generate_parallel(grados, year_start, year_end, min(workers, len(grados)))
+        else:
+            results = {}
+            for grado in grados:
+                try:
+                    output_file = self.generate_report_for_grado(grado, year_start, year_end)
+                    results[grado] = output_file
+                except Exception as e:
+                    logger.error(f"Error generando reporte para {grado}: {e}")
+                    results[grado] = None
 
         successful = sum(1 for v in results.values() if v is not None)
         logger.info(f"Generación completada: {successful}/{len(results)} reportes exitosos")
 
         return results
 
+    def _generate_parallel(
+        self,
+        grados: List[str],
+        year_start: Optional[int],
+        year_end: Optional[int],
+        workers: int
+    ) -> Dict[str, Path]:
+        """
+        Extrae una vez y transforma/escribe cada grado en un proceso trabajador
+
+        Los DataFrames extraídos se publican en data/shared/ como columnas .npy
+        (SharedFrames) y cada trabajador los adjunta con np.memmap: no se
+        serializan las filas y la memoria no se multiplica por el número de
+        procesos. Hoja1 es igual para todos los grados y se extrae una sola vez.
+
+        Args:
+            grados: Grados a generar
+            year_start: Año inicial
+            year_end: Año final
+            workers: Número de procesos
+
+        Returns:
+            Diccionario con los paths de archivos generados (None si falló)
+        """
+        results: Dict[str, Optional[Path]] = {}
+        shared = SharedFrames()
+
+        try:
+            with track_stage("extraccion compartida"):
+                extractor = DataExtractor(year_start, year_end)
+                shared.publish('todos', extractor.extract_todos_datos())
+                shared.publish('periodos', extractor.extract_periodos())
+                for grado in grados:
+                    try:
+                        data = extractor.extract_all_for_grado(grado, include_todos=False)
+                    except Exception as e:
+                        logger.error(f"Error generando reporte para {grado}: {e}")
+                        results[grado] = None
+                        continue
+                    for name in GRADO_FRAMES:
+                        shared.publish(f"{grado}/{name}", data[name])
+
+            pending = [grado for grado in grados if grado not in results]
+            logger.info(f"Generando {len(pending)} reportes en {workers} procesos desde {shared.directory}")
+
+            # spawn: los trabajadores no heredan las conexiones del pool de PostgreSQL
+            context = multiprocessing.get_context('spawn')
+            with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+                futures = {
+                    pool.submit(
+                        _generate_from_shared, self.output_dir, shared.directory, grado, config.reports.stream_hoja1
+                    ): grado
+                    for grado in pending
+                }
+                for future in as_completed(futures):
+                    grado = futures[future]
+                    try:
+                        results[grado], values = future.result()
+                        merge_metrics(values)
+                    except Exception as e:
+                        logger.error(f"Error generando reporte para {grado}: {e}")
+                        results[grado] = None
+
+        except Exception as e:
+            logger.error(f"Error en la extracción compartida: {e}")
+            for grado in grados:
+                results.setdefault(grado, None)
+
+        finally:
+            shared.cleanup()
+
+        return {grado: results.get(grado) for grado in grados}
+
+
+# DataFrames por grado publicados para los trabajadores (Hoja1 y periodos son comunes)
+GRADO_FRAMES = ('nuevo_ingreso', 'reinscritos', 'estatus')
+
+
+def _generate_from_shared(
+    output_dir: Path,
+    directory: Path,
+    grado: str,
+    stream_hoja1: bool
+) -> Tuple[Path, Dict[str, Dict[str, float]]]:
+    """
+    Genera el reporte de un grado en un proceso trabajador desde DataFrames compartidos
+
+    Returns:
+        Tupla (path del archivo, métricas del trabajador para merge_metrics)
+    """
+    shared = SharedFrames(directory)
+    data = {name: shared.attach(f"{grado}/{name}") for name in GRADO_FRAMES}
+    data['periodos'] = shared.attach('periodos')
+    todos = shared.attach('todos')
+
+    with collect_metrics() as run:
+        if not stream_hoja1:
+            data['todos'] = todos
+        output_file = ExcelGenerator(output_dir)._build_report(
+            grado,
+            data,
+            (lambda: iter_frame_rows(todos)) if stream_hoja1 else None,
+            None,
+            lambda stage, fraction: None
+        )
+
+    return output_file, run.values
+
 
 def test_generation():
     """Función de prueba para el generador"""
@@ -2,37 +2,254 @@
 Módulo de extracción de datos desde PostgreSQL
 """
 import pandas as pd
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Generator, List, Tuple
 from datetime import datetime
 
-from src.backend.db import db, QueryBuilder
+from src.backend.db import db, replica, QueryBuilder
+from src.backend.db.cancel import QueryCancelledError, QueryTimeoutError, is_cancelled
+from src.backend.processors.cache import result_cache
+from src.backend.processors.normalized import build_enrollment, build_todos, todos_rows
+from src.backend.monitoring.metrics import get_active_run, track_stage, record_metric, record_plan, QUERY_ROWS
 from src.utils.config import config
 from src.utils.logger import get_logger
+from src.utils.singleflight import SingleFlight
 
 
 logger = get_logger(__name__, config.paths.logs_dir)
 
 
+# Coalescencia de queries idénticas en curso (una sola ejecución por query)
+_query_flight = SingleFlight()
+
+# Queries cuyas filas pertenecen cada una a un periodo: se cachean por año y el
+# resultado de un rango se compone de sus años. Valor: (columna de periodo, ascendente).
+# Las queries que dependen del estatus o la titulación (resumen, periodo_programa,
+# estatus) cambian aun para cohortes cerradas y se cachean por rango completo.
+YEAR_PARTITIONED_QUERIES = {
+    'nuevo_ingreso': ('periodo_id', True),
+    'reinscritos': ('periodo_id', True),
+    'hechos_inscripcion': ('periodo_id', True),
+    'hechos_asistencia': ('periodo_id', False),
+    'todos': ('Periodo.de.consulta', False),
+    'periodos': (None, True),
+}
+
+
 class DataExtractor:
     """Extractor de datos para reportes de trayectoria"""
 
-    def __init__(self, year_start: Optional[int] = None, year_end: Optional[int] = None):
+    def __init__(
+        self,
+        year_start: Optional[int] = None,
+        year_end: Optional[int] = None,
+        use_cache: Optional[bool] = None,
+        refresh_cache: bool = False,
+        capture_plans: Optional[bool] = None,
+        backend: Optional[str] = None,
+        normalized: Optional[bool] = None
+    ):
         """
         Inicializa el extractor
 
         Args:
             year_start: Año inicial (por defecto desde config)
             year_end: Año final (por defecto desde config)
+            use_cache: Si usar el cache de resultados (por defecto config.cache.enabled)
+            refresh_cache: Si True, ignora resultados cacheados y los reemplaza
+            capture_plans: Si registrar EXPLAIN (ANALYZE, BUFFERS) de cada query en
+                la ejecución activa (por defecto config.monitoring.capture_plans)
+            backend: Origen de los datos: 'postgres' o 'replica' (réplica local DuckDB;
+                por defecto config.replica.backend)
+            normalized: Si extraer hechos con llaves y dimensiones en lugar de filas
+                anchas (por defecto config.reports.normalized_extraction)
         """
         self.year_start = year_start or config.reports.year_start
         self.year_end = year_end or config.reports.year_end
+        self.use_cache = config.cache.enabled if use_cache is None else use_cache
+        self.refresh_cache = refresh_cache
+        self.capture_plans = config.monitoring.capture_plans if capture_plans is None else capture_plans
+        self.backend = backend or config.replica.backend
+        if self.backend not in ('postgres', 'replica'):
+            raise ValueError(f"Backend de datos no válido: {self.backend}")
+        # La réplica expone la misma interfaz de lectura que la conexión a PostgreSQL
+        self.source = replica if self.backend == 'replica' else db
+        self.normalized = config.reports.normalized_extraction if normalized is None else normalized
+        self._enrollment: Dict[str, Tuple[pd.DataFrame, pd.DataFrame]] = {}
+        self._dimensiones: Optional[Tuple[pd.DataFrame, pd.DataFrame]] = None
         self.query_builder = QueryBuilder(self.year_start, self.year_end)
-        logger.info(f"DataExtractor inicializado para años {self.year_start}-{self.year_end}")
+        logger.info(
+            f"DataExtractor inicializado para años {self.year_start}-{self.year_end} (backend {self.backend})"
+        )
 
-    def _query_to_dataframe(self, query: str, query_name: str = "") -> pd.DataFrame:
+    def _extract(self, query_type: str, query_name: str, grado: Optional[str] = None) -> pd.DataFrame:
+        """
+        Ejecuta una query del QueryBuilder, por años si es particionable
+
+        Con cache.year_partitions cada año del rango se cachea por separado:
+        un rango nuevo reutiliza los años ya cacheados y solo consulta los
+        faltantes. Los años cerrados no expiran (o usan cache.closed_ttl_hours).
+
+        Args:
+            query_type: Tipo de query del QueryBuilder
+            query_name: Nombre descriptivo de la query (para logs)
+            grado: Grado académico, si la query lo requiere
+
+        Returns:
+            DataFrame con los resultados del rango completo
+        """
+        partition = YEAR_PARTITIONED_QUERIES.get(query_type)
+        if partition is None or not self.use_cache or not config.cache.year_partitions:
+            query = self.query_builder.get_query(query_type, grado=grado)
+            return self._query_to_dataframe(query, query_name)
+
+        frames = []
+        for year in range(self.year_start, self.year_end + 1):
+            query = QueryBuilder(year, year).get_query(query_type, grado=grado)
+            df = self._query_to_dataframe(query, f"{query_name} {year}", ttl_seconds=self._year_ttl(year))
+            if not df.empty:
+                frames.append(df)
+
+        return self._compose_years(frames, *partition)
+
+    @staticmethod
+    def _year_ttl(year: int) -> Optional[float]:
+        """
+        Vigencia en cache del resultado de un año
+
+        Returns:
+            None (TTL por defecto) para años abiertos; para años cerrados
+            cache.closed_ttl_hours, o infinito si es 0
+        """
+        if year > datetime.now().year - config.cache.open_years:
+            return None
+        if config.cache.closed_ttl_hours > 0:
+            return config.cache.closed_ttl_hours * 3600
+        return float('inf')
+
+    @staticmethod
+    def _compose_years(frames: List[pd.DataFrame], periodo_column: Optional[str], ascending: bool) -> pd.DataFrame:
+        """
+        Une los resultados por año en el orden de la query del rango completo
+
+        Args:
+            frames: Resultados no vacíos, en orden cronológico
+            periodo_column: Columna de periodo por la que ordena la query (None: por año)
+            ascending: Si la query ordena los periodos de forma ascendente
+
+        Returns:
+            DataFrame equivalente al de la query del rango
+        """
+        if not frames:
+            return pd.DataFrame()
+        if len(frames) == 1:
+            return frames[0]
+
+        df = pd.concat(frames if ascending else frames[::-1], ignore_index=True)
+        if periodo_column is not None:
+            periodos = df[periodo_column]
+            ordered = periodos.is_monotonic_increasing if ascending else periodos.is_monotonic_decreasing
+            if not ordered:
+                # Estable: dentro de un periodo se conserva el orden de su query
+                df = df.sort_values(periodo_column, ascending=ascending, kind='stable', ignore_index=True)
+        return df
+
+    def _query_to_dataframe(
+        self,
+        query: str,
+        query_name: str = "",
+        ttl_seconds: Optional[float] = None
+    ) -> pd.DataFrame:
         """
         Ejecuta una query y retorna un DataFrame
 
+        Args:
+            query: Query SQL a ejecutar
+            query_name: Nombre descriptivo de la query (para logs)
+            ttl_seconds: Vigencia del resultado en cache (por defecto la del cache)
+
+        Returns:
+            DataFrame con los resultados
+        """
+        self._capture_plan(query, query_name)
+
+        key = (query, self.backend, self.use_cache, self.refresh_cache)
+        with track_stage(f"query:{query_name}"):
+            try:
+                df, shared = _query_flight.do(key, lambda: self._fetch_dataframe(query, query_name, ttl_seconds))
+            except QueryCancelledError:
+                if is_cancelled():
+                    raise
+                # Se canceló la ejecución de otra solicitud que compartíamos: se repite con la propia
+                logger.info(f"Query '{query_name}' compartida cancelada por otra solicitud; se ejecuta de nuevo")
+                df, shared = _query_flight.do(key, lambda: self._fetch_dataframe(query, query_name, ttl_seconds))
+            if shared:
+                logger.info(f"Query '{query_name}' compartida con una ejecución en curso: {len(df)} filas")
+
+        record_metric(QUERY_ROWS, query_name, len(df))
+
+        # Un resultado compartido (single-flight) o guardado en el cache se entrega como copia;
+        # uno propio se entrega tal cual para no duplicar la memoria de las extracciones grandes
+        return df.copy() if shared or self.use_cache else df
+
+    def _capture_plan(self, query: str, query_name: str):
+        """
+        Registra el plan de ejecución de la query en la ejecución activa (modo diagnóstico)
+
+        Se captura aunque el resultado venga del cache: el plan refleja el estado
+        actual de la base de datos. Un error al obtener el plan no interrumpe el reporte.
+
+        Args:
+            query: Query SQL
+            query_name: Nombre descriptivo de la query
+        """
+        run = get_active_run()
+        if not self.capture_plans or self.backend != 'postgres' or run is None or query_name in run.plans:
+            return
+
+        try:
+            with track_stage(f"explain:{query_name}"):
+                plan = db.explain_query(query)
+            record_plan(query_name, plan)
+            logger.info(f"Plan de ejecución capturado: {query_name}")
+        except Exception as e:
+            logger.warning(f"No se pudo capturar el plan de '{query_name}': {e}")
+
+    def _fetch_dataframe(
+        self,
+        query: str,
+        query_name: str = "",
+        ttl_seconds: Optional[float] = None
+    ) -> pd.DataFrame:
+        """
+        Obtiene el resultado de una query desde el cache o la base de datos
+
+        Args:
+            query: Query SQL a ejecutar
+            query_name: Nombre descriptivo de la query (para logs)
+            ttl_seconds: Vigencia del resultado en cache (por defecto la del cache)
+
+        Returns:
+            DataFrame con los resultados (compartido; no modificar)
+        """
+        if not self.use_cache:
+            return self._execute_to_dataframe(query, query_name)
+
+        # Las llaves de PostgreSQL conservan su formato; la réplica tiene las suyas
+        parts = ('query', query) if self.backend == 'postgres' else ('query', query, self.backend)
+        key = result_cache.make_key(*parts)
+        df = None if self.refresh_cache else result_cache.get(key, ttl_seconds)
+        if df is not None:
+            logger.info(f"Query '{query_name}' servida desde cache: {len(df)} filas")
+            return df
+
+        df = self._execute_to_dataframe(query, query_name)
+        result_cache.set(key, df)
+        return df
+
+    def _execute_to_dataframe(self, query: str, query_name: str = "") -> pd.DataFrame:
+        """
+        Ejecuta una query contra la base de datos y retorna un DataFrame
+
         Args:
             query: Query SQL a ejecutar
             query_name: Nombre descriptivo de la query (para logs)
@@ -44,20 +261,29 @@ class DataExtractor:
             logger.info(f"Ejecutando query: {query_name}")
             start_time = datetime.now()
 
-            results = db.execute_query(query, fetch='all')
+            if self.backend == 'replica':
+                # Resultado columnar directo, sin construir diccionarios por fila
+                df = replica.query_dataframe(query)
+                if df.empty:
+                    logger.warning(f"Query '{query_name}' no retornó resultados")
+                    return pd.DataFrame()
+            else:
+                results = db.execute_query(query, fetch='all')
 
-            if not results:
-                logger.warning(f"Query '{query_name}' no retornó resultados")
-                return pd.DataFrame()
+                if not results:
+                    logger.warning(f"Query '{query_name}' no retornó resultados")
+                    return pd.DataFrame()
 
-            # Convertir a DataFrame
-            df = pd.DataFrame(results)
+                # Convertir a DataFrame
+                df = pd.DataFrame(results)
 
             elapsed = (datetime.now() - start_time).total_seconds()
             logger.info(f"Query '{query_name}' completada: {len(df)} filas en {elapsed:.2f}s")
 
             return df
 
+        except (QueryCancelledError, QueryTimeoutError):
+            raise
         except Exception as e:
             logger.error(f"Error ejecutando query '{query_name}': {e}")
             raise
@@ -95,8 +321,10 @@ class DataExtractor:
         Returns:
             DataFrame con estudiantes de nuevo ingreso
         """
-        query = self.query_builder.get_query('nuevo_ingreso', grado=grado)
-        return self._query_to_dataframe(query, f"Nuevo Ingreso {grado}")
+        if self.normalized:
+            return self._normalized_enrollment(grado)[0].copy()
+
+        return self._extract('nuevo_ingreso', f"Nuevo Ingreso {grado}", grado)
 
     def extract_reinscritos(self, grado: str) -> pd.DataFrame:
         """
@@ -108,8 +336,67 @@ class DataExtractor:
         Returns:
             DataFrame con estudiantes reinscritos
         """
-        query = self.query_builder.get_query('reinscritos', grado=grado)
-        return self._query_to_dataframe(query, f"Reinscritos {grado}")
+        if self.normalized:
+            return self._normalized_enrollment(grado)[1].copy()
+
+        return self._extract('reinscritos', f"Reinscritos {grado}", grado)
+
+    def extract_dimensiones(self) -> Tuple[pd.DataFrame, pd.DataFrame]:
+        """
+        Extrae las dimensiones de estudiantes y programas
+
+        Se consultan una vez por extractor y se reutilizan en todos los grados
+        y en Hoja1, aun con el cache de resultados desactivado.
+
+        Returns:
+            Tupla (estudiantes, programas), compartida por las extracciones del extractor (no modificar)
+        """
+        if self._dimensiones is None:
+            self._dimensiones = (
+                self._query_to_dataframe(self.query_builder.get_query('dim_estudiantes'), "Dim Estudiantes"),
+                self._query_to_dataframe(self.query_builder.get_query('dim_programas'), "Dim Programas")
+            )
+        return self._dimensiones
+
+    def _normalized_enrollment(self, grado: str) -> Tuple[pd.DataFrame, pd.DataFrame]:
+        """
+        NI y Reinscritos reconstruidos desde hechos de inscripción y dimensiones
+
+        Los hechos traen solo llaves (una query para NI y Reinscritos); el texto
+        repetido por fila se obtiene de las dimensiones como columnas categóricas.
+
+        Args:
+            grado: Grado académico (LL, EL, ML)
+
+        Returns:
+            Tupla (df_nuevo_ingreso, df_reinscritos)
+        """
+        if grado not in self._enrollment:
+            hechos = self._extract('hechos_inscripcion', f"Hechos Inscripción {grado}", grado)
+            self._enrollment[grado] = build_enrollment(hechos, *self.extract_dimensiones())
+        return self._enrollment[grado]
+
+    def extract_estatus(self, grado: str) -> pd.DataFrame:
+        """
+        Extrae programas, estatus académico y titulación por estudiante
+
+        Args:
+            grado: Grado académico (LL, EL, ML)
+
+        Returns:
+            DataFrame con una fila por (estudiante, programa)
+        """
+        query = self.query_builder.get_query('estatus', grado=grado)
+        return self._query_to_dataframe(query, f"Estatus {grado}")
+
+    def extract_periodos(self) -> pd.DataFrame:
+        """
+        Extrae el calendario de periodos del rango
+
+        Returns:
+            DataFrame con periodo_id y year en orden cronológico
+        """
+        return self._extract('periodos', "Periodos")
 
     def extract_todos_datos(self) -> pd.DataFrame:
         """
@@ -118,15 +405,72 @@ class DataExtractor:
         Returns:
             DataFrame con todos los datos históricos
         """
+        if self.normalized:
+            hechos = self._extract('hechos_asistencia', "Hechos Asistencia")
+            return build_todos(hechos, *self.extract_dimensiones())
+
+        return self._extract('todos', "Todos los Datos")
+
+    def iter_todos_datos(
+        self,
+        batch_size: Optional[int] = None
+    ) -> Generator[Tuple[List[str], List[tuple]], None, None]:
+        """
+        Extrae los datos consolidados en lotes sin materializar el resultado completo
+
+        Args:
+            batch_size: Filas por lote (por defecto config.reports.stream_batch_size)
+
+        Yields:
+            Tupla (columnas, filas) por lote
+        """
+        batch_size = batch_size or config.reports.stream_batch_size
+        if self.normalized:
+            yield from self._iter_todos_normalized(batch_size)
+            return
+
         query = self.query_builder.get_query('todos')
-        return self._query_to_dataframe(query, "Todos los Datos")
 
-    def extract_all_for_grado(self, grado: str) -> Dict[str, pd.DataFrame]:
+        self._capture_plan(query, "Todos los Datos")
+
+        logger.info(f"Ejecutando query en streaming: Todos los Datos (lotes de {batch_size})")
+        start_time = datetime.now()
+        total_rows = 0
+
+        for columns, rows in self.source.stream_query(query, batch_size=batch_size):
+            total_rows += len(rows)
+            yield columns, rows
+
+        elapsed = (datetime.now() - start_time).total_seconds()
+        logger.info(f"Query 'Todos los Datos' completada en streaming: {total_rows} filas en {elapsed:.2f}s")
+        record_metric(QUERY_ROWS, "Todos los Datos", total_rows)
+
+    def _iter_todos_normalized(self, batch_size: int) -> Generator[Tuple[List[str], List[tuple]], None, None]:
+        """Lotes de Hoja1 a partir de hechos de asistencia en streaming y dimensiones en memoria"""
+        estudiantes, programas = self.extract_dimensiones()
+        query = self.query_builder.get_query('hechos_asistencia')
+        self._capture_plan(query, "Hechos Asistencia")
+
+        logger.info(f"Ejecutando query en streaming: Hechos Asistencia (lotes de {batch_size})")
+        start_time = datetime.now()
+        total_rows = 0
+
+        for columns, rows in self.source.stream_query(query, batch_size=batch_size):
+            total_rows += len(rows)
+            yield todos_rows(columns, rows, estudiantes, programas)
+
+        elapsed = (datetime.now() - start_time).total_seconds()
+        logger.info(f"Query 'Hechos Asistencia' completada en streaming: {total_rows} filas en {elapsed:.2f}s")
+        record_metric(QUERY_ROWS, "Hechos Asistencia", total_rows)
+
+    def extract_all_for_grado(self, grado: str, include_todos: bool = True) -> Dict[str, pd.DataFrame]:
         """
         Extrae todos los datos necesarios para un grado académico
 
         Args:
             grado: Grado académico (LL, EL, ML)
+            include_todos: Si incluir los datos consolidados (False cuando
+                Hoja1 se escribe en streaming con iter_todos_datos)
 
         Returns:
             Diccionario con todos los DataFrames necesarios
@@ -138,8 +482,11 @@ class DataExtractor:
                 'resumen': self.extract_resumen_grado(grado),
                 'nuevo_ingreso': self.extract_nuevo_ingreso(grado),
                 'reinscritos': self.extract_reinscritos(grado),
-                'todos': self.extract_todos_datos()
+                'estatus': self.extract_estatus(grado),
+                'periodos': self.extract_periodos()
             }
+            if include_todos:
+                data['todos'] = self.extract_todos_datos()
 
             # Log de resumen
             total_rows = sum(len(df) for df in data.values())
@@ -0,0 +1,276 @@
+"""
+Módulo de almacén de hechos de inscripción en columnas enteras mapeadas en memoria
+"""
+import json
+import shutil
+import uuid
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+from src.backend.processors.periodos import PeriodoIndex
+from src.utils.config import config
+from src.utils.logger import get_logger
+
+
+logger = get_logger(__name__, config.paths.logs_dir)
+
+
+# Versión del formato: un almacén con otra versión se reconstruye
+FACTS_VERSION = 1
+
+# Columna -> tipo de ancho fijo
+FACT_COLUMNS = {
+    'periodo': np.int16,     # Ordinal de calendario del periodo inscrito
+    'estudiante': np.int32,  # Código de estudiante (estudiante_labels)
+    'programa': np.int16,    # Código de programa (programa_labels)
+    'ingreso': np.int16,     # Ordinal del primer periodo NI del estudiante (-1 sin ingreso en el rango)
+    'es_ni': np.bool_,       # Registro de nuevo ingreso
+    'estatus': np.int8,      # Código de estatus académico del (estudiante, programa) (-1 sin estatus)
+    'titulado': np.bool_     # Titulado en el programa
+}
+
+# Atributos de programa guardados como etiquetas alineadas con programa_labels
+PROGRAMA_ATTRIBUTES = ('campus', 'escuela')
+
+META_FILE = "meta.json"
+
+
+def _labels(values: Iterable) -> np.ndarray:
+    """Etiquetas como texto de ancho fijo (mapeables sin pickle)"""
+    return np.asarray([str(v) for v in values], dtype=str)
+
+
+def _check_width(n: int, dtype, name: str):
+    if n > np.iinfo(dtype).max:
+        raise ValueError(f"El almacén de hechos no admite {n} valores de {name} ({np.dtype(dtype).name})")
+
+
+class FactStore:
+    """
+    Hechos de inscripción de un grado como columnas NumPy de ancho fijo
+
+    Se escribe una vez después de la extracción (una fila por registro de NI o
+    Reinscritos) y se abre con np.memmap: reabrirlo en otro proceso o en una
+    nueva ejecución del dashboard no lee ni decodifica los datos, y las páginas
+    se comparten por el cache del sistema operativo.
+    """
+
+    def __init__(self, directory: Path, columns: Dict[str, np.ndarray], labels: Dict[str, np.ndarray], meta: Dict):
+        self.directory = directory
+        self.columns = columns
+        self.labels = labels
+        self.meta = meta
+
+    def __len__(self) -> int:
+        return len(self.columns['periodo'])
+
+    @classmethod
+    def write(
+        cls,
+        directory: Path,
+        df_nuevo_ingreso: pd.DataFrame,
+        df_reinscritos: pd.DataFrame,
+        df_estatus: Optional[pd.DataFrame] = None,
+        periodo_index: Optional[PeriodoIndex] = None,
+        **meta: Any
+    ) -> Path:
+        """
+        Codifica las extracciones de un grado y las guarda en el directorio
+
+        El directorio se reemplaza completo al final, de modo que un lector
+        nunca ve un almacén a medio escribir.
+
+        Args:
+            directory: Directorio del almacén
+            df_nuevo_ingreso: Extracción de NI
+            df_reinscritos: Extracción de Reinscritos
+            df_estatus: Extracción de estatus (estatus académico y titulación por programa)
+            periodo_index: Calendario de periodos (sin él, los periodos observados son consecutivos)
+            **meta: Datos descriptivos (grado, años, backend)
+
+        Returns:
+            Directorio del almacén
+        """
+        frames = [df for df in (df_nuevo_ingreso, df_reinscritos) if not df.empty]
+        columns = ['estudiante_id', 'periodo_id', 'programa_id', 'tipo'] + list(PROGRAMA_ATTRIBUTES)
+        if frames:
+            df = pd.concat([f[[c for c in columns if c in f.columns]] for f in frames], ignore_index=True)
+        else:
+            df = pd.DataFrame(columns=columns)
+        for column in PROGRAMA_ATTRIBUTES:
+            if column not in df.columns:
+                df[column] = None
+
+        periodos = df['periodo_id'].astype(str).to_numpy()
+        calendar = (periodo_index or PeriodoIndex(np.sort(np.unique(periodos)))).covering(np.unique(periodos))
+        periodo = calendar.ordinal(periodos)
+
+        student, student_labels = pd.factorize(df['estudiante_id'].astype(str))
+        programa, programa_labels = pd.factorize(df['programa_id'].astype(str), sort=True)
+        es_ni = df['tipo'].astype(str).eq('NI').to_numpy()
+
+        # Ingreso: primer periodo NI de cada estudiante
+        first_ni = np.full(len(student_labels), np.iinfo(np.int64).max, dtype=np.int64)
+        np.minimum.at(first_ni, student[es_ni], periodo[es_ni])
+        ingreso = np.where(first_ni < np.iinfo(np.int64).max, first_ni, -1)[student]
+
+        estatus = np.full(len(df), -1, dtype=np.int64)
+        titulado = np.zeros(len(df), dtype=bool)
+        estatus_labels = np.array([], dtype=str)
+        if df_estatus is not None and not df_estatus.empty:
+            # Un estatus por (estudiante, programa): el del ingreso más reciente
+            por_programa = df_estatus.drop_duplicates(['estudiante_id', 'programa_id'], keep='last')
+            keys = pd.MultiIndex.from_arrays([
+                por_programa['estudiante_id'].astype(str), por_programa['programa_id'].astype(str)
+            ])
+            pos = keys.get_indexer(pd.MultiIndex.from_arrays([
+                df['estudiante_id'].astype(str), df['programa_id'].astype(str)
+            ]))
+            found = pos >= 0
+
+            estatus_codes, estatus_labels = pd.factorize(por_programa['estatus_academico_id'].astype(str), sort=True)
+            estatus[found] = estatus_codes[pos[found]]
+            if 'titulado' in df_estatus.columns:
+                titulos = df_estatus['titulado'].fillna(False).astype(bool).groupby([
+                    df_estatus['estudiante_id'].astype(str), df_estatus['programa_id'].astype(str)
+                ]).max()
+                titulado[found] = titulos.reindex(keys).to_numpy(dtype=bool)[pos[found]]
+
+        _check_width(len(calendar), FACT_COLUMNS['periodo'], 'periodo')
+        _check_width(len(student_labels), FACT_COLUMNS['estudiante'], 'estudiante')
+        _check_width(len(programa_labels), FACT_COLUMNS['programa'], 'programa')
+        _check_width(len(estatus_labels), FACT_COLUMNS['estatus'], 'estatus')
+
+        arrays = {
+            'periodo': periodo, 'estudiante': student, 'programa': programa, 'ingreso': ingreso,
+            'es_ni': es_ni, 'estatus': estatus, 'titulado': titulado
+        }
+
+        # Atributos de programa: valor de la primera fila de cada programa
+        _, first_row = np.unique(programa, return_index=True)
+        labels = {
+            'periodo': _labels(calendar.labels),
+            'estudiante': _labels(student_labels),
+            'programa': _labels(programa_labels),
+            'estatus': _labels(estatus_labels),
+            **{f"programa_{attr}": _labels(df[attr].to_numpy()[first_row]) for attr in PROGRAMA_ATTRIBUTES}
+        }
+
+        tmp = directory.with_name(f"{directory.name}.tmp{uuid.uuid4().hex[:8]}")
+        tmp.mkdir(parents=True)
+        for name, dtype in FACT_COLUMNS.items():
+            np.save(tmp / f"{name}.npy", np.ascontiguousarray(arrays[name], dtype=dtype), allow_pickle=False)
+        for name, values in labels.items():
+            np.save(tmp / f"{name}_labels.npy", values, allow_pickle=False)
+        with open(tmp / META_FILE, 'w') as f:
+            json.dump({
+                'version': FACTS_VERSION,
+                'rows': len(df),
+                'created_at': datetime.now().isoformat(timespec='seconds'),
+                **meta
+            }, f)
+
+        if directory.exists():
+            old = directory.with_name(f"{directory.name}.old{uuid.uuid4().hex[:8]}")
+            directory.rename(old)
+            tmp.rename(directory)
+            shutil.rmtree(old, ignore_errors=True)
+        else:
+            tmp.rename(directory)
+
+        logger.info(f"Almacén de hechos escrito: {directory} ({len(df)} filas)")
+        return directory
+
+    @classmethod
+    def open(cls, directory: Path) -> 'FactStore':
+        """
+        Abre un almacén en solo lectura con np.memmap
+
+        Args:
+            directory: Directorio del almacén
+
+        Returns:
+            Almacén con columnas respaldadas por los archivos
+        """
+        with open(directory / META_FILE) as f:
+            meta = json.load(f)
+
+        columns = {name: np.load(directory / f"{name}.npy", mmap_mode='r') for name in FACT_COLUMNS}
+        labels = {
+            path.name[:-len("_labels.npy")]: np.load(path, mmap_mode='r')
+            for path in directory.glob("*_labels.npy")
+        }
+        return cls(directory, columns, labels, meta)
+
+    @staticmethod
+    def is_fresh(directory: Path, max_age_seconds: float) -> bool:
+        """
+        Si el almacén existe, tiene el formato actual y no ha expirado
+
+        Args:
+            directory: Directorio del almacén
+            max_age_seconds: Antigüedad máxima
+
+        Returns:
+            True si se puede abrir sin reconstruirlo
+        """
+        meta_file = directory / META_FILE
+        if not meta_file.exists():
+            return False
+        try:
+            with open(meta_file) as f:
+                version = json.load(f).get('version')
+        except (OSError, ValueError):
+            return False
+        age = datetime.now().timestamp() - meta_file.stat().st_mtime
+        return version == FACTS_VERSION and age < max_age_seconds
+
+    def mask(self, filters: Dict[str, Union[object, Iterable]]) -> np.ndarray:
+        """
+        Filas cuyo programa cumple los filtros
+
+        Args:
+            filters: 'programa', 'campus' o 'escuela' -> valor o lista de valores
+
+        Returns:
+            Máscara booleana por fila
+        """
+        allowed = np.ones(len(self.labels['programa']), dtype=bool)
+        for dimension, wanted in filters.items():
+            key = 'programa' if dimension == 'programa' else f"programa_{dimension}"
+            if key not in self.labels:
+                raise ValueError(f"Filtro no válido para el almacén de hechos: {dimension}")
+            if isinstance(wanted, (str, bytes)) or not isinstance(wanted, Iterable):
+                wanted = [wanted]
+            allowed &= np.isin(self.labels[key], _labels(wanted))
+        return allowed[self.columns['programa']]
+
+    def cohort_codes(self, rows: Optional[np.ndarray] = None) -> Dict[str, Any]:
+        """
+        Arreglos para TrayectoriaTransformer._cohort_matrices
+
+        Los periodos ya son ordinales de calendario y el ingreso de cada fila
+        está precalculado, por lo que no hay que factorizar etiquetas.
+
+        Args:
+            rows: Máscara booleana de filas (por defecto todas)
+
+        Returns:
+            Diccionario con 'student', 'n_students', 'periodo', 'periodo_labels',
+            'ordinal', 'es_ni' y 'generacion'
+        """
+        columns = self.columns if rows is None else {name: array[rows] for name, array in self.columns.items()}
+        periodo_labels = np.asarray(self.labels['periodo'])
+        return {
+            'student': columns['estudiante'].astype(np.int64),
+            'n_students': len(self.labels['estudiante']),
+            'periodo': columns['periodo'].astype(np.int64),
+            'periodo_labels': periodo_labels,
+            'ordinal': np.arange(len(periodo_labels), dtype=np.int64),
+            'es_ni': np.asarray(columns['es_ni']),
+            'generacion': columns['ingreso'].astype(np.int64)
+        }
@@ -0,0 +1,303 @@
+"""
+Módulo de indicadores FIMPES calculados a partir de la secuencia de periodos de cada estudiante
+"""
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from src.backend.processors.periodos import PeriodoIndex, factorize_periodos, group_values, periodo_ordinals
+from src.utils.config import config
+from src.utils.logger import get_logger
+
+
+logger = get_logger(__name__, config.paths.logs_dir)
+
+
+# Columnas calculadas por el motor (se combinan con el cuadro por cohorte)
+INDICATOR_COLUMNS = [
+    'Alumnos de Nuevo Ingreso',
+    'Abandono',
+    'Activo ',
+    'Cambios de carrera',
+    'Egresados',
+    'Titulados'
+]
+
+
+class FimpesEngine:
+    """
+    Motor vectorizado de indicadores FIMPES por cohorte
+
+    Trabaja sobre arreglos enteros de todos los estudiantes a la vez:
+
+    - Cohorte: primer periodo de nuevo ingreso del estudiante
+    - Abandono: sin estatus de egreso y sin inscripción en los últimos
+      ``abandono_periodos`` periodos consecutivos del rango (contados en el
+      calendario de periodos)
+    - Activo: sin estatus de egreso e inscrito en el último periodo con datos
+    - Cambios de carrera: más de un programa del grado en
+      estudiante_programa o en las inscripciones. Al agrupar por programa
+      se cuenta sobre todos los programas del estudiante en el grado y el
+      cambio se asigna al programa que dejó (el de su nuevo ingreso)
+    - Egresados / Titulados: estatus_academico_id de egreso / registro en
+      core.titulado para algún programa del grado
+    """
+
+    def __init__(
+        self,
+        abandono_periodos: Optional[int] = None,
+        estatus_egresado: Optional[str] = None,
+        periodo_index: Optional[PeriodoIndex] = None
+    ):
+        """
+        Inicializa el motor
+
+        Args:
+            abandono_periodos: Periodos consecutivos sin inscripción para abandono
+                (por defecto config.fimpes.abandono_periodos)
+            estatus_egresado: Estatus académico de egreso (por defecto config.fimpes.estatus_egresado)
+            periodo_index: Calendario de periodos (sin él, los periodos observados
+                se consideran consecutivos)
+        """
+        self.abandono_periodos = abandono_periodos or config.fimpes.abandono_periodos
+        self.estatus_egresado = estatus_egresado or config.fimpes.estatus_egresado
+        self.periodo_index = periodo_index
+
+    def compute(
+        self,
+        enrollment: Sequence[pd.DataFrame],
+        df_estatus: Optional[pd.DataFrame] = None,
+        group_by: Optional[str] = None,
+        changes_by: Optional[str] = None
+    ) -> Dict[Optional[str], pd.DataFrame]:
+        """
+        Calcula los indicadores por cohorte
+
+        Args:
+            enrollment: DataFrames de inscripciones (NI y Reinscritos) con
+                estudiante_id, periodo_id, programa_id y tipo
+            df_estatus: Estatus por (estudiante, programa) de extract_estatus;
+                sin él, egresados, titulados y abandono usan solo las inscripciones
+            group_by: Columna de agrupación (p. ej. 'grado'); None para un solo grupo
+            changes_by: Agrupación en la que se cuentan los programas por estudiante
+                para cambios de carrera cuando group_by es más fina (por defecto
+                'grado' si group_by es 'programa_id'; si no, el mismo group_by).
+                El cambio se asigna al grupo del primer nuevo ingreso del estudiante
+
+        Returns:
+            Diccionario grupo -> DataFrame con 'Cohorte' e INDICATOR_COLUMNS
+            (la llave es None cuando no se agrupa)
+        """
+        frames = [df for df in enrollment if not df.empty]
+        if not frames:
+            return {}
+
+        # Códigos enteros por fila
+        student_codes, student_labels = pd.factorize(
+            np.concatenate([df['estudiante_id'].to_numpy() for df in frames])
+        )
+        student_codes = student_codes.astype(np.int64)
+        n_students = len(student_labels)
+
+        periodo, periodo_labels = factorize_periodos(frames)
+        row_ordinal = periodo_ordinals(periodo_labels, self.periodo_index)[periodo]
+        es_ni = np.concatenate([(df['tipo'] == 'NI').to_numpy() for df in frames])
+
+        if group_by:
+            group_codes, group_labels = pd.factorize(
+                np.concatenate([group_values(df, group_by) for df in frames]), sort=True
+            )
+            group_codes = group_codes.astype(np.int64)
+        else:
+            group_codes = np.zeros(len(student_codes), dtype=np.int64)
+            group_labels = np.array([None], dtype=object)
+        n_groups = len(group_labels)
+
+        # Miembro = (grupo, estudiante)
+        members, member_idx = np.unique(group_codes * n_students + student_codes, return_inverse=True)
+        n_members = len(members)
+
+        # Cohorte: primer periodo NI de cada miembro
+        cohort = np.full(n_members, -1, dtype=np.int64)
+        ni_rows = np.flatnonzero(es_ni)
+        ni_members, first = np.unique(member_idx[ni_rows], return_index=True)
+        cohort[ni_members] = periodo[ni_rows[first]]
+
+        # Último periodo inscrito de cada miembro y último periodo con datos de su grupo
+        last = np.full(n_members, -1, dtype=np.int64)
+        np.maximum.at(last, member_idx, row_ordinal)
+        member_group = members // n_students
+        window_end = np.full(n_groups, -1, dtype=np.int64)
+        np.maximum.at(window_end, member_group, last)
+        periodos_sin_inscripcion = window_end[member_group] - last
+
+        # Programas distintos por miembro en las inscripciones
+        programa_codes, _ = pd.factorize(np.concatenate([df['programa_id'].to_numpy() for df in frames]))
+        programas = self._distinct_per_member(member_idx, programa_codes.astype(np.int64), n_members)
+
+        egresado = np.zeros(n_members, dtype=bool)
+        titulado = np.zeros(n_members, dtype=bool)
+
+        if df_estatus is not None and not df_estatus.empty:
+            pos = self._locate_members(df_estatus, student_labels, group_labels, group_by, members, n_students)
+            found = pos >= 0
+
+            estatus = df_estatus['estatus_academico_id'].astype(str).to_numpy()
+            egresado[pos[found & (estatus == self.estatus_egresado)]] = True
+
+            if 'titulado' in df_estatus.columns:
+                titulo = df_estatus['titulado'].fillna(False).astype(bool).to_numpy()
+                titulado[pos[found & titulo]] = True
+
+            estatus_programa, _ = pd.factorize(df_estatus['programa_id'])
+            programas = np.maximum(
+                programas,
+                self._distinct_per_member(pos[found], estatus_programa[found].astype(np.int64), n_members)
+            )
+
+        if changes_by is None and group_by == 'programa_id':
+            changes_by = 'grado'
+        if changes_by and changes_by != group_by:
+            cambios = self._changes_by_origin(
+                frames, df_estatus, changes_by, student_codes, student_labels, es_ni, member_idx, n_members
+            )
+        else:
+            cambios = programas > 1
+
+        no_egresado = ~egresado
+        flags = {
+            'Alumnos de Nuevo Ingreso': np.ones(n_members, dtype=bool),
+            'Abandono': no_egresado & (periodos_sin_inscripcion >= self.abandono_periodos),
+            'Activo ': no_egresado & (periodos_sin_inscripcion == 0),
+            'Cambios de carrera': cambios,
+            'Egresados': egresado,
+            'Titulados': titulado
+        }
+
+        # Agregar por (grupo, cohorte)
+        in_cohort = cohort >= 0
+        n_periodos = len(periodo_labels)
+        cohort_keys, cohort_idx = np.unique(
+            member_group[in_cohort] * n_periodos + cohort[in_cohort], return_inverse=True
+        )
+        totals = {
+            name: np.bincount(cohort_idx, weights=flag[in_cohort], minlength=len(cohort_keys)).astype(int)
+            for name, flag in flags.items()
+        }
+
+        table = pd.DataFrame({
+            '_grupo': cohort_keys // n_periodos,
+            'Cohorte': periodo_labels[cohort_keys % n_periodos].astype(str),
+            **totals
+        })
+
+        result = {
+            group_labels[group]: df.drop(columns='_grupo').reset_index(drop=True)
+            for group, df in table.groupby('_grupo', sort=True)
+        }
+        logger.info(f"Indicadores FIMPES calculados: {n_members} estudiantes, {len(cohort_keys)} cohortes")
+        return result
+
+    def _changes_by_origin(
+        self,
+        frames: List[pd.DataFrame],
+        df_estatus: Optional[pd.DataFrame],
+        changes_by: str,
+        student_codes: np.ndarray,
+        student_labels: np.ndarray,
+        es_ni: np.ndarray,
+        member_idx: np.ndarray,
+        n_members: int
+    ) -> np.ndarray:
+        """
+        Cambios de carrera contados por (changes_by, estudiante) y asignados a un miembro
+
+        Con grupos más finos que changes_by (p. ej. programas), un miembro solo
+        ve su propio programa y nunca tendría más de uno. Los programas se
+        cuentan por estudiante en changes_by y el cambio se marca en el miembro
+        de la primera fila de nuevo ingreso del estudiante (el programa que dejó).
+
+        Returns:
+            Arreglo booleano por miembro
+        """
+        n_students = len(student_labels)
+        scope_codes, scope_labels = pd.factorize(np.concatenate([group_values(df, changes_by) for df in frames]))
+        scopes, scope_idx = np.unique(scope_codes.astype(np.int64) * n_students + student_codes, return_inverse=True)
+        n_scopes = len(scopes)
+
+        programa_id = np.concatenate([df['programa_id'].to_numpy() for df in frames])
+        if df_estatus is not None and not df_estatus.empty:
+            programa_id = np.concatenate([programa_id, df_estatus['programa_id'].to_numpy()])
+        programa_codes = pd.factorize(programa_id)[0].astype(np.int64)
+        n_rows = len(student_codes)
+
+        programas = self._distinct_per_member(scope_idx, programa_codes[:n_rows], n_scopes)
+        if df_estatus is not None and not df_estatus.empty:
+            student = pd.Index(student_labels).get_indexer(df_estatus['estudiante_id'])
+            scope = pd.Index(scope_labels).get_indexer(group_values(df_estatus, changes_by))
+            key = scope.astype(np.int64) * n_students + student
+            pos = np.minimum(np.searchsorted(scopes, key), n_scopes - 1)
+            found = (student >= 0) & (scope >= 0) & (scopes[pos] == key)
+            programas = np.maximum(
+                programas,
+                self._distinct_per_member(pos[found], programa_codes[n_rows:][found], n_scopes)
+            )
+
+        # Primera fila de nuevo ingreso de cada (changes_by, estudiante): mismo criterio que la cohorte
+        ni_rows = np.flatnonzero(es_ni)
+        ni_scopes, first = np.unique(scope_idx[ni_rows], return_index=True)
+        origin = ni_rows[first][programas[ni_scopes] > 1]
+
+        cambios = np.zeros(n_members, dtype=bool)
+        cambios[member_idx[origin]] = True
+        return cambios
+
+    @staticmethod
+    def _distinct_per_member(member_pos: np.ndarray, values: np.ndarray, n_members: int) -> np.ndarray:
+        """Número de valores distintos por miembro"""
+        if not len(member_pos):
+            return np.zeros(n_members, dtype=np.int64)
+        n_values = int(values.max()) + 1
+        pairs = np.unique(member_pos * n_values + values)
+        return np.bincount(pairs // n_values, minlength=n_members)
+
+    @staticmethod
+    def _locate_members(
+        df: pd.DataFrame,
+        student_labels: np.ndarray,
+        group_labels: np.ndarray,
+        group_by: Optional[str],
+        members: np.ndarray,
+        n_students: int
+    ) -> np.ndarray:
+        """Posición del miembro (grupo, estudiante) de cada fila de estatus; -1 si no está inscrito"""
+        student = pd.Index(student_labels).get_indexer(df['estudiante_id'])
+        if group_by:
+            group = pd.Index(group_labels).get_indexer(group_values(df, group_by))
+        else:
+            group = np.zeros(len(df), dtype=np.int64)
+
+        key = group.astype(np.int64) * n_students + student
+        pos = np.searchsorted(members, key)
+        pos = np.minimum(pos, len(members) - 1)
+        valid = (student >= 0) & (group >= 0) & (members[pos] == key)
+        return np.where(valid, pos, -1)
+
+
+def merge_indicators(df_fimpes: pd.DataFrame, indicadores: pd.DataFrame, columns: List[str]) -> pd.DataFrame:
+    """
+    Reemplaza en el cuadro FIMPES las columnas calculadas por el motor
+
+    Args:
+        df_fimpes: Cuadro FIMPES con columna 'Cohorte'
+        indicadores: Resultado de FimpesEngine.compute para el grupo
+        columns: Columnas a reemplazar o agregar
+
+    Returns:
+        Cuadro FIMPES con los indicadores por estudiante
+    """
+    merged = df_fimpes.drop(columns=[c for c in columns if c in df_fimpes.columns])
+    merged = merged.merge(indicadores[['Cohorte'] + columns], on='Cohorte', how='left')
+    merged[columns] = merged[columns].fillna(0).astype(int)
+    return merged
@@ -0,0 +1,154 @@
+"""
+Módulo de listados paginados de estudiantes con orden y filtros del lado del servidor
+"""
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+from src.utils.config import config
+from src.utils.logger import get_logger
+
+
+logger = get_logger(__name__, config.paths.logs_dir)
+
+
+# Filtro -> columna de origen en los DataFrames de NI/Reinscritos (mismos nombres que el cubo)
+FILTER_COLUMNS = {
+    'periodo': 'periodo_id',
+    'programa': 'programa_id',
+    'campus': 'campus'
+}
+
+# Columnas por las que se puede ordenar (cada una con su índice de orden precalculado)
+SORT_COLUMNS = ('periodo_id', 'programa_id', 'campus', 'escuela', 'estudiante_id', 'estudiante_nombre')
+
+
+@dataclass
+class ListingPage:
+    """Página de un listado: solo estas filas se envían al navegador"""
+    rows: pd.DataFrame
+    total: int
+    page: int
+    page_size: int
+
+    @property
+    def pages(self) -> int:
+        return max(1, -(-self.total // self.page_size))
+
+    @property
+    def first_row(self) -> int:
+        """Número (desde 1) de la primera fila de la página; 0 si no hay filas"""
+        return (self.page - 1) * self.page_size + 1 if self.total else 0
+
+    @property
+    def last_row(self) -> int:
+        return min(self.page * self.page_size, self.total)
+
+
+class StudentListing:
+    """
+    Listado de registros de NI o Reinscritos paginado en el servidor
+
+    Al construirlo se codifica cada columna de filtro como enteros y se
+    calcula una vez el índice de orden (argsort estable) de cada columna
+    ordenable. Consultar una página es una máscara sobre los códigos más
+    un recorrido del índice: no se reordena ni se copia el DataFrame, y
+    solo las filas de la página visible se materializan.
+    """
+
+    def __init__(self, df: pd.DataFrame):
+        """
+        Codifica filtros y precalcula los índices de orden
+
+        Args:
+            df: Extracción de NI o Reinscritos
+        """
+        self.df = df.reset_index(drop=True)
+        self.codes: Dict[str, np.ndarray] = {}
+        self.labels: Dict[str, np.ndarray] = {}
+        self.orders: Dict[str, np.ndarray] = {}
+
+        for column in dict.fromkeys(list(FILTER_COLUMNS.values()) + list(SORT_COLUMNS)):
+            if column not in self.df.columns:
+                continue
+            codes, labels = pd.factorize(self.df[column].astype(str), sort=True)
+            self.codes[column] = codes.astype(np.int32)
+            self.labels[column] = np.asarray(labels, dtype=object)
+            if column in SORT_COLUMNS:
+                self.orders[column] = np.argsort(codes, kind='stable')
+
+        logger.debug(f"Listado preparado: {len(self.df)} filas, orden por {', '.join(self.orders)}")
+
+    def __len__(self) -> int:
+        return len(self.df)
+
+    def options(self, dimension: str) -> List[str]:
+        """Valores distintos (ordenados) de un filtro"""
+        return list(self.labels.get(FILTER_COLUMNS[dimension], []))
+
+    def mask(self, filters: Dict[str, Union[object, Iterable]]) -> Optional[np.ndarray]:
+        """
+        Filas que cumplen los filtros
+
+        Args:
+            filters: 'periodo', 'programa' o 'campus' -> valor o lista de valores
+
+        Returns:
+            Máscara booleana por fila, o None si no hay filtros
+        """
+        mask = None
+        for dimension, wanted in filters.items():
+            if dimension not in FILTER_COLUMNS:
+                raise ValueError(f"Filtro no válido para el listado: {dimension}")
+            column = FILTER_COLUMNS[dimension]
+            if isinstance(wanted, (str, bytes)) or not isinstance(wanted, Iterable):
+                wanted = [wanted]
+            allowed = np.isin(self.labels[column], [str(v) for v in wanted])
+            selected = allowed[self.codes[column]]
+            mask = selected if mask is None else mask & selected
+        return mask
+
+    def page(
+        self,
+        filters: Optional[Dict[str, Union[object, Iterable]]] = None,
+        sort_by: Optional[str] = None,
+        descending: bool = False,
+        page: int = 1,
+        page_size: int = 50
+    ) -> ListingPage:
+        """
+        Obtiene una página del listado filtrado y ordenado
+
+        Args:
+            filters: Filtros por periodo, programa o campus
+            sort_by: Columna de orden (una de SORT_COLUMNS; por defecto el orden de extracción)
+            descending: Orden descendente (los empates quedan en orden inverso de extracción)
+            page: Número de página desde 1 (se ajusta al rango válido)
+            page_size: Filas por página
+
+        Returns:
+            ListingPage con las filas de la página y el total filtrado
+        """
+        if self.df.empty:
+            # Sin registros no hay columnas ni índices de orden: cualquier orden da la página vacía
+            return ListingPage(rows=self.df, total=0, page=1, page_size=max(1, page_size))
+        if sort_by is not None and sort_by not in self.orders:
+            raise ValueError(f"Columna de orden no válida para el listado: {sort_by}")
+        if page_size < 1:
+            raise ValueError("page_size debe ser mayor que cero")
+
+        order = self.orders[sort_by] if sort_by else np.arange(len(self.df))
+        if descending:
+            order = order[::-1]
+
+        mask = self.mask(filters) if filters else None
+        if mask is not None:
+            order = order[mask[order]]
+
+        total = len(order)
+        page = min(max(1, page), max(1, -(-total // page_size)))
+        start = (page - 1) * page_size
+        rows = self.df.iloc[order[start:start + page_size]].reset_index(drop=True)
+        return ListingPage(rows=rows, total=total, page=page, page_size=page_size)
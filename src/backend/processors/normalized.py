@@ -0,0 +1,149 @@
+"""
+Módulo de reconstrucción de las hojas anchas a partir de hechos y dimensiones
+"""
+from typing import Dict, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+from src.utils.config import config
+from src.utils.logger import get_logger
+
+
+logger = get_logger(__name__, config.paths.logs_dir)
+
+
+# Columnas de NI / Reinscritos en el orden de las queries anchas
+ENROLLMENT_COLUMNS = [
+    'campus', 'periodo_id', 'estudiante_id', 'estudiante_nombre', 'nivel',
+    'programa_id', 'program', 'escuela', 'programa', 'tipo'
+]
+
+# Columnas de Hoja1 (get_todos_los_datos) -> columna de hechos o dimensión
+TODOS_COLUMNS = {
+    'Campus': 'campus',
+    'Periodo.de.consulta': 'periodo_id',
+    'ID': 'estudiante_id',
+    'NOMBRE': 'estudiante_nombre',
+    'NIVEL': 'nivel',
+    'PROGRAMA': 'programa_id',
+    'ESCUELA': 'escuela',
+    'PROGRAMA_DESC': 'programa'
+}
+
+PROGRAMA_ATTRIBUTES = ['campus', 'nivel', 'program', 'escuela', 'programa']
+
+
+def lookup_categorical(keys: pd.Series, dim: pd.DataFrame, key: str, column: str) -> pd.Categorical:
+    """
+    Atributo de una dimensión para cada fila de hechos, como columna categórica
+
+    El atributo se codifica una vez sobre la dimensión (pocas filas) y cada
+    hecho solo recibe el código entero: no se copia texto por fila.
+
+    Args:
+        keys: Llaves de los hechos
+        dim: DataFrame de la dimensión
+        key: Columna llave de la dimensión
+        column: Atributo a obtener
+
+    Returns:
+        Categorical alineado con keys (NaN si la llave no está en la dimensión)
+    """
+    dim = dim.drop_duplicates(key)
+    attr_codes, categories = pd.factorize(dim[column])
+    position = pd.Index(dim[key]).get_indexer(keys)
+    codes = np.where(position >= 0, attr_codes[position], -1)
+    return pd.Categorical.from_codes(codes, categories=pd.Index(categories))
+
+
+def _with_dimensions(hechos: pd.DataFrame, estudiantes: pd.DataFrame, programas: pd.DataFrame) -> Dict:
+    """Columnas de hechos más los atributos de estudiante y programa"""
+    columns = {
+        'periodo_id': hechos['periodo_id'].to_numpy(),
+        'estudiante_id': hechos['estudiante_id'].to_numpy(),
+        'programa_id': hechos['programa_id'].to_numpy(),
+        'estudiante_nombre': lookup_categorical(
+            hechos['estudiante_id'], estudiantes, 'estudiante_id', 'estudiante_nombre'
+        )
+    }
+    for attribute in PROGRAMA_ATTRIBUTES:
+        columns[attribute] = lookup_categorical(hechos['programa_id'], programas, 'programa_id', attribute)
+    return columns
+
+
+def build_enrollment(
+    hechos: pd.DataFrame,
+    estudiantes: pd.DataFrame,
+    programas: pd.DataFrame
+) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Reconstruye las extracciones de NI y Reinscritos desde hechos y dimensiones
+
+    Args:
+        hechos: Resultado de get_hechos_inscripcion (periodo_id, estudiante_id, programa_id, es_ni)
+        estudiantes: Dimensión de estudiantes (get_dim_estudiantes)
+        programas: Dimensión de programas (get_dim_programas)
+
+    Returns:
+        Tupla (df_nuevo_ingreso, df_reinscritos) con las columnas de las queries
+        anchas; las columnas de texto son categóricas
+    """
+    if hechos.empty:
+        return pd.DataFrame(), pd.DataFrame()
+
+    columns = _with_dimensions(hechos, estudiantes, programas)
+    es_ni = hechos['es_ni'].astype(bool).to_numpy()
+    columns['tipo'] = pd.Categorical.from_codes(np.where(es_ni, 0, 1), categories=['NI', 'REI'])
+    wide = pd.DataFrame(columns)[ENROLLMENT_COLUMNS]
+
+    frames = []
+    for mask in (es_ni, ~es_ni):
+        df = wide[mask].sort_values(['periodo_id', 'programa_id'], kind='stable').reset_index(drop=True)
+        df['tipo'] = df['tipo'].cat.remove_unused_categories()
+        frames.append(df)
+
+    logger.debug(f"NI/Reinscritos reconstruidos: {len(frames[0])} / {len(frames[1])} filas")
+    return frames[0], frames[1]
+
+
+def build_todos(hechos: pd.DataFrame, estudiantes: pd.DataFrame, programas: pd.DataFrame) -> pd.DataFrame:
+    """
+    Reconstruye los datos consolidados (Hoja1) desde hechos y dimensiones
+
+    Args:
+        hechos: Resultado de get_hechos_asistencia (en el orden de Hoja1)
+        estudiantes: Dimensión de estudiantes
+        programas: Dimensión de programas
+
+    Returns:
+        DataFrame con las columnas de get_todos_los_datos
+    """
+    if hechos.empty:
+        return pd.DataFrame(columns=list(TODOS_COLUMNS))
+
+    columns = _with_dimensions(hechos, estudiantes, programas)
+    return pd.DataFrame({name: columns[source] for name, source in TODOS_COLUMNS.items()})
+
+
+def todos_rows(
+    columns: List[str],
+    rows: List[tuple],
+    estudiantes: pd.DataFrame,
+    programas: pd.DataFrame
+) -> Tuple[List[str], List[tuple]]:
+    """
+    Convierte un lote de hechos de asistencia en filas de Hoja1 (para escritura en streaming)
+
+    Args:
+        columns: Columnas del lote (periodo_id, estudiante_id, programa_id)
+        rows: Filas del lote
+        estudiantes: Dimensión de estudiantes
+        programas: Dimensión de programas
+
+    Returns:
+        Tupla (columnas de Hoja1, filas)
+    """
+    hechos = pd.DataFrame.from_records(rows, columns=columns)
+    df = build_todos(hechos, estudiantes, programas)
+    return list(df.columns), list(df.astype(object).where(df.notna(), None).itertuples(index=False, name=None))
@@ -0,0 +1,147 @@
+"""
+Módulo de codificación de periodos académicos
+"""
+from typing import Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from src.utils.config import config
+from src.utils.logger import get_logger
+
+
+logger = get_logger(__name__, config.paths.logs_dir)
+
+
+class PeriodoIndex:
+    """
+    Calendario de periodos: asigna a cada periodo_id un ordinal denso
+
+    Se construye una vez desde core.periodo (orden cronológico), de modo que
+    los periodos transcurridos entre dos periodos son una resta de enteros,
+    sin importar cómo se numeren los periodos dentro del año.
+    """
+
+    def __init__(self, labels: Iterable):
+        """
+        Inicializa el calendario
+
+        Args:
+            labels: periodo_id en orden cronológico
+        """
+        self.labels = np.asarray([str(label) for label in labels])
+        self._index = pd.Index(self.labels)
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, column: str = 'periodo_id') -> 'PeriodoIndex':
+        """
+        Crea el calendario desde el resultado de la query de periodos
+
+        Args:
+            df: DataFrame ordenado cronológicamente (extract_periodos)
+            column: Columna con el periodo_id
+
+        Returns:
+            Calendario de periodos (vacío si la query no devolvió filas)
+        """
+        # _execute_to_dataframe devuelve un DataFrame sin columnas cuando no hay filas
+        if df.empty or column not in df.columns:
+            return cls([])
+        return cls(df[column].drop_duplicates().tolist())
+
+    def __len__(self) -> int:
+        return len(self.labels)
+
+    def ordinal(self, periodos: Iterable) -> np.ndarray:
+        """
+        Ordinal de cada periodo (-1 si no está en el calendario)
+
+        Args:
+            periodos: periodo_id a convertir
+
+        Returns:
+            Arreglo de ordinales
+        """
+        values = np.asarray([str(p) for p in periodos])
+        return self._index.get_indexer(values).astype(np.int64)
+
+    def covering(self, periodos: Iterable) -> 'PeriodoIndex':
+        """
+        Calendario que incluye todos los periodos dados
+
+        Si alguno no está en el calendario (p. ej. datos fuera del rango
+        consultado), se usa la unión ordenada por periodo_id.
+
+        Args:
+            periodos: periodo_id observados
+
+        Returns:
+            Este calendario o uno extendido
+        """
+        periodos = [str(p) for p in periodos]
+        missing = sorted(set(periodos) - set(self.labels))
+        if not missing:
+            return self
+        if len(self.labels):
+            logger.warning(f"Periodos fuera del calendario: {', '.join(missing[:5])}; se usa la unión ordenada")
+        return PeriodoIndex(sorted(set(self.labels) | set(periodos)))
+
+
+def periodo_ordinals(periodo_labels: np.ndarray, periodo_index: Optional[PeriodoIndex] = None) -> np.ndarray:
+    """
+    Ordinal de calendario de cada etiqueta de periodo
+
+    Args:
+        periodo_labels: Etiquetas de periodo (p. ej. de factorize_periodos)
+        periodo_index: Calendario de core.periodo; sin él, los periodos
+            observados se consideran consecutivos
+
+    Returns:
+        Arreglo de ordinales alineado con periodo_labels
+    """
+    if periodo_index is None:
+        periodo_index = PeriodoIndex(np.sort(np.asarray(periodo_labels, dtype=str)))
+    return periodo_index.covering(periodo_labels).ordinal(periodo_labels)
+
+
+def factorize_periodos(frames: List[pd.DataFrame], column: str = 'periodo_id') -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Codifica los periodos de varios DataFrames contra un catálogo común ordenado
+
+    Cada valor distinto se convierte a texto una sola vez, sin copiar la
+    columna completa.
+
+    Args:
+        frames: DataFrames con la columna de periodo
+        column: Nombre de la columna de periodo
+
+    Returns:
+        Tupla (códigos por fila concatenados, etiquetas de periodo como texto)
+    """
+    factorized = [pd.factorize(df[column], use_na_sentinel=False) for df in frames]
+    uniques = [np.asarray(labels).astype(str) for _, labels in factorized]
+    periodo_labels = np.unique(np.concatenate(uniques)) if uniques else np.array([], dtype=str)
+    periodo_codes = np.concatenate([
+        np.searchsorted(periodo_labels, labels)[codes]
+        for (codes, _), labels in zip(factorized, uniques)
+    ]) if factorized else np.array([], dtype=np.int64)
+    return periodo_codes.astype(np.int64), periodo_labels
+
+
+def group_values(df: pd.DataFrame, group_by: str) -> np.ndarray:
+    """
+    Valores de agrupación de un DataFrame de inscripciones o estatus
+
+    Args:
+        df: DataFrame con programa_id
+        group_by: Columna de agrupación; 'grado' se toma del prefijo de
+            programa_id (LL, EL, ML) si la columna no existe
+
+    Returns:
+        Arreglo con el grupo de cada fila
+    """
+    if group_by in df.columns:
+        return df[group_by].astype(str).to_numpy()
+    if group_by == 'grado':
+        return df['programa_id'].astype(str).str[:2].to_numpy()
+    raise ValueError(f"Columna de agrupación no encontrada: {group_by}")
@@ -0,0 +1,390 @@
+"""
+Módulo de lectura rápida de reportes XLSB/XLSX y comparación contra reportes generados
+"""
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from src.utils.config import config
+from src.utils.logger import get_logger
+
+
+logger = get_logger(__name__, config.paths.logs_dir)
+
+
+# Filas a inspeccionar para detectar el encabezado (título + fila en blanco en reportes generados)
+HEADER_SCAN_ROWS = 20
+
+
+def _iter_xlsx_rows(path: Path, sheet_name: str) -> Iterator[tuple]:
+    """Itera valores de una hoja XLSX/XLSM en modo read-only (sin modelo de celdas)"""
+    import openpyxl
+
+    wb = openpyxl.load_workbook(path, read_only=True, data_only=True)
+    try:
+        yield from wb[sheet_name].iter_rows(values_only=True)
+    finally:
+        wb.close()
+
+
+def _iter_xlsb_rows(path: Path, sheet_name: str) -> Iterator[tuple]:
+    """Itera valores de una hoja XLSB fila por fila con pyxlsb"""
+    from pyxlsb import open_workbook
+
+    with open_workbook(str(path)) as wb:
+        with wb.get_sheet(sheet_name) as sheet:
+            for row in sheet.rows():
+                yield tuple(cell.v for cell in row)
+
+
+def list_sheets(path: str | Path) -> List[str]:
+    """
+    Lista las hojas de un libro XLSB o XLSX
+
+    Args:
+        path: Ruta del archivo
+
+    Returns:
+        Nombres de hoja en orden
+    """
+    path = Path(path)
+    if path.suffix.lower() == '.xlsb':
+        from pyxlsb import open_workbook
+        with open_workbook(str(path)) as wb:
+            return list(wb.sheets)
+
+    import openpyxl
+    wb = openpyxl.load_workbook(path, read_only=True)
+    try:
+        return list(wb.sheetnames)
+    finally:
+        wb.close()
+
+
+def _detect_header(rows: List[tuple]) -> int:
+    """
+    Detecta la fila de encabezado dentro de las primeras filas
+
+    Se omiten filas vacías y filas de título (un solo valor); el encabezado es la
+    primera fila con al menos dos valores.
+    """
+    for idx, row in enumerate(rows):
+        if sum(1 for v in row if v is not None and str(v).strip() != '') >= 2:
+            return idx
+    return 0
+
+
+def _column_names(header: tuple) -> List[str]:
+    """Normaliza nombres de columna (vacíos y duplicados)"""
+    names = []
+    seen: Dict[str, int] = {}
+    for idx, value in enumerate(header):
+        name = str(value).strip() if value is not None and str(value).strip() else f"col_{idx + 1}"
+        if name in seen:
+            seen[name] += 1
+            name = f"{name}.{seen[name]}"
+        else:
+            seen[name] = 0
+        names.append(name)
+    return names
+
+
+def _coerce_types(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Convierte columnas object a tipos concretos (Int64, float, datetime o string)
+
+    Los enteros guardados como float (XLSB) o como texto ('202101') quedan como
+    Int64 en ambos lados, de modo que la comparación sea por valor y no por tipo.
+    """
+    for col in df.columns:
+        series = df[col]
+        if series.dtype != object:
+            continue
+
+        non_null = series.dropna()
+        if non_null.empty:
+            continue
+
+        inferred = pd.api.types.infer_dtype(non_null, skipna=True)
+        if inferred in ('datetime', 'datetime64', 'date'):
+            df[col] = pd.to_datetime(series, errors='coerce')
+            continue
+
+        numeric = pd.to_numeric(series, errors='coerce')
+        if numeric.notna().sum() == len(non_null):
+            if np.all(np.mod(numeric.dropna().to_numpy(dtype=float), 1) == 0):
+                df[col] = numeric.astype('Int64')
+            else:
+                df[col] = numeric.astype(float)
+        else:
+            df[col] = series.astype('string').str.strip()
+
+    return df
+
+
+def read_sheet(
+    path: str | Path,
+    sheet_name: str,
+    header_row: Optional[int] = None,
+    max_rows: Optional[int] = None
+) -> pd.DataFrame:
+    """
+    Lee una hoja de un libro XLSB o XLSX directamente a un DataFrame tipado
+
+    Las filas se leen en streaming (pyxlsb / openpyxl read-only) sin construir
+    el modelo de celdas del libro completo.
+
+    Args:
+        path: Ruta del archivo
+        sheet_name: Nombre de la hoja
+        header_row: Índice (base 0) de la fila de encabezado; se detecta si es None
+        max_rows: Máximo de filas de datos a leer (opcional)
+
+    Returns:
+        DataFrame con tipos normalizados
+    """
+    path = Path(path)
+    start_time = time.perf_counter()
+
+    if path.suffix.lower() == '.xlsb':
+        rows_iter = _iter_xlsb_rows(path, sheet_name)
+    else:
+        rows_iter = _iter_xlsx_rows(path, sheet_name)
+
+    head: List[tuple] = []
+    for row in rows_iter:
+        head.append(row)
+        if len(head) >= HEADER_SCAN_ROWS:
+            break
+
+    if not head:
+        return pd.DataFrame()
+
+    header_idx = _detect_header(head) if header_row is None else header_row
+    columns = _column_names(head[header_idx])
+    width = len(columns)
+
+    data: List[tuple] = [row[:width] for row in head[header_idx + 1:]]
+    for row in rows_iter:
+        if max_rows is not None and len(data) >= max_rows:
+            break
+        data.append(row[:width])
+
+    if max_rows is not None:
+        data = data[:max_rows]
+
+    df = pd.DataFrame.from_records(data, columns=columns) if data else pd.DataFrame(columns=columns)
+    df = df.dropna(how='all').reset_index(drop=True)
+    df = _coerce_types(df)
+
+    elapsed = time.perf_counter() - start_time
+    logger.debug(f"Hoja '{sheet_name}' de {path.name} leída: {len(df)} filas en {elapsed:.2f}s")
+
+    return df
+
+
+def read_workbook(
+    path: str | Path,
+    sheets: Optional[Sequence[str]] = None
+) -> Dict[str, pd.DataFrame]:
+    """
+    Lee varias hojas de un libro XLSB o XLSX
+
+    Args:
+        path: Ruta del archivo
+        sheets: Hojas a leer (por defecto todas)
+
+    Returns:
+        Diccionario hoja -> DataFrame
+    """
+    sheets = list(sheets) if sheets else list_sheets(path)
+    return {name: read_sheet(path, name) for name in sheets}
+
+
+@dataclass
+class SheetDiff:
+    """Diferencias entre una hoja del reporte de referencia y la del generado"""
+    sheet: str
+    legacy_rows: int
+    generated_rows: int
+    missing_columns: List[str] = field(default_factory=list)
+    extra_columns: List[str] = field(default_factory=list)
+    rows_only_legacy: int = 0
+    rows_only_generated: int = 0
+    mismatches: Dict[str, int] = field(default_factory=dict)
+    sample: pd.DataFrame = field(default_factory=pd.DataFrame)
+
+    @property
+    def is_equal(self) -> bool:
+        """True si no hay diferencias de columnas, filas ni valores"""
+        return not (
+            self.missing_columns or self.extra_columns or
+            self.rows_only_legacy or self.rows_only_generated or
+            any(self.mismatches.values())
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Representación serializable (sin la muestra de diferencias)"""
+        return {
+            'sheet': self.sheet,
+            'equal': self.is_equal,
+            'legacy_rows': self.legacy_rows,
+            'generated_rows': self.generated_rows,
+            'missing_columns': self.missing_columns,
+            'extra_columns': self.extra_columns,
+            'rows_only_legacy': self.rows_only_legacy,
+            'rows_only_generated': self.rows_only_generated,
+            'mismatches': {k: v for k, v in self.mismatches.items() if v}
+        }
+
+
+def _values_differ(a: pd.Series, b: pd.Series, rtol: float) -> np.ndarray:
+    """Compara dos columnas alineadas; NA contra NA se considera igual"""
+    a_na = a.isna().to_numpy()
+    b_na = b.isna().to_numpy()
+
+    if pd.api.types.is_numeric_dtype(a) and pd.api.types.is_numeric_dtype(b):
+        a_values = a.astype('Float64').fillna(0).to_numpy(dtype=float)
+        b_values = b.astype('Float64').fillna(0).to_numpy(dtype=float)
+        differ = ~np.isclose(a_values, b_values, rtol=rtol, atol=0)
+    else:
+        a_values = a.astype('string').str.strip().fillna('').to_numpy(dtype=object)
+        b_values = b.astype('string').str.strip().fillna('').to_numpy(dtype=object)
+        differ = a_values != b_values
+
+    return (differ & ~(a_na & b_na)) | (a_na ^ b_na)
+
+
+def diff_frames(
+    legacy: pd.DataFrame,
+    generated: pd.DataFrame,
+    sheet: str = '',
+    key_columns: Optional[Sequence[str]] = None,
+    sample_size: int = 20,
+    rtol: float = 1e-9
+) -> SheetDiff:
+    """
+    Compara dos DataFrames columna por columna de forma vectorizada
+
+    Con key_columns las filas se alinean por llave (las llaves repetidas se
+    emparejan por orden de aparición); sin llaves se alinean por posición.
+
+    Args:
+        legacy: DataFrame del reporte de referencia
+        generated: DataFrame del reporte generado
+        sheet: Nombre de la hoja (para el resultado)
+        key_columns: Columnas que identifican una fila (opcional)
+        sample_size: Máximo de filas con diferencias a conservar como muestra
+        rtol: Tolerancia relativa para columnas numéricas
+
+    Returns:
+        SheetDiff con el detalle de diferencias
+    """
+    result = SheetDiff(
+        sheet=sheet,
+        legacy_rows=len(legacy),
+        generated_rows=len(generated),
+        missing_columns=[c for c in legacy.columns if c not in generated.columns],
+        extra_columns=[c for c in generated.columns if c not in legacy.columns]
+    )
+    common = [c for c in legacy.columns if c in generated.columns]
+
+    keys = [k for k in (key_columns or []) if k in common]
+    if keys:
+        left = legacy[common].copy()
+        right = generated[common].copy()
+        left['_occ'] = left.groupby(keys, dropna=False).cumcount()
+        right['_occ'] = right.groupby(keys, dropna=False).cumcount()
+
+        merged = left.merge(
+            right,
+            on=keys + ['_occ'],
+            how='outer',
+            suffixes=('_legacy', '_generated'),
+            indicator=True
+        )
+        result.rows_only_legacy = int((merged['_merge'] == 'left_only').sum())
+        result.rows_only_generated = int((merged['_merge'] == 'right_only').sum())
+        matched = merged[merged['_merge'] == 'both']
+        value_columns = [c for c in common if c not in keys]
+        pairs = {c: (matched[f"{c}_legacy"], matched[f"{c}_generated"]) for c in value_columns}
+        index_frame = matched[keys]
+    else:
+        n = min(len(legacy), len(generated))
+        result.rows_only_legacy = len(legacy) - n
+        result.rows_only_generated = len(generated) - n
+        pairs = {
+            c: (legacy[c].iloc[:n].reset_index(drop=True), generated[c].iloc[:n].reset_index(drop=True))
+            for c in common
+        }
+        index_frame = pd.DataFrame({'fila': np.arange(n)})
+
+    any_diff = np.zeros(len(index_frame), dtype=bool)
+    diff_masks = {}
+    for col, (a, b) in pairs.items():
+        mask = _values_differ(a.reset_index(drop=True), b.reset_index(drop=True), rtol)
+        result.mismatches[col] = int(mask.sum())
+        if mask.any():
+            diff_masks[col] = mask
+            any_diff |= mask
+
+    if any_diff.any() and sample_size:
+        rows = np.flatnonzero(any_diff)[:sample_size]
+        sample = index_frame.reset_index(drop=True).iloc[rows].copy()
+        for col, mask in diff_masks.items():
+            a, b = pairs[col]
+            sample[f"{col} (referencia)"] = a.reset_index(drop=True).iloc[rows].to_numpy()
+            sample[f"{col} (generado)"] = b.reset_index(drop=True).iloc[rows].to_numpy()
+        result.sample = sample.reset_index(drop=True)
+
+    return result
+
+
+def diff_reports(
+    legacy_path: str | Path,
+    generated_path: str | Path,
+    sheet_map: Optional[Dict[str, str]] = None,
+    key_columns: Optional[Dict[str, Sequence[str]]] = None
+) -> List[SheetDiff]:
+    """
+    Compara un reporte de referencia (XLSB/XLSX) contra un reporte generado
+
+    Args:
+        legacy_path: Ruta del reporte de referencia
+        generated_path: Ruta del reporte generado
+        sheet_map: Mapeo hoja de referencia -> hoja generada (por defecto las hojas
+            con el mismo nombre en ambos libros)
+        key_columns: Columnas llave por hoja de referencia (opcional)
+
+    Returns:
+        Lista de SheetDiff, una por hoja comparada
+    """
+    start_time = time.perf_counter()
+
+    if sheet_map is None:
+        generated_sheets = set(list_sheets(generated_path))
+        sheet_map = {s: s for s in list_sheets(legacy_path) if s in generated_sheets}
+
+    diffs = []
+    for legacy_sheet, generated_sheet in sheet_map.items():
+        df_legacy = read_sheet(legacy_path, legacy_sheet)
+        df_generated = read_sheet(generated_path, generated_sheet)
+        diffs.append(diff_frames(
+            df_legacy,
+            df_generated,
+            sheet=legacy_sheet,
+            key_columns=(key_columns or {}).get(legacy_sheet)
+        ))
+
+    elapsed = time.perf_counter() - start_time
+    equal = sum(1 for d in diffs if d.is_equal)
+    logger.info(
+        f"Comparación {Path(legacy_path).name} vs {Path(generated_path).name}: "
+        f"{equal}/{len(diffs)} hojas iguales en {elapsed:.2f}s"
+    )
+
+    return diffs
@@ -0,0 +1,166 @@
+"""
+Módulo de DataFrames compartidos entre procesos mediante archivos mapeados en memoria
+"""
+import pickle
+import shutil
+import uuid
+from pathlib import Path
+from typing import Generator, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from src.utils.config import config
+from src.utils.logger import get_logger
+
+
+logger = get_logger(__name__, config.paths.logs_dir)
+
+
+# Tipos NumPy que se guardan tal cual (.npy mapeable); el resto se codifica como categórico
+_NUMPY_KINDS = 'biufcmM'
+
+MANIFEST_FILE = "frame.pkl"
+
+
+def _column_arrays(series: pd.Series) -> Tuple[np.ndarray, Optional[pd.Index]]:
+    """
+    Arreglo de ancho fijo de una columna y, si es texto u objeto, sus categorías
+
+    Returns:
+        Tupla (arreglo, categorías o None)
+    """
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        return series.array.codes, series.cat.categories
+    if isinstance(series.dtype, np.dtype) and series.dtype.kind in _NUMPY_KINDS:
+        return series.to_numpy(), None
+
+    codes, uniques = pd.factorize(series)
+    # Mismo tipo entero que usa pandas para los códigos: al adjuntar no se convierten
+    codes = pd.Categorical.from_codes(codes, categories=uniques).codes
+    return codes, pd.Index(uniques)
+
+
+def write_frame(df: pd.DataFrame, directory: Path) -> Path:
+    """
+    Guarda un DataFrame como una columna .npy por archivo
+
+    Las columnas numéricas y de fecha se guardan como arreglos; las de texto como
+    códigos enteros más sus valores distintos (el único contenido serializado con
+    pickle, del tamaño de las categorías y no de las filas).
+
+    Args:
+        df: DataFrame a publicar
+        directory: Directorio destino (se crea)
+
+    Returns:
+        Directorio del DataFrame
+    """
+    directory.mkdir(parents=True, exist_ok=True)
+    columns = []
+    for position, name in enumerate(df.columns):
+        array, categories = _column_arrays(df.iloc[:, position])
+        np.save(directory / f"{position}.npy", np.ascontiguousarray(array), allow_pickle=False)
+        columns.append({'name': name, 'categories': categories})
+
+    with open(directory / MANIFEST_FILE, 'wb') as f:
+        pickle.dump({'rows': len(df), 'columns': columns}, f, protocol=pickle.HIGHEST_PROTOCOL)
+    return directory
+
+
+def read_frame(directory: Path) -> pd.DataFrame:
+    """
+    Adjunta un DataFrame publicado con write_frame sin copiar sus columnas
+
+    Los arreglos se abren con np.memmap en solo lectura: todos los procesos que
+    adjuntan el mismo DataFrame comparten las páginas del cache del sistema
+    operativo. Las columnas son de solo lectura: quien necesite modificar el
+    DataFrame debe trabajar sobre una copia.
+
+    Args:
+        directory: Directorio del DataFrame
+
+    Returns:
+        DataFrame respaldado por los archivos mapeados
+    """
+    with open(directory / MANIFEST_FILE, 'rb') as f:
+        manifest = pickle.load(f)
+
+    if not manifest['columns']:
+        return pd.DataFrame(index=pd.RangeIndex(manifest['rows']))
+
+    arrays = {}
+    for position, column in enumerate(manifest['columns']):
+        array = np.load(directory / f"{position}.npy", mmap_mode='r')
+        if column['categories'] is not None:
+            array = pd.Categorical.from_codes(array, categories=column['categories'])
+        arrays[column['name']] = array
+
+    return pd.DataFrame(arrays, copy=False)
+
+
+def iter_frame_rows(
+    df: pd.DataFrame,
+    batch_size: Optional[int] = None
+) -> Generator[Tuple[List[str], List[tuple]], None, None]:
+    """
+    Entrega un DataFrame en lotes (columnas, filas), como DataExtractor.iter_todos_datos
+
+    Args:
+        df: DataFrame a recorrer
+        batch_size: Filas por lote (por defecto config.reports.stream_batch_size)
+
+    Yields:
+        Tupla (columnas, filas) por lote; valores nulos como None
+    """
+    batch_size = batch_size or config.reports.stream_batch_size
+    columns = [str(c) for c in df.columns]
+
+    if df.empty:
+        yield columns, []
+        return
+
+    for start in range(0, len(df), batch_size):
+        batch = df.iloc[start:start + batch_size].astype(object)
+        yield columns, list(batch.where(batch.notna(), None).itertuples(index=False, name=None))
+
+
+class SharedFrames:
+    """Conjunto de DataFrames publicados una vez para varios procesos trabajadores"""
+
+    def __init__(self, directory: Optional[Path] = None):
+        """
+        Inicializa el conjunto
+
+        Args:
+            directory: Directorio del conjunto (por defecto uno nuevo en data/shared/)
+        """
+        self.directory = directory or config.paths.data_dir / "shared" / uuid.uuid4().hex[:12]
+
+    def publish(self, name: str, df: pd.DataFrame):
+        """
+        Publica un DataFrame con el nombre dado
+
+        Args:
+            name: Nombre del DataFrame dentro del conjunto
+            df: DataFrame a publicar
+        """
+        write_frame(df, self.directory / name)
+        logger.debug(f"DataFrame compartido publicado: {name} ({len(df)} filas)")
+
+    def attach(self, name: str) -> pd.DataFrame:
+        """
+        Adjunta un DataFrame publicado (sin copia)
+
+        Args:
+            name: Nombre del DataFrame
+
+        Returns:
+            DataFrame respaldado por archivos mapeados en memoria
+        """
+        return read_frame(self.directory / name)
+
+    def cleanup(self):
+        """Elimina los archivos del conjunto"""
+        shutil.rmtree(self.directory, ignore_errors=True)
+        logger.debug(f"DataFrames compartidos eliminados: {self.directory}")
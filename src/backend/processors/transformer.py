@@ -3,8 +3,12 @@ Módulo de transformación de datos para reportes
 """
 import pandas as pd
 import numpy as np
-from typing import Dict, List, Optional
+from typing import Any, Dict, List, Optional, Sequence, Union
 
+from src.backend.processors.cube import TrayectoriaCube
+from src.backend.processors.fact_store import FactStore
+from src.backend.processors.fimpes import FimpesEngine, merge_indicators
+from src.backend.processors.periodos import PeriodoIndex, factorize_periodos, group_values, periodo_ordinals
 from src.utils.logger import get_logger
 from src.utils.config import config
 
@@ -12,9 +16,23 @@ from src.utils.config import config
 logger = get_logger(__name__, config.paths.logs_dir)
 
 
+# Columnas del cuadro FIMPES que reemplaza el motor por estudiante
+ENGINE_COLUMNS = ['Abandono', 'Activo ', 'Cambios de carrera', 'Egresados', 'Titulados']
+
+
 class TrayectoriaTransformer:
     """Transformador de datos para análisis de trayectoria"""
 
+    def __init__(self, periodo_index: Optional[PeriodoIndex] = None):
+        """
+        Inicializa el transformador
+
+        Args:
+            periodo_index: Calendario de periodos de core.periodo (extract_periodos).
+                Sin él, los periodos observados en los datos se consideran consecutivos
+        """
+        self.periodo_index = periodo_index
+
     def create_trayectoria_table(
         self,
         df_nuevo_ingreso: pd.DataFrame,
@@ -33,92 +51,296 @@ class TrayectoriaTransformer:
         logger.info("Creando tabla de trayectoria")
 
         try:
-            # Combinar ambos dataframes
-            df_all = pd.concat([df_nuevo_ingreso, df_reinscritos], ignore_index=True)
+            # Solo se usan tres columnas: no se concatena ni se une el DataFrame completo
+            frames = [df for df in (df_nuevo_ingreso, df_reinscritos) if not df.empty]
 
-            if df_all.empty:
+            if not frames:
                 logger.warning("No hay datos para crear tabla de trayectoria")
                 return pd.DataFrame()
 
-            # Extraer año y número de periodo
-            df_all['periodo_id'] = df_all['periodo_id'].astype(str)
-            df_all['año'] = df_all['periodo_id'].str[:4].astype(int)
-            df_all['num_periodo'] = df_all['periodo_id'].str[4:].astype(int)
+            codes = self._encode_enrollment(frames)
+            group_codes = np.zeros(len(codes['student']), dtype=np.int64)
+            df_trayectoria = self._cohort_matrices(codes, group_codes, 1)[0]
 
-            # Identificar generación (periodo de ingreso)
-            estudiantes_ingreso = df_all[df_all['tipo'] == 'NI'][['estudiante_id', 'periodo_id']].copy()
-            estudiantes_ingreso.rename(columns={'periodo_id': 'generacion'}, inplace=True)
-            estudiantes_ingreso = estudiantes_ingreso.drop_duplicates('estudiante_id')
+            if df_trayectoria.empty:
+                logger.warning("No hay estudiantes con periodo de ingreso para crear tabla de trayectoria")
+                return df_trayectoria
 
-            # Merge para agregar generación a todos los registros
-            df_all = df_all.merge(estudiantes_ingreso, on='estudiante_id', how='left')
+            logger.info(f"Tabla de trayectoria creada: {len(df_trayectoria)} generaciones")
 
-            # Filtrar solo registros con generación válida (excluir NaN)
-            df_all = df_all[df_all['generacion'].notna()].copy()
+            return df_trayectoria
 
-            # Calcular número de periodo desde ingreso
-            df_all['generacion_año'] = df_all['generacion'].str[:4].astype(int)
-            df_all['generacion_num'] = df_all['generacion'].str[4:].astype(int)
+        except Exception as e:
+            logger.error(f"Error creando tabla de trayectoria: {e}")
+            raise
 
-            # Calcular periodos transcurridos
-            df_all['periodos_desde_ingreso'] = (
-                (df_all['año'] - df_all['generacion_año']) * 10 +
-                (df_all['num_periodo'] - df_all['generacion_num'])
-            )
+    def create_trayectoria_from_facts(
+        self,
+        store: FactStore,
+        rows: Optional[np.ndarray] = None
+    ) -> pd.DataFrame:
+        """
+        Crea la tabla de trayectoria directamente sobre un almacén de hechos
 
-            # Crear tabla pivote por generación
-            generaciones = sorted(df_all['generacion'].dropna().unique())
+        Args:
+            store: Almacén de hechos del grado (FactStore.open)
+            rows: Máscara de filas (p. ej. FactStore.mask); por defecto todas.
+                La generación de cada estudiante es la del grado completo
 
-            # Calcular el número máximo de periodos necesarios (matriz cuadrada)
-            # El número de columnas debe ser igual al número de generaciones
-            max_periodos = len(generaciones)
+        Returns:
+            DataFrame con el mismo formato que create_trayectoria_table
+        """
+        codes = store.cohort_codes(rows)
+        if not len(codes['student']):
+            logger.warning("No hay hechos para crear tabla de trayectoria")
+            return pd.DataFrame()
 
-            rows = []
-            for gen in generaciones:
-                df_gen = df_all[df_all['generacion'] == gen]
+        group_codes = np.zeros(len(codes['student']), dtype=np.int64)
+        return self._cohort_matrices(codes, group_codes, 1)[0]
 
-                row = {'Generación': gen}
+    def create_batch(
+        self,
+        enrollment: Union[pd.DataFrame, Sequence[pd.DataFrame]],
+        group_by: str = 'grado',
+        include_programas: bool = False,
+        df_estatus: Optional[pd.DataFrame] = None
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Calcula trayectoria, cuadro FIMPES y métricas de varios grados en una sola pasada
 
-                # Contar estudiantes únicos por periodo (matriz cuadrada)
-                for p in range(0, max_periodos):  # De 0 (nuevo ingreso) hasta max_periodos-1
-                    estudiantes_en_periodo = df_gen[
-                        df_gen['periodos_desde_ingreso'] == p
-                    ]['estudiante_id'].nunique()
+        Args:
+            enrollment: DataFrame (o lista de DataFrames, p. ej. NI y Reinscritos)
+                con estudiante_id, periodo_id, tipo y programa_id de todos los grados
+            group_by: Columna que identifica el grupo. Si es 'grado' y no existe,
+                se toma del prefijo de programa_id (LL, EL, ML)
+            include_programas: Si True, agrega las matrices de cada programa; sus
+                cambios de carrera se cuentan sobre los programas del estudiante en
+                el grupo y se asignan al programa de su nuevo ingreso
+            df_estatus: Estatus por (estudiante, programa) de todos los grados para
+                egresados, titulados y cambios de carrera del cuadro FIMPES
 
-                    if p == 0:
-                        row['Nuevo ingreso'] = estudiantes_en_periodo
-                    else:
-                        row[f'P{p+1}'] = estudiantes_en_periodo
+        Returns:
+            Diccionario grupo -> {'trayectoria', 'fimpes', 'metrics'} y, con
+            include_programas, 'programas': {programa_id -> {...}}
+        """
+        frames = [enrollment] if isinstance(enrollment, pd.DataFrame) else list(enrollment)
+        frames = [df for df in frames if not df.empty]
+
+        if not frames:
+            logger.warning("No hay datos para el cálculo por lotes")
+            return {}
+
+        logger.info(f"Calculando trayectoria por lotes ({group_by}{' y programa' if include_programas else ''})")
+
+        codes = self._encode_enrollment(frames)
+        group_codes, group_labels = pd.factorize(
+            np.concatenate([group_values(df, group_by) for df in frames]), sort=True
+        )
+        matrices = self._cohort_matrices(codes, group_codes, len(group_labels))
+        engine = FimpesEngine(periodo_index=self.periodo_index)
+        indicadores = engine.compute(frames, df_estatus, group_by=group_by)
+
+        results = {
+            str(label): self._indicators(df_trayectoria, indicadores.get(label))
+            for label, df_trayectoria in zip(group_labels, matrices)
+        }
 
-                rows.append(row)
+        if include_programas:
+            programa_codes, programa_labels = pd.factorize(
+                np.concatenate([df['programa_id'].to_numpy() for df in frames]), sort=True
+            )
+            programa_matrices = self._cohort_matrices(codes, programa_codes, len(programa_labels))
+            # Cambios de carrera contados con todos los programas del estudiante en su grupo
+            # (no solo el programa del miembro) y asignados al programa que dejó
+            programa_indicadores = engine.compute(frames, df_estatus, group_by='programa_id', changes_by=group_by)
+
+            # Grupo de cada programa: el de su primera fila
+            _, first = np.unique(programa_codes, return_index=True)
+            for label in results:
+                results[label]['programas'] = {}
+            for programa, row, df_trayectoria in zip(programa_labels, first, programa_matrices):
+                grupo = str(group_labels[group_codes[row]])
+                results[grupo]['programas'][str(programa)] = self._indicators(
+                    df_trayectoria, programa_indicadores.get(programa)
+                )
 
-            df_trayectoria = pd.DataFrame(rows)
+        logger.info(f"Trayectoria por lotes calculada: {len(results)} grupos")
 
-            # Rellenar NaN con 0
-            df_trayectoria = df_trayectoria.fillna(0)
+        return results
 
-            # Convertir columna Generación a string
-            df_trayectoria['Generación'] = df_trayectoria['Generación'].astype(str)
+    def _indicators(
+        self,
+        df_trayectoria: pd.DataFrame,
+        indicadores: Optional[pd.DataFrame] = None
+    ) -> Dict[str, Any]:
+        """Cuadro FIMPES y métricas de una matriz de trayectoria"""
+        return {
+            'trayectoria': df_trayectoria,
+            'fimpes': self._fimpes_table(df_trayectoria, indicadores),
+            'metrics': self.calculate_retention_metrics(df_trayectoria)
+        }
 
-            # Convertir conteos a int
-            for col in df_trayectoria.columns:
-                if col != 'Generación':
-                    df_trayectoria[col] = df_trayectoria[col].astype(int)
+    def _encode_enrollment(self, frames: List[pd.DataFrame]) -> Dict[str, Any]:
+        """
+        Codifica estudiantes y periodos de varios DataFrames como arreglos enteros
 
-            logger.info(f"Tabla de trayectoria creada: {len(df_trayectoria)} generaciones")
+        Returns:
+            Diccionario con 'student', 'n_students', 'periodo', 'periodo_labels',
+            'ordinal' (ordinal de calendario por etiqueta) y 'es_ni'
+        """
+        estudiantes = np.concatenate([df['estudiante_id'].to_numpy() for df in frames])
+        student_codes, student_labels = pd.factorize(estudiantes)
+        periodo_codes, periodo_labels = factorize_periodos(frames)
+
+        return {
+            'student': student_codes.astype(np.int64),
+            'n_students': len(student_labels),
+            'periodo': periodo_codes.astype(np.int64),
+            'periodo_labels': periodo_labels,
+            'ordinal': periodo_ordinals(periodo_labels, self.periodo_index),
+            'es_ni': np.concatenate([(df['tipo'] == 'NI').to_numpy() for df in frames])
+        }
 
-            return df_trayectoria
+    @staticmethod
+    def _cohort_matrices(
+        codes: Dict[str, Any],
+        group_codes: np.ndarray,
+        n_groups: int
+    ) -> List[pd.DataFrame]:
+        """
+        Matrices de trayectoria de varios grupos en una sola pasada sobre arreglos enteros
 
-        except Exception as e:
-            logger.error(f"Error creando tabla de trayectoria: {e}")
-            raise
+        La generación de cada estudiante es su primer periodo NI dentro del
+        grupo. Los periodos desde el ingreso son la diferencia de ordinales de
+        calendario, y cada matriz tiene tantas columnas como periodos hay entre
+        la primera generación del grupo y su último periodo con datos.
+
+        Args:
+            codes: Resultado de _encode_enrollment (o FactStore.cohort_codes, con
+                'generacion' precalculada por fila)
+            group_codes: Código de grupo por fila (0..n_groups-1)
+            n_groups: Número de grupos
 
-    def create_cuadro_fimpes(self, df_trayectoria: pd.DataFrame) -> pd.DataFrame:
+        Returns:
+            Lista con una tabla de trayectoria por grupo (vacía si no hay generaciones)
+        """
+        student = codes['student']
+        periodo = codes['periodo']
+        periodo_labels = codes['periodo_labels']
+        n_students = codes['n_students']
+        ordinal = codes['ordinal']
+        n_periodos = len(periodo_labels)
+        group_codes = np.asarray(group_codes, dtype=np.int64)
+
+        if 'generacion' in codes:
+            # Generación precalculada por fila (FactStore): primer periodo NI del estudiante
+            row_gen = codes['generacion']
+        else:
+            # Generación por (grupo, estudiante): primer registro NI
+            members, member_idx = np.unique(group_codes * n_students + student, return_inverse=True)
+            generacion_de = np.full(len(members), -1, dtype=np.int64)
+            ni_rows = np.flatnonzero(codes['es_ni'])
+            ni_members, first = np.unique(member_idx[ni_rows], return_index=True)
+            generacion_de[ni_members] = periodo[ni_rows[first]]
+            row_gen = generacion_de[member_idx]
+
+        # Filtrar solo registros con generación válida
+        valid = row_gen >= 0
+        row_gen = row_gen[valid]
+        row_per = periodo[valid]
+        row_group = group_codes[valid]
+        row_student = student[valid]
+
+        # Periodos transcurridos desde el ingreso
+        row_ord = ordinal[row_per]
+        gen_ord = ordinal[row_gen]
+        periodos_desde_ingreso = row_ord - gen_ord
+
+        # Generaciones de cada grupo (ordenadas) y su posición dentro del grupo
+        gen_keys, row_gen_key = np.unique(row_group * n_periodos + row_gen, return_inverse=True)
+        n_gens = np.bincount(gen_keys // n_periodos, minlength=n_groups)
+        gen_start = np.concatenate([[0], np.cumsum(n_gens)[:-1]])
+        row_rank = row_gen_key - gen_start[row_group]
+
+        # Columnas por grupo: periodos desde la primera generación hasta el último periodo con datos
+        first_gen = np.full(n_groups, np.iinfo(np.int64).max, dtype=np.int64)
+        np.minimum.at(first_gen, row_group, gen_ord)
+        last_per = np.full(n_groups, -1, dtype=np.int64)
+        np.maximum.at(last_per, row_group, row_ord)
+        n_cols = np.where(n_gens > 0, last_per - first_gen + 1, 0)
+
+        # Matriz por grupo, ubicada en un solo arreglo de celdas
+        row_cols = n_cols[row_group]
+        in_matrix = periodos_desde_ingreso >= 0
+        cell_start = np.concatenate([[0], np.cumsum(n_gens * n_cols)[:-1]])
+        cell = (
+            cell_start[row_group] + row_rank * row_cols + periodos_desde_ingreso
+        )[in_matrix]
+
+        # Estudiantes únicos por celda
+        pairs = np.unique(cell * n_students + row_student[in_matrix])
+        counts = np.bincount(pairs // n_students, minlength=int((n_gens * n_cols).sum()))
+
+        matrices = []
+        for group in range(n_groups):
+            rows, cols = int(n_gens[group]), int(n_cols[group])
+            if not rows:
+                matrices.append(pd.DataFrame())
+                continue
+
+            start = cell_start[group]
+            matrix = counts[start:start + rows * cols].reshape(rows, cols)
+            generaciones = periodo_labels[gen_keys[gen_start[group]:gen_start[group] + rows] % n_periodos]
+
+            columns = ['Nuevo ingreso'] + [f'P{p+1}' for p in range(1, cols)]
+            df_trayectoria = pd.DataFrame(matrix.astype(int), columns=columns)
+            df_trayectoria.insert(0, 'Generación', generaciones.astype(str))
+            matrices.append(df_trayectoria)
+
+        return matrices
+
+    def create_cuadro_fimpes(
+        self,
+        df_trayectoria: pd.DataFrame,
+        df_nuevo_ingreso: Optional[pd.DataFrame] = None,
+        df_reinscritos: Optional[pd.DataFrame] = None,
+        df_estatus: Optional[pd.DataFrame] = None
+    ) -> pd.DataFrame:
         """
         Crea cuadro de indicadores FIMPES
 
+        Con las inscripciones por estudiante (y opcionalmente su estatus), el
+        abandono, activos, cambios de carrera, egresados y titulados se
+        calculan con FimpesEngine; sin ellas se aproximan desde la trayectoria.
+
+        Args:
+            df_trayectoria: DataFrame con trayectoria por generación
+            df_nuevo_ingreso: DataFrame con estudiantes de nuevo ingreso
+            df_reinscritos: DataFrame con estudiantes reinscritos
+            df_estatus: DataFrame de extract_estatus (egreso, titulación y programas)
+
+        Returns:
+            DataFrame con indicadores FIMPES
+        """
+        indicadores = None
+        if df_nuevo_ingreso is not None and df_reinscritos is not None:
+            engine = FimpesEngine(periodo_index=self.periodo_index)
+            indicadores = engine.compute([df_nuevo_ingreso, df_reinscritos], df_estatus).get(None)
+
+        return self._fimpes_table(df_trayectoria, indicadores)
+
+    def _fimpes_table(
+        self,
+        df_trayectoria: pd.DataFrame,
+        indicadores: Optional[pd.DataFrame] = None
+    ) -> pd.DataFrame:
+        """
+        Arma el cuadro FIMPES a partir de la trayectoria y, si existen, de los
+        indicadores por estudiante
+
         Args:
             df_trayectoria: DataFrame con trayectoria por generación
+            indicadores: Indicadores por cohorte de FimpesEngine.compute
 
         Returns:
             DataFrame con indicadores FIMPES
@@ -144,17 +366,28 @@ class TrayectoriaTransformer:
                     df_fimpes['P2'] / df_fimpes['Nuevo ingreso'].replace(0, np.nan)
                 ).round(4)
 
-            # Abandono (calculado posteriormente con más datos)
-            df_fimpes['Abandono'] = None
-
-            # Activos (última columna P disponible)
             p_cols = [col for col in df_fimpes.columns if col.startswith('P')]
-            if p_cols:
-                ultima_p = p_cols[-1]
-                df_fimpes['Activo '] = df_fimpes[ultima_p]
 
-            # Cambios de carrera (requiere datos adicionales)
-            df_fimpes['Cambios de carrera'] = None
+            if indicadores is not None:
+                # Abandono, activos, cambios de carrera, egresados y titulados por estudiante
+                df_fimpes = merge_indicators(df_fimpes, indicadores, ENGINE_COLUMNS)
+            else:
+                # Abandono (requiere inscripciones por estudiante)
+                df_fimpes['Abandono'] = None
+
+                # Activos (última columna P disponible)
+                if p_cols:
+                    ultima_p = p_cols[-1]
+                    df_fimpes['Activo '] = df_fimpes[ultima_p]
+
+                # Cambios de carrera (requiere datos adicionales)
+                df_fimpes['Cambios de carrera'] = None
+
+                # Egresados (aproximación: último periodo con datos)
+                if p_cols and len(p_cols) >= 6:
+                    df_fimpes['Egresados'] = df_fimpes['P6']
+                else:
+                    df_fimpes['Egresados'] = 0
 
             # Rezago (estudiantes que continúan / nuevo ingreso)
             if 'Activo ' in df_fimpes.columns and 'Nuevo ingreso' in df_fimpes.columns:
@@ -162,12 +395,6 @@ class TrayectoriaTransformer:
                     df_fimpes['Activo '] / df_fimpes['Nuevo ingreso'].replace(0, np.nan)
                 ).round(4)
 
-            # Egresados (aproximación: último periodo con datos)
-            if p_cols and len(p_cols) >= 6:
-                df_fimpes['Egresados'] = df_fimpes['P6']
-            else:
-                df_fimpes['Egresados'] = 0
-
             # Seleccionar solo columnas FIMPES
             fimpes_cols = [
                 'Cohorte',
@@ -177,7 +404,8 @@ class TrayectoriaTransformer:
                 'Activo ',
                 'Cambios de carrera',
                 '% Rezago',
-                'Egresados'
+                'Egresados',
+                'Titulados'
             ]
 
             df_fimpes = df_fimpes[[col for col in fimpes_cols if col in df_fimpes.columns]]
@@ -213,6 +441,82 @@ class TrayectoriaTransformer:
 
         return df_agg
 
+    def build_cube(
+        self,
+        df_nuevo_ingreso: pd.DataFrame,
+        df_reinscritos: pd.DataFrame
+    ) -> TrayectoriaCube:
+        """
+        Construye el cubo pre-agregado para consultas por programa, campus y escuela
+
+        Args:
+            df_nuevo_ingreso: DataFrame con estudiantes de nuevo ingreso
+            df_reinscritos: DataFrame con estudiantes reinscritos
+
+        Returns:
+            Cubo de trayectoria
+        """
+        return TrayectoriaCube.from_frames(df_nuevo_ingreso, df_reinscritos, self.periodo_index)
+
+    def slice_cube(self, cube: TrayectoriaCube, dimension: str, value: Any) -> TrayectoriaCube:
+        """
+        Fija una dimensión del cubo en un solo valor (p. ej. un programa)
+
+        Args:
+            cube: Cubo de trayectoria
+            dimension: Dimensión a fijar
+            value: Valor a conservar
+
+        Returns:
+            Cubo filtrado
+        """
+        return cube.slice(dimension, value)
+
+    def dice_cube(self, cube: TrayectoriaCube, filters: Dict[str, Any]) -> TrayectoriaCube:
+        """
+        Filtra el cubo por varios valores en varias dimensiones
+
+        Args:
+            cube: Cubo de trayectoria
+            filters: Dimensión -> valor o lista de valores
+
+        Returns:
+            Cubo filtrado
+        """
+        return cube.dice(filters)
+
+    def rollup_cube(self, cube: TrayectoriaCube, dimensions: Sequence[str] = ()) -> pd.DataFrame:
+        """
+        Cuenta estudiantes distintos por las dimensiones indicadas
+
+        Args:
+            cube: Cubo de trayectoria
+            dimensions: Dimensiones a conservar (vacío para el total)
+
+        Returns:
+            DataFrame con las dimensiones y la columna 'estudiantes'
+        """
+        return cube.rollup(dimensions)
+
+    def drilldown_trayectoria(
+        self,
+        cube: TrayectoriaCube,
+        filters: Optional[Dict[str, Any]] = None
+    ) -> pd.DataFrame:
+        """
+        Tabla de trayectoria para un subconjunto del cubo (programa, campus, escuela...)
+
+        Args:
+            cube: Cubo de trayectoria
+            filters: Dimensión -> valor o lista de valores (None para todo el grado)
+
+        Returns:
+            DataFrame con trayectoria por generación
+        """
+        if filters:
+            cube = cube.dice(filters)
+        return cube.trayectoria()
+
     def calculate_retention_metrics(self, df_trayectoria: pd.DataFrame) -> Dict:
         """
         Calcula métricas de retención
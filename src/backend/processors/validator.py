@@ -0,0 +1,226 @@
+"""
+Módulo de validación de reportes sobre los DataFrames en memoria (sin releer el Excel)
+"""
+import json
+from dataclasses import dataclass, asdict, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+import pandas as pd
+
+from src.utils.config import config
+from src.utils.logger import get_logger
+
+
+logger = get_logger(__name__, config.paths.logs_dir)
+
+
+SEVERITY_ERROR = 'error'
+SEVERITY_WARNING = 'warning'
+
+
+class ReportValidationError(ValueError):
+    """Error lanzado cuando un reporte no pasa la validación y esta es bloqueante"""
+
+
+@dataclass
+class ValidationFinding:
+    """Resultado de una regla de validación"""
+    rule: str
+    sheet: str
+    severity: str
+    message: str
+    count: int = 0
+
+
+@dataclass
+class ValidationReport:
+    """Conjunto de hallazgos de validación de un reporte"""
+    grado: str
+    findings: List[ValidationFinding] = field(default_factory=list)
+    sheets: Dict[str, int] = field(default_factory=dict)
+    validated_at: str = field(default_factory=lambda: datetime.now().isoformat(timespec='seconds'))
+
+    @property
+    def errors(self) -> List[ValidationFinding]:
+        return [f for f in self.findings if f.severity == SEVERITY_ERROR]
+
+    @property
+    def is_valid(self) -> bool:
+        """True si no hay hallazgos con severidad de error"""
+        return not self.errors
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'grado': self.grado,
+            'valid': self.is_valid,
+            'validated_at': self.validated_at,
+            'sheets': self.sheets,
+            'findings': [asdict(f) for f in self.findings]
+        }
+
+
+class ReportValidator:
+    """
+    Valida un reporte mientras se genera
+
+    Las reglas se evalúan sobre los DataFrames antes de escribirlos y, para
+    Hoja1 en streaming, sobre cada lote de filas conforme se escribe.
+    """
+
+    EXPECTED_SHEETS = ['Hoja1', 'Resumen', 'NI', 'Reinscritos', 'Cuadro FIMPES']
+
+    # Columnas con el programa por hoja para la regla grado_filter. Hoja1 no se
+    # incluye: la query "todos" (get_todos_los_datos) nunca se ha filtrado por
+    # grado y consolida los datos de todos los programas en cada reporte
+    PROGRAMA_COLUMNS = {'NI': 'programa_id', 'Reinscritos': 'programa_id'}
+
+    # Hojas con detalle por estudiante que no deben repetir la llave
+    UNIQUE_KEY = ['periodo_id', 'estudiante_id', 'programa_id']
+    UNIQUE_KEY_SHEETS = ['NI', 'Reinscritos']
+
+    def __init__(self, grado: str, fimpes_max_null_ratio: Optional[float] = None):
+        """
+        Inicializa el validador
+
+        Args:
+            grado: Grado académico del reporte (LL, EL, ML)
+            fimpes_max_null_ratio: Proporción máxima de nulos en el cuadro FIMPES
+                (por defecto config.validation.fimpes_max_null_ratio)
+        """
+        self.grado = grado
+        self.fimpes_max_null_ratio = (
+            config.validation.fimpes_max_null_ratio
+            if fimpes_max_null_ratio is None else fimpes_max_null_ratio
+        )
+        self.report = ValidationReport(grado=grado)
+        self._stream_state: Dict[str, Dict[str, int]] = {}
+
+    def _add(self, rule: str, sheet: str, severity: str, message: str, count: int = 0):
+        self.report.findings.append(ValidationFinding(rule, sheet, severity, message, count))
+
+    def _check_leading_rows(self, sheet_name: str, df: pd.DataFrame):
+        """Regla: la tabla no debe iniciar con filas vacías"""
+        if df.empty:
+            return
+        non_empty = df.notna().any(axis=1).to_numpy()
+        leading = int(non_empty.argmax()) if non_empty.any() else len(df)
+        if leading:
+            self._add('leading_empty_rows', sheet_name, SEVERITY_ERROR,
+                      f"{leading} filas vacías al inicio de la tabla", leading)
+
+    def _check_grado(self, sheet_name: str, programas: pd.Series):
+        """Regla: todos los programas pertenecen al grado del reporte"""
+        outside = int((~programas.astype(str).str.startswith(self.grado)).sum())
+        if outside:
+            self._add('grado_filter', sheet_name, SEVERITY_ERROR,
+                      f"{outside} filas con programa fuera del grado {self.grado}", outside)
+
+    def check_sheet(self, sheet_name: str, df: pd.DataFrame):
+        """
+        Evalúa las reglas aplicables a una hoja completa en memoria
+
+        Args:
+            sheet_name: Nombre de la hoja
+            df: DataFrame que se escribirá en la hoja
+        """
+        self.report.sheets[sheet_name] = len(df)
+        self._check_leading_rows(sheet_name, df)
+
+        programa_col = self.PROGRAMA_COLUMNS.get(sheet_name)
+        if programa_col and programa_col in df.columns:
+            self._check_grado(sheet_name, df[programa_col])
+
+        if sheet_name in self.UNIQUE_KEY_SHEETS and set(self.UNIQUE_KEY).issubset(df.columns):
+            duplicated = int(df.duplicated(subset=self.UNIQUE_KEY).sum())
+            if duplicated:
+                self._add('duplicate_key', sheet_name, SEVERITY_ERROR,
+                          f"{duplicated} filas repetidas para {tuple(self.UNIQUE_KEY)}", duplicated)
+
+        if sheet_name == 'Cuadro FIMPES' and not df.empty:
+            null_ratio = float(df.isna().to_numpy().mean())
+            if null_ratio > self.fimpes_max_null_ratio:
+                self._add('fimpes_null_ratio', sheet_name, SEVERITY_ERROR,
+                          f"{null_ratio:.1%} de valores nulos (máximo {self.fimpes_max_null_ratio:.1%})",
+                          int(df.isna().to_numpy().sum()))
+
+    def check_batch(self, sheet_name: str, columns: Sequence[str], rows: List[tuple]):
+        """
+        Evalúa las reglas aplicables a un lote de filas escrito en streaming
+
+        Args:
+            sheet_name: Nombre de la hoja
+            columns: Nombres de columna del lote
+            rows: Filas (tuplas) del lote
+        """
+        state = self._stream_state.setdefault(sheet_name, {'rows': 0, 'leading_empty': 0, 'outside': 0})
+
+        if state['rows'] == state['leading_empty']:
+            for row in rows:
+                if any(v is not None for v in row):
+                    break
+                state['leading_empty'] += 1
+
+        programa_col = self.PROGRAMA_COLUMNS.get(sheet_name)
+        if programa_col in columns:
+            idx = list(columns).index(programa_col)
+            state['outside'] += sum(1 for row in rows if not str(row[idx]).startswith(self.grado))
+
+        state['rows'] += len(rows)
+
+    def _close_streams(self):
+        """Convierte los contadores de hojas en streaming en hallazgos"""
+        for sheet_name, state in self._stream_state.items():
+            self.report.sheets[sheet_name] = state['rows']
+            if state['leading_empty'] and state['rows']:
+                self._add('leading_empty_rows', sheet_name, SEVERITY_ERROR,
+                          f"{state['leading_empty']} filas vacías al inicio de la tabla",
+                          state['leading_empty'])
+            if state['outside']:
+                self._add('grado_filter', sheet_name, SEVERITY_ERROR,
+                          f"{state['outside']} filas con programa fuera del grado {self.grado}",
+                          state['outside'])
+        self._stream_state.clear()
+
+    def finish(self) -> ValidationReport:
+        """
+        Cierra la validación evaluando las reglas a nivel de libro
+
+        Returns:
+            Reporte de validación con todos los hallazgos
+        """
+        self._close_streams()
+
+        missing = [s for s in self.EXPECTED_SHEETS if s not in self.report.sheets]
+        if missing:
+            self._add('expected_sheets', '', SEVERITY_ERROR,
+                      f"Hojas faltantes: {', '.join(missing)}", len(missing))
+
+        for finding in self.report.findings:
+            log = logger.warning if finding.severity == SEVERITY_ERROR else logger.info
+            log(f"Validación {self.grado} [{finding.rule}] {finding.sheet}: {finding.message}")
+
+        return self.report
+
+    @staticmethod
+    def sidecar_path(report_path: Path) -> Path:
+        """Ruta del archivo JSON de validación junto al reporte"""
+        return report_path.with_name(f"{report_path.stem}.validation.json")
+
+    def write_sidecar(self, report_path: Path) -> Path:
+        """
+        Guarda los hallazgos en un archivo JSON junto al reporte
+
+        Args:
+            report_path: Ruta del reporte Excel
+
+        Returns:
+            Ruta del archivo JSON generado
+        """
+        sidecar = self.sidecar_path(report_path)
+        data = self.report.to_dict()
+        data['report'] = report_path.name
+        with open(sidecar, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+        return sidecar
@@ -2,5 +2,6 @@
 Módulo de scheduler
 """
 from .tasks import ReportScheduler, start_scheduler
+from .jobs import JobQueue, list_generated_reports
 
-__all__ = ['ReportScheduler', 'start_scheduler']
+__all__ = ['ReportScheduler', 'start_scheduler', 'JobQueue', 'list_generated_reports']
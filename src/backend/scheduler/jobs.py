@@ -0,0 +1,261 @@
+"""
+Módulo de cola persistente para generación de reportes bajo demanda
+"""
+import sqlite3
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Generator, List, Optional, Tuple
+
+from src.backend.processors import ExcelGenerator
+from src.utils.config import config
+from src.utils.logger import get_logger
+
+
+logger = get_logger(__name__, config.paths.logs_dir)
+
+
+STATUS_PENDING = 'pending'
+STATUS_RUNNING = 'running'
+STATUS_DONE = 'done'
+STATUS_ERROR = 'error'
+
+
+class JobQueue:
+    """
+    Cola de generación de reportes con tabla de trabajos en SQLite
+
+    Las solicitudes se guardan como trabajos pendientes; un grupo de hilos
+    trabajadores los toma en orden y actualiza etapa y avance reales durante la
+    generación. Una solicitud idéntica a otra pendiente o en curso no crea un
+    trabajo nuevo: retorna el existente.
+    """
+
+    def __init__(self, db_path: Optional[Path] = None, workers: Optional[int] = None):
+        """
+        Inicializa la cola
+
+        Args:
+            db_path: Ruta del archivo SQLite (por defecto data/<jobs.jobs_db>)
+            workers: Número de hilos trabajadores (por defecto config.jobs.workers)
+        """
+        self.db_path = Path(db_path or config.paths.data_dir / config.jobs.jobs_db)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.workers = workers or config.jobs.workers
+        self.generator = ExcelGenerator()
+
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stop = threading.Event()
+        self._threads: List[threading.Thread] = []
+
+        self._ensure_schema()
+        self._recover_interrupted()
+
+    @contextmanager
+    def _connect(self) -> Generator[sqlite3.Connection, None, None]:
+        """Conexión SQLite con commit automático y cierre al finalizar"""
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def _ensure_schema(self):
+        with self._connect() as conn:
+            conn.executescript("""
+            CREATE TABLE IF NOT EXISTS report_jobs (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                grado TEXT NOT NULL,
+                year_start INTEGER NOT NULL,
+                year_end INTEGER NOT NULL,
+                status TEXT NOT NULL,
+                stage TEXT,
+                progress REAL NOT NULL DEFAULT 0,
+                output_file TEXT,
+                error TEXT,
+                requested_at TEXT NOT NULL,
+                started_at TEXT,
+                finished_at TEXT
+            );
+            CREATE INDEX IF NOT EXISTS idx_report_jobs_status ON report_jobs(status, id);
+            """)
+
+    def _recover_interrupted(self):
+        """Regresa a pendientes los trabajos que quedaron en curso si el proceso se detuvo"""
+        with self._connect() as conn:
+            cur = conn.execute(
+                "UPDATE report_jobs SET status = ?, stage = NULL, progress = 0 WHERE status = ?",
+                (STATUS_PENDING, STATUS_RUNNING)
+            )
+            if cur.rowcount:
+                logger.info(f"{cur.rowcount} trabajos interrumpidos regresados a la cola")
+
+    def submit(self, grado: str, year_start: int, year_end: int) -> Tuple[int, bool]:
+        """
+        Solicita la generación de un reporte
+
+        Args:
+            grado: Grado académico (LL, EL, ML)
+            year_start: Año inicial
+            year_end: Año final
+
+        Returns:
+            Tupla (id del trabajo, creado). creado es False si ya existía una
+            solicitud idéntica pendiente o en curso
+        """
+        with self._lock, self._connect() as conn:
+            existing = conn.execute(
+                """
+                SELECT id FROM report_jobs
+                WHERE grado = ? AND year_start = ? AND year_end = ? AND status IN (?, ?)
+                ORDER BY id LIMIT 1
+                """,
+                (grado, year_start, year_end, STATUS_PENDING, STATUS_RUNNING)
+            ).fetchone()
+            if existing:
+                return existing['id'], False
+
+            cur = conn.execute(
+                """
+                INSERT INTO report_jobs (grado, year_start, year_end, status, requested_at)
+                VALUES (?, ?, ?, ?, ?)
+                """,
+                (grado, year_start, year_end, STATUS_PENDING, datetime.now().isoformat(timespec='seconds'))
+            )
+            job_id = cur.lastrowid
+
+        logger.info(f"Trabajo #{job_id} en cola: {grado} {year_start}-{year_end}")
+        self._wakeup.set()
+        return job_id, True
+
+    def get_job(self, job_id: int) -> Optional[Dict[str, Any]]:
+        """Obtiene un trabajo por id"""
+        with self._connect() as conn:
+            row = conn.execute("SELECT * FROM report_jobs WHERE id = ?", (job_id,)).fetchone()
+        return dict(row) if row else None
+
+    def list_jobs(self, limit: int = 20) -> List[Dict[str, Any]]:
+        """
+        Lista los trabajos más recientes
+
+        Args:
+            limit: Número máximo de trabajos
+
+        Returns:
+            Lista de trabajos (más reciente primero)
+        """
+        with self._connect() as conn:
+            rows = conn.execute("SELECT * FROM report_jobs ORDER BY id DESC LIMIT ?", (limit,)).fetchall()
+        return [dict(r) for r in rows]
+
+    def _claim_next(self) -> Optional[Dict[str, Any]]:
+        """Toma el siguiente trabajo pendiente marcándolo como en curso"""
+        with self._lock, self._connect() as conn:
+            row = conn.execute(
+                "SELECT * FROM report_jobs WHERE status = ? ORDER BY id LIMIT 1",
+                (STATUS_PENDING,)
+            ).fetchone()
+            if row is None:
+                return None
+            conn.execute(
+                "UPDATE report_jobs SET status = ?, started_at = ?, stage = ?, progress = 0 WHERE id = ?",
+                (STATUS_RUNNING, datetime.now().isoformat(timespec='seconds'), 'En cola', row['id'])
+            )
+        return dict(row)
+
+    def _update(self, job_id: int, **fields):
+        columns = ', '.join(f"{name} = ?" for name in fields)
+        with self._connect() as conn:
+            conn.execute(f"UPDATE report_jobs SET {columns} WHERE id = ?", (*fields.values(), job_id))
+
+    def _run_job(self, job: Dict[str, Any]):
+        """Genera el reporte de un trabajo actualizando su avance"""
+        job_id = job['id']
+        grado = job['grado']
+        logger.info(f"Iniciando trabajo #{job_id}: {grado} {job['year_start']}-{job['year_end']}")
+
+        try:
+            output_file = self.generator.generate_report_for_grado(
+                grado,
+                year_start=job['year_start'],
+                year_end=job['year_end'],
+                filename=f"Trayectoria_{grado}_{job['year_start']}-{job['year_end']}_job{job_id}.xlsx",
+                progress_callback=lambda stage, fraction: self._update(job_id, stage=stage, progress=fraction)
+            )
+            self._update(
+                job_id,
+                status=STATUS_DONE,
+                stage='Completado',
+                progress=1.0,
+                output_file=str(output_file),
+                finished_at=datetime.now().isoformat(timespec='seconds')
+            )
+            logger.info(f"Trabajo #{job_id} completado: {output_file}")
+
+        except Exception as e:
+            self._update(
+                job_id,
+                status=STATUS_ERROR,
+                error=str(e),
+                finished_at=datetime.now().isoformat(timespec='seconds')
+            )
+            logger.error(f"Trabajo #{job_id} con error: {e}")
+
+    def _worker_loop(self):
+        while not self._stop.is_set():
+            job = self._claim_next()
+            if job is None:
+                self._wakeup.wait(config.jobs.poll_seconds)
+                self._wakeup.clear()
+                continue
+            self._run_job(job)
+
+    def start(self):
+        """Inicia los hilos trabajadores (idempotente)"""
+        if self._threads:
+            return
+
+        for idx in range(self.workers):
+            thread = threading.Thread(target=self._worker_loop, name=f"report-worker-{idx + 1}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+        logger.info(f"Cola de generación iniciada con {self.workers} trabajadores")
+
+    def stop(self):
+        """Detiene los trabajadores al terminar su trabajo actual"""
+        self._stop.set()
+        self._wakeup.set()
+        for thread in self._threads:
+            thread.join()
+        self._threads.clear()
+
+
+def list_generated_reports(limit: int = 50) -> List[Dict[str, Any]]:
+    """
+    Lista los reportes Excel generados (programados y bajo demanda)
+
+    Args:
+        limit: Número máximo de archivos
+
+    Returns:
+        Lista de archivos con nombre, ruta, tamaño y fecha (más reciente primero)
+    """
+    reports_dir = Path(config.paths.reports_dir)
+    if not reports_dir.exists():
+        return []
+
+    files = sorted(reports_dir.glob('*.xlsx'), key=lambda p: p.stat().st_mtime, reverse=True)[:limit]
+    return [
+        {
+            'name': f.name,
+            'path': f,
+            'size_kb': f.stat().st_size / 1024,
+            'modified': datetime.fromtimestamp(f.stat().st_mtime).strftime('%Y-%m-%d %H:%M')
+        }
+        for f in files
+    ]
@@ -7,6 +7,9 @@ from datetime import datetime
 import pytz
 
 from src.backend.processors import ExcelGenerator
+from src.backend.processors.cache import result_cache
+from src.backend.processors.data_service import load_trayectoria_data
+from src.backend.monitoring.metrics import MetricsStore, track_run
 from src.utils.config import config
 from src.utils.logger import get_logger
 
@@ -21,18 +24,61 @@ class ReportScheduler:
         """Inicializa el scheduler"""
         self.scheduler = BackgroundScheduler(timezone=config.scheduler.timezone)
         self.generator = ExcelGenerator()
+        self.warmup_history = []
+        self.metrics_store = MetricsStore()
         logger.info("ReportScheduler inicializado")
 
+    def _check_regressions(self, run_id: int):
+        """Registra alertas para las etapas de una ejecución que superaron su línea base"""
+        if run_id is None:
+            return
+
+        try:
+            regressions = [
+                r for r in self.metrics_store.find_regressions('daily_report_generation')
+                if r['run_id'] == run_id
+            ]
+        except Exception as e:
+            logger.error(f"Error evaluando regresiones: {e}")
+            return
+
+        for r in regressions:
+            logger.warning(
+                f"⚠ Regresión en '{r['stage']}': {r['seconds']:.2f}s "
+                f"vs línea base {r['baseline_seconds']:.2f}s ({r['ratio']}x)"
+            )
+
+        self._check_plan_changes(run_id)
+
+    def _check_plan_changes(self, run_id: int):
+        """Registra alertas para las queries cuyo plan cambió o se volvió más lento (modo diagnóstico)"""
+        try:
+            diffs = self.metrics_store.diff_plans(run_id)
+        except Exception as e:
+            logger.error(f"Error comparando planes de ejecución: {e}")
+            return
+
+        factor = config.monitoring.regression_factor
+        for d in diffs:
+            slower = d['execution_ratio'] is not None and d['execution_ratio'] > factor
+            if d['structure_changed'] or slower:
+                logger.warning(
+                    f"⚠ Plan de '{d['query']}' vs ejecución #{d['previous_run_id']}: "
+                    f"{'cambió de estructura' if d['structure_changed'] else 'misma estructura'}, "
+                    f"tiempo {d['execution_ratio']}x, costo {d['cost_ratio']}x"
+                )
+
     def generate_all_reports_task(self):
         """Tarea que genera todos los reportes"""
         try:
             logger.info("=== Iniciando generación automática de reportes ===")
             start_time = datetime.now()
 
-            results = self.generator.generate_all_reports(
-                year_start=config.reports.year_start,
-                year_end=config.reports.year_end
-            )
+            with track_run('daily_report_generation', self.metrics_store) as run:
+                results = self.generator.generate_all_reports(
+                    year_start=config.reports.year_start,
+                    year_end=config.reports.year_end
+                )
 
             elapsed = (datetime.now() - start_time).total_seconds()
 
@@ -47,12 +93,93 @@ class ReportScheduler:
                 else:
                     logger.error(f"  ✗ {grado}: Error")
 
+            logger.info(f"Pico de memoria: {run.peak_memory_mb or 0:.1f} MB")
+            self._check_regressions(run.run_id)
+
             return results
 
         except Exception as e:
             logger.error(f"Error en generación automática: {e}")
             raise
 
+    def warm_cache_task(self) -> dict:
+        """
+        Tarea que pre-calienta el cache de extracciones y agregados del dashboard
+
+        Recorre las combinaciones (grado, rango de años) configuradas en
+        config.cache.warmup_ranges y registra duración y tamaño final del cache.
+
+        Returns:
+            Diccionario con el resultado de la ejecución
+        """
+        logger.info("=== Iniciando pre-calentamiento de cache ===")
+        start_time = datetime.now()
+
+        warmed = 0
+        failed = 0
+        for year_start, year_end in config.cache.warmup_ranges:
+            for grado in config.reports.grados:
+                try:
+                    load_trayectoria_data(grado, year_start, year_end, refresh=True)
+                    warmed += 1
+                    logger.info(f"  ✓ Cache listo: {grado} {year_start}-{year_end}")
+                except Exception as e:
+                    failed += 1
+                    logger.error(f"  ✗ Error pre-calentando {grado} {year_start}-{year_end}: {e}")
+
+        elapsed = (datetime.now() - start_time).total_seconds()
+        stats = result_cache.stats()
+
+        run = {
+            'started_at': start_time.isoformat(timespec='seconds'),
+            'elapsed_seconds': round(elapsed, 2),
+            'combinations_warmed': warmed,
+            'combinations_failed': failed,
+            'cache_entries': stats['disk_entries'],
+            'cache_bytes': stats['disk_bytes']
+        }
+        self.warmup_history.append(run)
+        self.warmup_history = self.warmup_history[-30:]
+
+        logger.info(
+            f"Pre-calentamiento completado en {elapsed:.2f}s: {warmed} combinaciones, "
+            f"{stats['disk_entries']} entradas ({stats['disk_bytes'] / 1024 / 1024:.2f} MB)"
+        )
+
+        return run
+
+    def schedule_cache_warmup(self):
+        """Programa el pre-calentamiento diario del cache en horario de baja demanda"""
+        if not config.scheduler.enabled:
+            return
+
+        if not (config.cache.enabled and config.cache.warmup_enabled):
+            logger.info("Pre-calentamiento de cache deshabilitado en configuración")
+            return
+
+        try:
+            hour, minute = map(int, config.cache.warmup_time.split(':'))
+
+            trigger = CronTrigger(
+                hour=hour,
+                minute=minute,
+                timezone=pytz.timezone(config.scheduler.timezone)
+            )
+
+            self.scheduler.add_job(
+                self.warm_cache_task,
+                trigger=trigger,
+                id='daily_cache_warmup',
+                name='Pre-calentamiento de Cache',
+                replace_existing=True
+            )
+
+            logger.info(f"Tarea programada: Pre-calentamiento de cache a las {config.cache.warmup_time} {config.scheduler.timezone}")
+
+        except Exception as e:
+            logger.error(f"Error programando pre-calentamiento: {e}")
+            raise
+
     def schedule_daily_reports(self):
         """Programa generación diaria de reportes"""
         if not config.scheduler.enabled:
@@ -89,6 +216,7 @@ class ReportScheduler:
         """Inicia el scheduler"""
         try:
             self.schedule_daily_reports()
+            self.schedule_cache_warmup()
             self.scheduler.start()
             logger.info("Scheduler iniciado exitosamente")
 
@@ -115,9 +243,9 @@ class ReportScheduler:
 
     def get_next_run_time(self) -> datetime:
         """Obtiene la próxima hora de ejecución programada"""
-        jobs = self.scheduler.get_jobs()
-        if jobs:
-            return jobs[0].next_run_time
+        job = self.scheduler.get_job('daily_report_generation')
+        if job:
+            return job.next_run_time
         return None
 
 
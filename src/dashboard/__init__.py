@@ -0,0 +1,3 @@
+"""
+Dashboard web de Streamlit
+"""
@@ -0,0 +1,200 @@
+"""
+Especificaciones de gráficas del dashboard: cache por huella de datos y reducción de series (LTTB)
+"""
+import hashlib
+from typing import Callable, Dict, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+import plotly.express as px
+import plotly.graph_objects as go
+import streamlit as st
+
+
+# Paleta de los reportes Excel
+CHART_COLORS = ['#366092', '#5B9BD5', '#70AD47']
+
+# Puntos por serie enviados al navegador; las series más largas se reducen con LTTB
+MAX_POINTS = 500
+
+# A partir de este número de series las líneas se dibujan con WebGL (Scattergl)
+WEBGL_SERIES = 20
+
+
+@st.cache_resource
+def get_figure_template() -> str:
+    """
+    Registra una vez por proceso la plantilla de plotly del dashboard
+
+    Returns:
+        Nombre de la plantilla registrada en plotly.io.templates
+    """
+    import plotly.io as pio
+
+    template = go.layout.Template(pio.templates['plotly'])
+    template.layout.colorway = CHART_COLORS
+    template.layout.hovermode = 'x unified'
+    pio.templates['trayectoria'] = template
+    return 'trayectoria'
+
+
+def fingerprint(df: pd.DataFrame) -> str:
+    """
+    Huella del contenido de un DataFrame (columnas, tipos y valores)
+
+    Args:
+        df: DataFrame a identificar
+
+    Returns:
+        SHA1 en hexadecimal
+    """
+    digest = hashlib.sha1()
+    digest.update(repr([(str(c), str(t)) for c, t in df.dtypes.items()]).encode('utf-8'))
+    digest.update(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, threshold: int) -> np.ndarray:
+    """
+    Índices de los puntos que conserva Largest-Triangle-Three-Buckets
+
+    Se conservan el primer y el último punto; de cada cubeta intermedia se
+    elige el punto que forma el triángulo de mayor área con el punto elegido
+    anterior y el promedio de la cubeta siguiente, lo que preserva picos y
+    caídas de la serie.
+
+    Args:
+        x: Posiciones (numéricas y crecientes)
+        y: Valores
+        threshold: Puntos a conservar
+
+    Returns:
+        Índices crecientes (todos si la serie no excede threshold)
+    """
+    n = len(y)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    x = np.asarray(x, dtype=float)
+    y = np.nan_to_num(np.asarray(y, dtype=float))
+    edges = (np.arange(threshold - 1) * ((n - 2) / (threshold - 2))).astype(np.int64) + 1
+
+    selected = np.empty(threshold, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+    a = 0
+    for i in range(threshold - 2):
+        start, end = edges[i], edges[i + 1]
+        next_start, next_end = (edges[i + 1], edges[i + 2]) if i + 2 < len(edges) else (n - 1, n)
+        avg_x, avg_y = x[next_start:next_end].mean(), y[next_start:next_end].mean()
+
+        area = np.abs((x[a] - avg_x) * (y[start:end] - y[a]) - (x[a] - x[start:end]) * (avg_y - y[a]))
+        a = start + int(np.argmax(area))
+        selected[i + 1] = a
+    return selected
+
+
+@st.cache_data(max_entries=256, show_spinner=False)
+def _cached_spec(kind: str, key: str, params: str, _build: Callable[[], go.Figure]) -> dict:
+    """Especificación (dict) de una figura, cacheada por tipo, huella de datos y parámetros"""
+    return _build().to_dict()
+
+
+def line_spec(
+    df: pd.DataFrame,
+    x: str,
+    y: Sequence[str],
+    group: Optional[str] = None,
+    names: Optional[Dict[str, str]] = None,
+    max_points: int = MAX_POINTS,
+    **layout
+) -> dict:
+    """
+    Gráfica de líneas por periodo, lista para st.plotly_chart
+
+    Cada serie con más de max_points puntos se reduce con LTTB en el servidor
+    antes de enviarla. La especificación se cachea por la huella de df: una
+    re-ejecución con los mismos datos no vuelve a construir la figura.
+
+    Args:
+        df: Datos en formato largo
+        x: Columna del eje X (p. ej. periodo_id)
+        y: Columnas de valores (una serie por columna)
+        group: Columna que separa series (una serie por valor y columna de y)
+        names: Nombre a mostrar de cada columna de y
+        max_points: Puntos máximos por serie
+        **layout: Argumentos de fig.update_layout (title, height, ...)
+
+    Returns:
+        Especificación de la figura
+    """
+    names = names or {}
+
+    def build() -> go.Figure:
+        # Posición de cada valor de X en el eje completo: LTTB respeta los huecos entre periodos
+        categories = np.sort(df[x].astype(str).unique())
+        groups = [(None, df)] if group is None else list(df.groupby(group, sort=True, observed=True))
+        trace = go.Scattergl if len(groups) * len(y) > WEBGL_SERIES else go.Scatter
+
+        fig = go.Figure()
+        for value, part in groups:
+            part = part.sort_values(x, kind='stable')
+            labels = part[x].astype(str).to_numpy()
+            positions = np.searchsorted(categories, labels)
+            for column in y:
+                keep = lttb_indices(positions, part[column].to_numpy(), max_points)
+                name = names.get(column, column)
+                fig.add_trace(trace(
+                    x=labels[keep],
+                    y=part[column].to_numpy()[keep],
+                    name=name if value is None else f"{value} · {name}" if len(y) > 1 else str(value),
+                    mode='lines+markers' if len(keep) <= 50 else 'lines',
+                    line=dict(width=3 if value is None else 2)
+                ))
+        fig.update_layout(template=get_figure_template(), **layout)
+        fig.update_xaxes(type='category', categoryorder='array', categoryarray=categories)
+        return fig
+
+    params = repr((x, tuple(y), group, sorted(names.items()), max_points, sorted(layout.items())))
+    return _cached_spec('line', fingerprint(df), params, build)
+
+
+def pie_spec(df: pd.DataFrame, values: str, names: str, **kwargs) -> dict:
+    """
+    Gráfica de pastel (px.pie) cacheada por la huella de df
+
+    Args:
+        df: Datos
+        values: Columna de valores
+        names: Columna de etiquetas
+        **kwargs: Argumentos adicionales de px.pie
+
+    Returns:
+        Especificación de la figura
+    """
+    def build() -> go.Figure:
+        return px.pie(df, values=values, names=names, template=get_figure_template(), **kwargs)
+
+    return _cached_spec('pie', fingerprint(df), repr((values, names, sorted(kwargs.items()))), build)
+
+
+def bar_spec(df: pd.DataFrame, x: str, y: str, layout: Optional[Dict] = None, **kwargs) -> dict:
+    """
+    Gráfica de barras (px.bar) cacheada por la huella de df
+
+    Args:
+        df: Datos
+        x: Columna del eje X
+        y: Columna de valores
+        layout: Argumentos de fig.update_layout
+        **kwargs: Argumentos adicionales de px.bar
+
+    Returns:
+        Especificación de la figura
+    """
+    def build() -> go.Figure:
+        fig = px.bar(df, x=x, y=y, template=get_figure_template(), **kwargs)
+        fig.update_layout(**(layout or {}))
+        return fig
+
+    params = repr((x, y, sorted((layout or {}).items()), sorted(kwargs.items())))
+    return _cached_spec('bar', fingerprint(df), params, build)
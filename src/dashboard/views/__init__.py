@@ -0,0 +1,7 @@
+"""
+Páginas del dashboard
+
+Cada módulo expone render() y se importa solo cuando se selecciona su página
+(ver PAGES en src/dashboard/app.py): las dependencias pesadas (plotly, pandas,
+el pool de conexiones) se cargan al abrir la primera página que las usa.
+"""
@@ -0,0 +1,28 @@
+"""
+Utilidades compartidas por las páginas del dashboard (sin dependencias pesadas)
+"""
+import streamlit as st
+
+
+GRADO_LABELS = {
+    'LL': 'Licenciatura',
+    'EL': 'Especialidad',
+    'ML': 'Maestría'
+}
+
+
+def grado_label(grado: str) -> str:
+    """Nombre del grado académico para los selectores"""
+    return GRADO_LABELS.get(grado, grado)
+
+
+@st.cache_resource
+def get_database():
+    """
+    Pool de conexiones del proceso
+
+    Se crea al primer uso (no al cargar el dashboard) y lo comparten todas
+    las sesiones y ejecuciones del script.
+    """
+    from src.backend.db import db
+    return db
@@ -0,0 +1,53 @@
+"""
+Página de configuración del dashboard
+"""
+import streamlit as st
+
+from src.utils.config import config
+from src.dashboard.views.common import get_database
+
+
+def render():
+    """Página de configuración"""
+    st.header("⚙️ Configuración del Sistema")
+
+    tab1, tab2, tab3 = st.tabs(["Base de Datos", "Reportes", "Programación"])
+
+    with tab1:
+        st.subheader("Configuración de Base de Datos")
+
+        st.text_input("Host", value=config.database.host, disabled=True)
+        st.number_input("Puerto", value=config.database.port, disabled=True)
+        st.text_input("Base de Datos", value=config.database.database, disabled=True)
+        st.text_input("Usuario", value=config.database.user, disabled=True)
+
+        if st.button("🔍 Probar Conexión"):
+            with st.spinner("Probando conexión..."):
+                try:
+                    if get_database().test_connection():
+                        st.success("✅ Conexión exitosa!")
+                    else:
+                        st.error("❌ Error en la conexión")
+                except Exception as e:
+                    st.error(f"❌ Error: {str(e)}")
+
+    with tab2:
+        st.subheader("Configuración de Reportes")
+
+        st.number_input("Año Inicial", value=config.reports.year_start, min_value=2000, max_value=2030)
+        st.number_input("Año Final", value=config.reports.year_end, min_value=2000, max_value=2030)
+
+        st.multiselect(
+            "Grados Académicos",
+            options=['LL', 'EL', 'ML'],
+            default=config.reports.grados
+        )
+
+    with tab3:
+        st.subheader("Programación Automática")
+
+        st.checkbox("Habilitar generación automática", value=config.scheduler.enabled)
+        st.time_input("Hora de ejecución", value=None)
+        st.selectbox("Zona horaria", options=["America/Mexico_City"])
+
+        st.info("⏰ La generación automática ejecutará los reportes diariamente a la hora configurada.")
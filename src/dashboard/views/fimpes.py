@@ -0,0 +1,27 @@
+"""
+Página de cuadro FIMPES del dashboard
+"""
+import streamlit as st
+
+from src.utils.config import config
+from src.dashboard.views.common import grado_label
+
+
+def render():
+    """Página de cuadro FIMPES"""
+    st.header("📊 Cuadro FIMPES")
+
+    grado = st.selectbox(
+        "Selecciona Grado Académico",
+        options=config.reports.grados,
+        format_func=grado_label
+    )
+
+    if st.button("📊 Generar Cuadro FIMPES", type="primary"):
+        with st.spinner("Generando cuadro FIMPES..."):
+            try:
+                st.success("Cuadro FIMPES generado!")
+                st.info("📊 El cuadro FIMPES se mostrará aquí una vez conectado a la base de datos.")
+
+            except Exception as e:
+                st.error(f"Error al generar cuadro: {str(e)}")
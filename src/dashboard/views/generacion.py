@@ -0,0 +1,123 @@
+"""
+Página de generación de reportes del dashboard
+"""
+import pandas as pd
+import streamlit as st
+
+from src.backend.scheduler.jobs import JobQueue, list_generated_reports
+from src.utils.config import config
+from src.dashboard.views.common import grado_label
+
+
+@st.cache_resource
+def get_job_queue() -> JobQueue:
+    """Cola de generación compartida por todas las sesiones del dashboard"""
+    queue = JobQueue()
+    queue.start()
+    return queue
+
+
+@st.cache_data(max_entries=2, show_spinner=False)
+def read_report(path: str, modified_ns: int) -> bytes:
+    """Contenido de un reporte generado (se vuelve a leer solo si el archivo cambió)"""
+    with open(path, 'rb') as f:
+        return f.read()
+
+
+def render():
+    """Página de generación de reportes"""
+    st.header("📥 Generación de Reportes Excel")
+
+    st.subheader("Generar Reportes")
+
+    col1, col2 = st.columns(2)
+
+    with col1:
+        grados_seleccionados = st.multiselect(
+            "Grados Académicos",
+            options=config.reports.grados,
+            default=config.reports.grados,
+            format_func=grado_label
+        )
+
+    with col2:
+        year_range = st.slider(
+            "Rango de Años",
+            min_value=2020,
+            max_value=2025,
+            value=(config.reports.year_start, config.reports.year_end),
+            key="gen_years"
+        )
+
+    queue = get_job_queue()
+
+    if st.button("🚀 Generar Reportes", type="primary"):
+        if not grados_seleccionados:
+            st.warning("Por favor selecciona al menos un grado académico")
+        else:
+            for grado in grados_seleccionados:
+                try:
+                    job_id, created = queue.submit(grado, year_range[0], year_range[1])
+                    if created:
+                        st.success(f"✅ Reporte {grado} en cola (trabajo #{job_id})")
+                    else:
+                        st.info(f"ℹ️ Ya hay una solicitud en curso para {grado} (trabajo #{job_id})")
+                except Exception as e:
+                    st.error(f"Error al solicitar el reporte {grado}: {str(e)}")
+
+    st.markdown("---")
+    col_title, col_refresh = st.columns([4, 1])
+    with col_title:
+        st.subheader("Solicitudes")
+    with col_refresh:
+        st.button("🔄 Actualizar", key="refresh_jobs")
+
+    jobs = queue.list_jobs(limit=10)
+    if not jobs:
+        st.info("No hay solicitudes de generación.")
+    else:
+        status_labels = {
+            'pending': '⏳ En cola',
+            'running': '⚙️ Generando',
+            'done': '✅ Completado',
+            'error': '❌ Error'
+        }
+        for job in jobs:
+            label = (f"#{job['id']} · {job['grado']} {job['year_start']}-{job['year_end']} · "
+                     f"{status_labels.get(job['status'], job['status'])}")
+            if job['status'] == 'running':
+                st.progress(min(float(job['progress']), 1.0), text=f"{label} · {job['stage'] or ''}")
+            elif job['status'] == 'error':
+                st.error(f"{label}: {job['error']}")
+            else:
+                st.text(label)
+
+    st.markdown("---")
+    st.subheader("Reportes Generados")
+
+    reports = list_generated_reports()
+    if not reports:
+        st.info(f"📁 Aún no hay reportes en `{config.paths.reports_dir}`")
+    else:
+        st.dataframe(
+            pd.DataFrame(reports)[['name', 'modified', 'size_kb']].rename(columns={
+                'name': 'Archivo', 'modified': 'Fecha', 'size_kb': 'Tamaño (KB)'
+            }),
+            use_container_width=True,
+            hide_index=True
+        )
+
+        selected = st.selectbox("Reporte", options=[r['name'] for r in reports])
+        report = next(r for r in reports if r['name'] == selected)
+        # El archivo solo se lee al pedir la descarga, no en cada re-ejecución de la página
+        download_key = (str(report['path']), report['path'].stat().st_mtime_ns)
+        if st.button("📦 Preparar descarga"):
+            st.session_state['download_report'] = download_key
+
+        if st.session_state.get('download_report') == download_key:
+            st.download_button(
+                "⬇️ Descargar",
+                data=read_report(*download_key),
+                file_name=report['name'],
+                mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+            )
@@ -0,0 +1,66 @@
+"""
+Página de inicio del dashboard
+"""
+import streamlit as st
+
+from src.utils.config import config
+
+
+def render():
+    """Página de inicio"""
+    st.header("Bienvenido al Sistema de Reportes de Trayectoria")
+
+    col1, col2, col3 = st.columns(3)
+
+    with col1:
+        st.metric(
+            label="Grados Académicos",
+            value=len(config.reports.grados),
+            delta="LL, EL, ML"
+        )
+
+    with col2:
+        st.metric(
+            label="Periodo de Análisis",
+            value=f"{config.reports.year_end - config.reports.year_start + 1} años",
+            delta=f"{config.reports.year_start}-{config.reports.year_end}"
+        )
+
+    with col3:
+        st.metric(
+            label="Base de Datos",
+            value="PostgreSQL",
+            delta=config.database.database
+        )
+
+    st.markdown("---")
+
+    st.subheader("Funcionalidades")
+
+    st.markdown("""
+    ### 📈 Visualización de Trayectoria
+    - Análisis de cohortes por generación
+    - Seguimiento de estudiantes de nuevo ingreso
+    - Métricas de retención y permanencia
+    - Gráficos interactivos
+
+    ### 📊 Cuadro FIMPES
+    - Indicadores institucionales
+    - Eficiencia de retención
+    - Tasas de egreso
+    - Análisis de rezago
+
+    ### 📥 Generación de Reportes
+    - Reportes Excel automatizados
+    - Formato corporativo
+    - Descarga bajo demanda
+    - Programación automática
+
+    ### ⚙️ Configuración
+    - Ajuste de periodos
+    - Configuración de base de datos
+    - Gestión de exportaciones
+    """)
+
+    st.markdown("---")
+    st.info("💡 **Tip:** Usa el menú lateral para navegar entre las diferentes secciones.")
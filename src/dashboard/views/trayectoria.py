@@ -0,0 +1,424 @@
+"""
+Página de visualización de trayectoria del dashboard
+"""
+import contextvars
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import Any, Callable
+
+import pandas as pd
+import streamlit as st
+from streamlit.runtime.scriptrunner import RerunException, StopException
+
+from src.utils.config import config
+from src.utils.logger import get_logger
+from src.backend.db import cancellable, QueryCancelledError, QueryTimeoutError
+from src.backend.processors.data_service import load_trayectoria_data, load_fact_store, load_student_listing
+from src.backend.processors.transformer import TrayectoriaTransformer
+from src.dashboard.charts import CHART_COLORS, bar_spec, line_spec, pie_spec
+from src.dashboard.views.common import grado_label
+
+
+logger = get_logger(__name__, config.paths.logs_dir)
+
+
+# Columna de orden del listado de estudiantes -> etiqueta
+LISTING_SORT_LABELS = {
+    'periodo_id': 'Periodo',
+    'programa_id': 'Programa',
+    'campus': 'Campus',
+    'escuela': 'Escuela',
+    'estudiante_id': 'ID',
+    'estudiante_nombre': 'Nombre'
+}
+
+LISTING_PAGE_SIZES = [25, 50, 100, 200]
+
+# Intervalo de espera de una carga en curso: cada paso es un punto de interrupción del script
+QUERY_POLL_SECONDS = 0.5
+
+# Columna del resumen por periodo -> nombre de la serie
+TENDENCIA_SERIES = {
+    'nuevo_ingreso': 'Nuevo Ingreso',
+    'egresados': 'Egresados',
+    'titulados': 'Titulados'
+}
+
+
+@st.cache_resource
+def get_query_executor() -> ThreadPoolExecutor:
+    """Hilos de carga de datos del dashboard (compartidos por todas las sesiones)"""
+    return ThreadPoolExecutor(max_workers=config.database.pool_size, thread_name_prefix='dashboard-query')
+
+
+def run_interactive(scope: str, load: Callable[..., Any], *args) -> Any:
+    """
+    Ejecuta una carga de datos cancelable y con límite de tiempo
+
+    Streamlit solo atiende una nueva ejecución del script (p. ej. al mover un
+    filtro) en un punto de interrupción del mismo hilo, es decir, al emitir un
+    elemento. Por eso la carga corre en un hilo de get_query_executor y el
+    script espera en pasos cortos actualizando un marcador: si la ejecución se
+    reemplaza o se detiene, se cancelan en el servidor las queries en curso.
+    Abrir el mismo ámbito en otra ejecución de la sesión también las cancela.
+
+    Args:
+        scope: Ámbito dentro de la sesión ('trayectoria', 'drilldown', 'listing')
+        load: Función de carga (data_service)
+        *args: Argumentos de load
+
+    Returns:
+        Resultado de load
+    """
+    session_id = st.session_state.setdefault('query_session', uuid.uuid4().hex)
+    with cancellable(('dashboard', session_id, scope), timeout_ms=config.database.interactive_timeout_ms) as token:
+        # El hilo de carga hereda el ámbito (token y límite) a través del contexto
+        future = get_query_executor().submit(contextvars.copy_context().run, load, *args)
+        status = st.empty()
+        start = time.monotonic()
+        try:
+            while True:
+                try:
+                    result = future.result(timeout=QUERY_POLL_SECONDS)
+                except FutureTimeoutError:
+                    status.caption(f"⏳ Consultando... {time.monotonic() - start:.0f}s")
+                    continue
+                except Exception:
+                    status.empty()
+                    raise
+                status.empty()
+                return result
+        except (RerunException, StopException):
+            token.cancel()
+            raise
+
+
+def render():
+    """Página de visualización de trayectoria"""
+    st.header("📈 Visualización de Trayectoria")
+
+    # Filtros
+    col1, col2 = st.columns(2)
+
+    with col1:
+        grado = st.selectbox(
+            "Grado Académico",
+            options=config.reports.grados,
+            format_func=grado_label
+        )
+
+    with col2:
+        # Validar que year_start < year_end
+        min_year = min(config.reports.year_start, 2020)
+        max_year = max(config.reports.year_end, config.reports.year_start + 1)
+
+        year_range = st.slider(
+            "Rango de Años",
+            min_value=min_year,
+            max_value=max_year,
+            value=(config.reports.year_start, config.reports.year_end)
+        )
+
+    if st.button("🔄 Cargar Datos", type="primary"):
+        with st.spinner("Cargando datos desde la base de datos..."):
+            try:
+                # Cargar datos reales (pre-calentados por el scheduler cuando es posible)
+                logger.info(f"Extrayendo datos para {grado} ({year_range[0]}-{year_range[1]})")
+                resultado = run_interactive('trayectoria', load_trayectoria_data, grado, year_range[0], year_range[1])
+                st.session_state['drilldown'] = (grado, year_range[0], year_range[1])
+                # El detalle filtra este cubo en cada re-ejecución sin volver a cargar los datos
+                st.session_state['drilldown_cube'] = resultado['cube']
+                datos = resultado['datos']
+                trayectoria_df = resultado['trayectoria']
+
+                st.success(f"✅ Datos cargados: {len(datos['nuevo_ingreso'])} NI, {len(datos['reinscritos'])} Reinscritos")
+
+                # ====================
+                # VISUALIZACIONES
+                # ====================
+
+                # 1. Resumen de totales
+                st.markdown("---")
+                st.subheader("📊 Resumen General")
+
+                col1, col2, col3 = st.columns(3)
+                with col1:
+                    total_ni = datos['resumen']['nuevo_ingreso'].sum()
+                    st.metric("Nuevo Ingreso Total", f"{total_ni:,}")
+
+                with col2:
+                    total_eg = datos['resumen']['egresados'].sum()
+                    st.metric("Egresados Total", f"{total_eg:,}")
+
+                with col3:
+                    total_ti = datos['resumen']['titulados'].sum()
+                    st.metric("Titulados Total", f"{total_ti:,}")
+
+                # 2. Gráfico de tendencia temporal
+                st.markdown("---")
+                st.subheader("📈 Tendencia Temporal")
+
+                # Especificación cacheada por huella de datos; series largas reducidas con LTTB
+                st.plotly_chart(
+                    line_spec(
+                        datos['resumen'],
+                        x='periodo_id',
+                        y=list(TENDENCIA_SERIES),
+                        names=TENDENCIA_SERIES,
+                        title=f"Evolución por Periodo - {grado}",
+                        xaxis_title="Periodo",
+                        yaxis_title="Número de Estudiantes",
+                        height=400
+                    ),
+                    use_container_width=True
+                )
+
+                # 3. Tabla de datos resumen
+                st.markdown("---")
+                st.subheader("📋 Datos por Periodo")
+
+                # Formatear tabla para mejor visualización
+                resumen_display = datos['resumen'].copy()
+                resumen_display = resumen_display.sort_values('periodo_id', ascending=False)
+
+                st.dataframe(
+                    resumen_display,
+                    use_container_width=True,
+                    height=300,
+                    hide_index=True
+                )
+
+                # 4. Trayectoria por cohorte (si está disponible)
+                if trayectoria_df is not None and not trayectoria_df.empty:
+                    st.markdown("---")
+                    st.subheader("🎓 Trayectoria por Cohorte")
+
+                    # Mostrar solo las primeras columnas relevantes
+                    cols_to_show = [col for col in trayectoria_df.columns if col.startswith('P') or col == 'Generación']
+                    if cols_to_show:
+                        st.dataframe(
+                            trayectoria_df[cols_to_show].head(10),
+                            use_container_width=True,
+                            height=300
+                        )
+
+                        st.info("💡 Mostrando las primeras 10 generaciones. El reporte Excel contiene todos los datos.")
+
+                # 5. Distribución de estudiantes
+                st.markdown("---")
+                st.subheader("👥 Distribución de Estudiantes")
+
+                col1, col2 = st.columns(2)
+
+                with col1:
+                    # Gráfico de pie para NI vs Reinscritos
+                    totales = pd.DataFrame({
+                        'Tipo': ['Nuevo Ingreso', 'Reinscritos'],
+                        'Total': [len(datos['nuevo_ingreso']), len(datos['reinscritos'])]
+                    })
+
+                    fig_pie = pie_spec(
+                        totales,
+                        values='Total',
+                        names='Tipo',
+                        title='Nuevo Ingreso vs Reinscritos',
+                        color_discrete_sequence=CHART_COLORS[:2]
+                    )
+                    st.plotly_chart(fig_pie, use_container_width=True)
+
+                with col2:
+                    # Top 5 periodos con más nuevo ingreso
+                    top_periodos = datos['resumen'].nlargest(5, 'nuevo_ingreso')[['periodo_id', 'nuevo_ingreso']]
+
+                    fig_bar = bar_spec(
+                        top_periodos,
+                        x='periodo_id',
+                        y='nuevo_ingreso',
+                        layout={'showlegend': False},
+                        title='Top 5 Periodos - Nuevo Ingreso',
+                        color='nuevo_ingreso',
+                        color_continuous_scale='Blues'
+                    )
+                    st.plotly_chart(fig_bar, use_container_width=True)
+
+                # 6. Botón de descarga
+                st.markdown("---")
+                st.info("💾 Para obtener el reporte completo con todas las hojas y formato, usa la sección **Generación de Reportes**.")
+
+            except QueryTimeoutError:
+                st.warning("⏱️ La consulta excedió el tiempo límite. Reduce el rango de años e intenta de nuevo.")
+            except QueryCancelledError:
+                logger.info("Carga de datos reemplazada por una solicitud más reciente")
+            except Exception as e:
+                st.error(f"❌ Error al cargar datos: {str(e)}")
+                logger.error(f"Error en visualización: {e}", exc_info=True)
+
+                # Mostrar detalles del error en modo debug
+                with st.expander("🔍 Ver detalles del error"):
+                    st.code(str(e))
+
+    if 'drilldown' in st.session_state:
+        show_drilldown(*st.session_state['drilldown'])
+        show_student_listing(*st.session_state['drilldown'])
+
+
+def show_drilldown(grado: str, year_start: int, year_end: int):
+    """Detalle por programa, campus y escuela a partir del cubo pre-agregado"""
+    st.markdown("---")
+    st.subheader(f"🔎 Detalle por Programa / Campus - {grado} ({year_start}-{year_end})")
+
+    # Cubo de la carga de "Cargar Datos": filtrarlo no consulta la base de datos
+    # (aun con el cache desactivado); el almacén de hechos solo se abre
+    cube = st.session_state.get('drilldown_cube')
+    try:
+        if cube is None:
+            cube = run_interactive('drilldown', load_trayectoria_data, grado, year_start, year_end)['cube']
+            st.session_state['drilldown_cube'] = cube
+        store = run_interactive('drilldown', load_fact_store, grado, year_start, year_end)
+    except QueryTimeoutError:
+        st.warning("⏱️ La consulta del detalle excedió el tiempo límite.")
+        return
+    except QueryCancelledError:
+        logger.info("Detalle reemplazado por una solicitud más reciente")
+        return
+
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        campus = st.multiselect("Campus", options=cube.members('campus'), key="dd_campus")
+    with col2:
+        escuelas = st.multiselect("Escuela", options=cube.members('escuela'), key="dd_escuela")
+    with col3:
+        programas = st.multiselect("Programa", options=cube.members('programa'), key="dd_programa")
+
+    filters = {
+        dim: values for dim, values in
+        (('campus', campus), ('escuela', escuelas), ('programa', programas)) if values
+    }
+    subcube = cube.dice(filters)
+
+    agrupar = st.multiselect(
+        "Agrupar por",
+        options=['programa', 'campus', 'escuela', 'periodo', 'tipo'],
+        default=['programa'],
+        key="dd_group"
+    )
+
+    col1, col2 = st.columns(2)
+    with col1:
+        st.markdown("**Estudiantes distintos**")
+        st.dataframe(subcube.rollup(agrupar), use_container_width=True, height=300, hide_index=True)
+    with col2:
+        # Matriz calculada sobre el almacén de hechos (np.memmap): reabrirlo en cada ejecución cuesta milisegundos
+        rows = store.mask(filters) if filters else None
+        st.markdown("**Trayectoria por cohorte (selección)**")
+        st.dataframe(
+            TrayectoriaTransformer().create_trayectoria_from_facts(store, rows),
+            use_container_width=True,
+            height=300,
+            hide_index=True
+        )
+
+    # Una serie por valor de la primera dimensión de agrupación (p. ej. cientos de programas)
+    serie = next((dim for dim in agrupar if dim != 'periodo'), None)
+    por_periodo = subcube.rollup(['periodo'] + ([serie] if serie else []))
+    if not por_periodo.empty:
+        st.plotly_chart(
+            line_spec(
+                por_periodo,
+                x='periodo',
+                y=['estudiantes'],
+                group=serie,
+                names={'estudiantes': 'Estudiantes'},
+                title=f"Estudiantes por periodo{f' y {serie}' if serie else ''}",
+                xaxis_title="Periodo",
+                yaxis_title="Estudiantes distintos",
+                height=400
+            ),
+            use_container_width=True
+        )
+
+
+def show_student_listing(grado: str, year_start: int, year_end: int):
+    """
+    Listado paginado de registros de NI / Reinscritos
+
+    Filtros, orden y paginación se resuelven en el servidor (StudentListing):
+    al navegador solo se envía la página visible, sin importar el tamaño del
+    resultado.
+    """
+    st.markdown("---")
+    st.subheader(f"👥 Estudiantes - {grado} ({year_start}-{year_end})")
+
+    tipo = st.radio(
+        "Registros",
+        options=['nuevo_ingreso', 'reinscritos'],
+        format_func=lambda x: {'nuevo_ingreso': 'Nuevo Ingreso', 'reinscritos': 'Reinscritos'}[x],
+        horizontal=True,
+        key="ls_tipo"
+    )
+
+    # El listado (con sus índices de orden) se conserva en la sesión: cambiar de página,
+    # filtro u orden no vuelve a consultar la base de datos aun con el cache desactivado
+    listing_key = (grado, year_start, year_end, tipo)
+    listings = st.session_state.setdefault('ls_listings', {})
+    try:
+        if listing_key not in listings:
+            listings.clear()
+            listings[listing_key] = run_interactive(
+                'listing', load_student_listing, grado, year_start, year_end, tipo
+            )
+        listing = listings[listing_key]
+    except QueryTimeoutError:
+        st.warning("⏱️ La consulta del listado excedió el tiempo límite.")
+        return
+    except QueryCancelledError:
+        logger.info("Listado reemplazado por una solicitud más reciente")
+        return
+
+    if not len(listing):
+        st.info("No hay registros para el grado y rango de años seleccionados.")
+        return
+
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        programas = st.multiselect("Programa", options=listing.options('programa'), key="ls_programa")
+    with col2:
+        campus = st.multiselect("Campus", options=listing.options('campus'), key="ls_campus")
+    with col3:
+        periodos = st.multiselect("Periodo", options=listing.options('periodo'), key="ls_periodo")
+
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        sort_by = st.selectbox(
+            "Ordenar por",
+            options=list(LISTING_SORT_LABELS),
+            format_func=LISTING_SORT_LABELS.get,
+            key="ls_sort"
+        )
+    with col2:
+        descending = st.checkbox("Descendente", key="ls_desc")
+    with col3:
+        page_size = st.selectbox("Filas por página", options=LISTING_PAGE_SIZES, index=1, key="ls_page_size")
+
+    filters = {
+        dim: values for dim, values in
+        (('programa', programas), ('campus', campus), ('periodo', periodos)) if values
+    }
+
+    # Un cambio de filtros u orden regresa a la primera página
+    view = (grado, year_start, year_end, tipo, sort_by, descending, page_size,
+            tuple(sorted((d, tuple(v)) for d, v in filters.items())))
+    if st.session_state.get('ls_view') != view:
+        st.session_state['ls_view'] = view
+        st.session_state['ls_page'] = 1
+
+    page = listing.page(filters, sort_by, descending, st.session_state.get('ls_page', 1), page_size)
+    st.session_state['ls_page'] = page.page
+    st.dataframe(page.rows, use_container_width=True, height=min(35 * (page_size + 1), 600), hide_index=True)
+
+    col1, col2 = st.columns([1, 3])
+    with col1:
+        st.number_input("Página", min_value=1, max_value=page.pages, step=1, key="ls_page")
+    with col2:
+        st.caption(f"Filas {page.first_row:,}–{page.last_row:,} de {page.total:,} · página {page.page} de {page.pages}")
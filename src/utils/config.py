@@ -19,6 +19,8 @@ class DatabaseConfig:
     schema: str = "core"
     pool_size: int = 5
     max_overflow: int = 10
+    pool_timeout_seconds: float = 30.0  # Espera máxima de una conexión libre del pool
+    interactive_timeout_ms: int = 30000  # Límite por query del dashboard y la API (0: sin límite)
 
     @property
     def connection_string(self) -> str:
@@ -31,6 +33,7 @@ class PathConfig:
     """Configuración de rutas del proyecto"""
     root_dir: Path
     data_dir: Path
+    cache_dir: Path
     reports_dir: Path
     templates_dir: Path
     logs_dir: Path
@@ -42,6 +45,7 @@ class PathConfig:
         return cls(
             root_dir=root,
             data_dir=root / "data",
+            cache_dir=root / "data" / "cache",
             reports_dir=root / "data" / "reportes_generados",
             templates_dir=root / "data" / "templates",
             logs_dir=root / "logs"
@@ -54,6 +58,10 @@ class ReportConfig:
     year_start: int = 2021
     year_end: int = 2025
     grados: list[str] = None
+    stream_hoja1: bool = True  # Escribe Hoja1 en lotes desde el cursor (memoria acotada)
+    stream_batch_size: int = 5000
+    normalized_extraction: bool = False  # Hechos con llaves + dimensiones en lugar de filas anchas
+    workers: int = 1  # Procesos para transformar/escribir los grados en paralelo (1 = secuencial)
 
     def __post_init__(self):
         if self.grados is None:
@@ -68,6 +76,76 @@ class SchedulerConfig:
     timezone: str = "America/Mexico_City"
 
 
+@dataclass
+class CacheConfig:
+    """Configuración de cache de resultados y pre-calentamiento"""
+    enabled: bool = True
+    ttl_hours: float = 24.0
+    max_memory_items: int = 64
+    warmup_enabled: bool = True
+    warmup_time: str = "05:30"  # Formato HH:MM (horario de baja demanda)
+    warmup_ranges: list[list[int]] = None
+    year_partitions: bool = True  # Cachear por año y componer cualquier rango
+    open_years: int = 1  # Años recientes (incluido el actual) que siguen recibiendo datos
+    closed_ttl_hours: float = 0.0  # Vigencia de los años cerrados; 0 = no expiran
+
+    def __post_init__(self):
+        if self.warmup_ranges is None:
+            self.warmup_ranges = []
+
+
+@dataclass
+class MonitoringConfig:
+    """Configuración de historial de métricas de ejecución"""
+    metrics_db: str = "run_metrics.sqlite"  # Relativo a data_dir
+    baseline_window: int = 7  # Ejecuciones previas para la línea base
+    regression_factor: float = 1.5  # Alerta si una etapa supera factor x línea base
+    min_stage_seconds: float = 1.0  # Ignora etapas más cortas (ruido)
+    capture_plans: bool = False  # EXPLAIN (ANALYZE, BUFFERS) por query de reporte (modo diagnóstico)
+    plan_top_nodes: int = 5  # Nodos más costosos a mostrar por plan
+
+
+@dataclass
+class ValidationConfig:
+    """Configuración de validación de reportes durante la generación"""
+    enabled: bool = True
+    fail_on_error: bool = False  # Si True, un hallazgo de error impide guardar el reporte
+    fimpes_max_null_ratio: float = 0.5
+
+
+@dataclass
+class ApiConfig:
+    """Configuración de la API HTTP de solo lectura"""
+    host: str = "0.0.0.0"
+    port: int = 8000
+    cache_items: int = 256
+    cache_ttl_seconds: int = 600
+    gzip_min_size: int = 1024  # Bytes mínimos para comprimir la respuesta
+
+
+@dataclass
+class JobsConfig:
+    """Configuración de la cola de generación bajo demanda"""
+    workers: int = 2
+    jobs_db: str = "report_jobs.sqlite"  # Relativo a data_dir
+    poll_seconds: float = 2.0
+
+
+@dataclass
+class FimpesConfig:
+    """Configuración de los indicadores FIMPES calculados por estudiante"""
+    abandono_periodos: int = 3  # Periodos consecutivos sin inscripción para considerar abandono
+    estatus_egresado: str = "EG"
+
+
+@dataclass
+class ReplicaConfig:
+    """Configuración de la réplica local (DuckDB) para ejecuciones sin carga en producción"""
+    backend: str = "postgres"  # Origen de DataExtractor: 'postgres' o 'replica'
+    path: str = "replica.duckdb"  # Relativo a data_dir
+    batch_size: int = 50000  # Filas por lote al copiar desde PostgreSQL
+
+
 class Config:
     """Configuración principal del sistema"""
 
@@ -93,7 +171,11 @@ class Config:
             password=os.getenv('DB_PASSWORD', db_config.get('password', '')),
             schema=os.getenv('DB_SCHEMA', db_config.get('schema', 'core')),
             pool_size=int(os.getenv('DB_POOL_SIZE', db_config.get('pool_size', 5))),
-            max_overflow=int(os.getenv('DB_MAX_OVERFLOW', db_config.get('max_overflow', 10)))
+            max_overflow=int(os.getenv('DB_MAX_OVERFLOW', db_config.get('max_overflow', 10))),
+            pool_timeout_seconds=float(os.getenv('DB_POOL_TIMEOUT', db_config.get('pool_timeout_seconds', 30.0))),
+            interactive_timeout_ms=int(os.getenv(
+                'DB_INTERACTIVE_TIMEOUT_MS', db_config.get('interactive_timeout_ms', 30000)
+            ))
         )
 
         # Path config
@@ -105,7 +187,11 @@ class Config:
         self.reports = ReportConfig(
             year_start=report_config.get('year_start', 2021),
             year_end=report_config.get('year_end', 2025),
-            grados=report_config.get('grados', ["LL", "EL", "ML"])
+            grados=report_config.get('grados', ["LL", "EL", "ML"]),
+            stream_hoja1=report_config.get('stream_hoja1', True),
+            stream_batch_size=int(report_config.get('stream_batch_size', 5000)),
+            normalized_extraction=report_config.get('normalized_extraction', False),
+            workers=int(report_config.get('workers', 1))
         )
 
         # Scheduler config
@@ -116,10 +202,80 @@ class Config:
             timezone=scheduler_config.get('timezone', 'America/Mexico_City')
         )
 
+        # Cache config
+        cache_config = config_data.get('cache', {})
+        self.cache = CacheConfig(
+            enabled=cache_config.get('enabled', True),
+            ttl_hours=float(cache_config.get('ttl_hours', 24.0)),
+            max_memory_items=int(cache_config.get('max_memory_items', 64)),
+            warmup_enabled=cache_config.get('warmup_enabled', True),
+            warmup_time=cache_config.get('warmup_time', '05:30'),
+            warmup_ranges=cache_config.get(
+                'warmup_ranges',
+                [[self.reports.year_start, self.reports.year_end]]
+            ),
+            year_partitions=cache_config.get('year_partitions', True),
+            open_years=int(cache_config.get('open_years', 1)),
+            closed_ttl_hours=float(cache_config.get('closed_ttl_hours', 0.0))
+        )
+
+        # Monitoring config
+        monitoring_config = config_data.get('monitoring', {})
+        self.monitoring = MonitoringConfig(
+            metrics_db=monitoring_config.get('metrics_db', 'run_metrics.sqlite'),
+            baseline_window=int(monitoring_config.get('baseline_window', 7)),
+            regression_factor=float(monitoring_config.get('regression_factor', 1.5)),
+            min_stage_seconds=float(monitoring_config.get('min_stage_seconds', 1.0)),
+            capture_plans=monitoring_config.get('capture_plans', False),
+            plan_top_nodes=int(monitoring_config.get('plan_top_nodes', 5))
+        )
+
+        # Validation config
+        validation_config = config_data.get('validation', {})
+        self.validation = ValidationConfig(
+            enabled=validation_config.get('enabled', True),
+            fail_on_error=validation_config.get('fail_on_error', False),
+            fimpes_max_null_ratio=float(validation_config.get('fimpes_max_null_ratio', 0.5))
+        )
+
+        # API config
+        api_config = config_data.get('api', {})
+        self.api = ApiConfig(
+            host=api_config.get('host', '0.0.0.0'),
+            port=int(api_config.get('port', 8000)),
+            cache_items=int(api_config.get('cache_items', 256)),
+            cache_ttl_seconds=int(api_config.get('cache_ttl_seconds', 600)),
+            gzip_min_size=int(api_config.get('gzip_min_size', 1024))
+        )
+
+        # Jobs config
+        jobs_config = config_data.get('jobs', {})
+        self.jobs = JobsConfig(
+            workers=int(jobs_config.get('workers', 2)),
+            jobs_db=jobs_config.get('jobs_db', 'report_jobs.sqlite'),
+            poll_seconds=float(jobs_config.get('poll_seconds', 2.0))
+        )
+
+        # FIMPES config
+        fimpes_config = config_data.get('fimpes', {})
+        self.fimpes = FimpesConfig(
+            abandono_periodos=int(fimpes_config.get('abandono_periodos', 3)),
+            estatus_egresado=fimpes_config.get('estatus_egresado', 'EG')
+        )
+
+        # Replica config
+        replica_config = config_data.get('replica', {})
+        self.replica = ReplicaConfig(
+            backend=os.getenv('DATA_BACKEND', replica_config.get('backend', 'postgres')),
+            path=replica_config.get('path', 'replica.duckdb'),
+            batch_size=int(replica_config.get('batch_size', 50000))
+        )
+
     def create_directories(self):
         """Crea directorios necesarios si no existen"""
         for path in [
             self.paths.data_dir,
+            self.paths.cache_dir,
             self.paths.reports_dir,
             self.paths.templates_dir,
             self.paths.logs_dir
@@ -0,0 +1,78 @@
+"""
+Módulo de coalescencia de llamadas concurrentes idénticas (single-flight)
+"""
+import threading
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+
+class _Call:
+    """Llamada en curso compartida por todos los solicitantes de una misma llave"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    """
+    Ejecuta una sola vez las llamadas concurrentes con la misma llave
+
+    El primer solicitante (líder) ejecuta la función; los demás esperan y
+    reciben el mismo resultado (o la misma excepción). Al terminar, la llave
+    se libera y una llamada posterior vuelve a ejecutar la función.
+
+    Example:
+        flight = SingleFlight()
+        df, shared = flight.do(query, lambda: run_query(query))
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Tuple[Any, bool]:
+        """
+        Ejecuta fn o espera a la ejecución en curso con la misma llave
+
+        Args:
+            key: Llave que identifica llamadas equivalentes
+            fn: Función sin argumentos a ejecutar
+
+        Returns:
+            Tupla (resultado, compartido). compartido es True si el resultado
+            proviene de la ejecución de otro solicitante
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                call.waiters += 1
+                leader = False
+            else:
+                call = _Call()
+                self._calls[key] = call
+                leader = True
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.done.set()
+
+        return call.result, call.waiters > 0
+
+    def in_flight(self) -> int:
+        """Número de llaves con una ejecución en curso"""
+        with self._lock:
+            return len(self._calls)